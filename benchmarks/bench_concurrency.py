@@ -0,0 +1,67 @@
+"""
+Measures JsonDatabase mutation throughput with several processes writing one library.
+
+Usage:
+    python -m benchmarks.bench_concurrency [books] [mutations] [processes...]
+"""
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+from database.json_database import JsonDatabase
+from benchmarks.data import generate_books
+from core.config import valid_status
+
+
+def mutate(file_path: str, worker: int, mutations: int) -> dict[str, int]:
+    """
+    Changes the status of ``mutations`` books of one worker's share of the library.
+
+    Returns:
+        dict[str, int]: The counters of the worker's database.
+    """
+    database = JsonDatabase(file_path, cache=True)
+    ids = [book.id for book in database.load_books()]
+    for number in range(mutations):
+        database.change_book_status(ids[(worker + number * 7) % len(ids)], valid_status[number % 2])
+    database.close()
+    return database.counters()
+
+
+def run(books: int, mutations: int, processes: int) -> tuple[float, int]:
+    """
+    Lets ``processes`` workers split ``mutations`` status changes over one file.
+
+    Returns:
+        tuple[float, int]: The elapsed seconds and the number of version conflicts.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "library.json")
+        JsonDatabase(file_path).save_books(list(generate_books(books)))
+        with get_context("spawn").Pool(processes) as pool:
+            start = time.perf_counter()
+            counters = pool.starmap(
+                mutate, [(file_path, worker, mutations // processes) for worker in range(processes)],
+            )
+            elapsed = time.perf_counter() - start
+        return elapsed, sum(counter["conflicts"] for counter in counters)
+
+
+def main(books: int, mutations: int, processes: list[int]) -> None:
+    for count in processes:
+        elapsed, conflicts = run(books, mutations, count)
+        print(
+            "%2d processes, %d books: %5d mutations in %6.2fs, %4d conflicts, %8.1f mutations/s" % (
+                count, books, mutations, elapsed, conflicts, mutations / elapsed,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    main(
+        int(arguments[0]) if arguments else 1_000,
+        int(arguments[1]) if len(arguments) > 1 else 400,
+        [int(argument) for argument in arguments[2:]] or [1, 2, 4, 8],
+    )
@@ -0,0 +1,48 @@
+"""
+Compares JsonDatabase.find_books with and without the trigram index.
+
+Usage:
+    python -m benchmarks.bench_find 100000 1000000
+"""
+import sys
+import time
+from database.catalogue import Catalogue
+from benchmarks.data import generate_books
+
+QUERIES = (("толстой", "author"), ("нашего времени", "title"), ("сад", "title"), ("1999", "year"))
+
+
+def scan(books: list, query: str, field: str) -> list:
+    """
+    The full-scan search used by the uncached JsonDatabase.
+    """
+    return [book for book in books if str(query).lower() in str(getattr(book, field)).lower()]
+
+
+def main(sizes: list[int]) -> None:
+    for size in sizes:
+        books = list(generate_books(size))
+        catalogue = Catalogue(books)
+        start = time.perf_counter()
+        for _, field in QUERIES:
+            catalogue.search("", field)
+        build = time.perf_counter() - start
+        print("%d books, index build %.2fs" % (size, build))
+        for query, field in QUERIES:
+            start = time.perf_counter()
+            expected = scan(books, query, field)
+            scan_time = time.perf_counter() - start
+            start = time.perf_counter()
+            found = catalogue.search(query, field)
+            index_time = time.perf_counter() - start
+            assert found == expected
+            print(
+                "  %-16s %-6s %7d hits  scan %8.2fms  index %8.2fms  x%.1f" % (
+                    query, field, len(found), scan_time * 1000, index_time * 1000,
+                    scan_time / max(index_time, 1e-9),
+                ),
+            )
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [100_000, 1_000_000])
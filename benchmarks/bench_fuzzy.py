@@ -0,0 +1,77 @@
+"""
+Compares fuzzy author search through the trigram index with brute-force scans.
+
+Each query is a generated author name with one typo. The indexed search is compared with
+scoring every book by trigram similarity and with ranking every book by edit distance.
+
+Usage:
+    python -m benchmarks.bench_fuzzy [books] [queries]
+"""
+import random
+import sys
+import time
+from database.catalogue import Catalogue
+from database.indexes import rank_fuzzy
+from benchmarks.data import generate_books, FIRST_NAMES, LAST_NAMES
+
+ALPHABET = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+LIMIT = 10
+
+
+def levenshtein(left: str, right: str) -> int:
+    """
+    Returns the edit distance between two strings.
+    """
+    previous = list(range(len(right) + 1))
+    for row, char in enumerate(left, 1):
+        current = [row]
+        for column, other in enumerate(right, 1):
+            current.append(min(previous[column] + 1, current[column - 1] + 1, previous[column - 1] + (char != other)))
+        previous = current
+    return previous[-1]
+
+
+def misspell(text: str, rnd: random.Random) -> str:
+    """
+    Deletes, replaces or inserts one letter.
+    """
+    pos = rnd.randrange(len(text))
+    kind = rnd.randrange(3)
+    if kind == 0:
+        return text[:pos] + text[pos + 1:]
+    if kind == 1:
+        return text[:pos] + rnd.choice(ALPHABET) + text[pos + 1:]
+    return text[:pos] + rnd.choice(ALPHABET) + text[pos:]
+
+
+def main(size: int, count: int) -> None:
+    rnd = random.Random(size)
+    books = list(generate_books(size))
+    catalogue = Catalogue(books)
+    catalogue.fuzzy_search("", "author", LIMIT)
+    queries = []
+    for _ in range(count):
+        author = "%s %s" % (rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES))
+        queries.append((author, misspell(author.lower(), rnd)))
+    entries = [(book.id, book.author) for book in books]
+    authors = dict(entries)
+    methods = {
+        "trigram index": lambda query: [book.author for book in catalogue.fuzzy_search(query, "author", LIMIT)],
+        "trigram scan": lambda query: [authors[book_id] for book_id in rank_fuzzy(query, entries, LIMIT)],
+        "levenshtein scan": lambda query: [
+            book.author for book in sorted(books, key=lambda book: levenshtein(query, book.author.lower()))[:LIMIT]
+        ],
+    }
+    print("%d books, %d misspelt authors" % (size, count))
+    for name, method in methods.items():
+        found = 0
+        start = time.perf_counter()
+        for author, query in queries:
+            found += bool(method(query)[:1] == [author])
+        elapsed = time.perf_counter() - start
+        print("  %-16s %9.2fms per query  top-1 correct %5.1f%%" % (name, elapsed / count * 1000, found * 100 / count))
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    main(int(arguments[0]) if arguments else 10_000, int(arguments[1]) if len(arguments) > 1 else 50)
@@ -0,0 +1,57 @@
+"""
+Measures the memory taken by loaded books.
+
+Usage:
+    python -m benchmarks.bench_memory [books]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from models.models import Book
+from benchmarks.data import generate_books
+
+
+@dataclass
+class DictBook:
+    """
+    The previous Book layout: a plain dataclass with a per-instance dict.
+    """
+
+    title: str
+    author: str
+    year: int
+    id: str
+    status: str
+
+
+def measure(text: str, factory) -> tuple[float, float]:
+    """
+    Decodes the library and keeps one object per record, as load_books does.
+
+    Returns:
+        tuple[float, float]: The retained bytes per book and the load time in seconds.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = json.loads(text)
+    count = len(records)
+    objects = [factory(record) for record in records]
+    del records
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size / count, elapsed
+
+
+def main(count: int) -> None:
+    text = json.dumps([book.to_dict() for book in generate_books(count)], ensure_ascii=False)
+    for title, factory in (("dict dataclass", lambda data: DictBook(**data)), ("slotted Book", Book.from_dict)):
+        per_book, elapsed = measure(text, factory)
+        print("%-15s %d books: %6.1f bytes/book, load %.2fs" % (title, count, per_book, elapsed))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
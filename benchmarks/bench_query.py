@@ -0,0 +1,60 @@
+"""
+Compares planned compound queries with a single filtering scan and with chained searches.
+
+The planned query starts from the most selective index of the catalogue. The scan checks
+every condition on every book, and the chained variant runs one find per text condition
+and intersects the results, as a client of find_books alone would have to.
+
+Usage:
+    python -m benchmarks.bench_query [books] [repeats]
+"""
+import sys
+import time
+from database.catalogue import Catalogue
+from database.query import parse_conditions
+from benchmarks.data import generate_books
+
+QUERIES = (
+    "author~толстой; year=1990..2000; status=в наличии",
+    "title~мир; status=выдана",
+    "year=2001; author~ов",
+    "author~лев; year=..1900",
+)
+
+
+def main(size: int, repeats: int) -> None:
+    books = list(generate_books(size))
+    catalogue = Catalogue(books)
+    for text in QUERIES:
+        catalogue.query(parse_conditions(text))
+
+    def chained(conditions):
+        found = None
+        for condition in conditions:
+            if condition.op == "contains":
+                ids = {book.id for book in catalogue.search(str(condition.value), condition.field)}
+                found = ids if found is None else found & ids
+        candidates = books if found is None else [book for book in books if book.id in found]
+        return [book for book in candidates if all(condition.matches(book) for condition in conditions)]
+
+    methods = {
+        "planned": catalogue.query,
+        "scan": lambda conditions: [book for book in books if all(condition.matches(book) for condition in conditions)],
+        "chained finds": chained,
+    }
+    print("%d books, %d runs per query" % (size, repeats))
+    for text in QUERIES:
+        conditions = parse_conditions(text)
+        plan = ", ".join("%s:%d" % (condition.field, estimate) for condition, estimate in catalogue.plan(conditions))
+        print("  %s  [plan %s]" % (text, plan))
+        for name, method in methods.items():
+            start = time.perf_counter()
+            for _ in range(repeats):
+                found = method(conditions)
+            elapsed = time.perf_counter() - start
+            print("    %-14s %9.3fms  %6d books" % (name, elapsed / repeats * 1000, len(found)))
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    main(int(arguments[0]) if arguments else 100_000, int(arguments[1]) if len(arguments) > 1 else 20)
@@ -0,0 +1,41 @@
+"""
+Compares answering report questions from maintained counters with counting by a scan.
+
+Usage:
+    python -m benchmarks.bench_report [books] [repeats]
+"""
+import sys
+import time
+from database.aggregates import Aggregates
+from database.catalogue import Catalogue
+from benchmarks.data import generate_books
+from core.config import valid_status
+
+
+def main(size: int, repeats: int) -> None:
+    books = list(generate_books(size))
+    start = time.perf_counter()
+    catalogue = Catalogue(books)
+    built = time.perf_counter() - start
+    print("%d books, catalogue with counters built in %.2fs" % (size, built))
+    methods = {
+        "counters": lambda: catalogue.aggregates,
+        "scan": lambda: Aggregates(catalogue),
+    }
+    for name, method in methods.items():
+        start = time.perf_counter()
+        for _ in range(repeats):
+            aggregates = method()
+            answers = [aggregates.count("status", status) for status in valid_status], aggregates.top("author", 5)
+        elapsed = (time.perf_counter() - start) / repeats
+        print("  %-10s %10.3fms per report  %s" % (name, elapsed * 1000, answers[0]))
+    ids = [book.id for book in books[:10_000]]
+    start = time.perf_counter()
+    for book_id in ids:
+        catalogue.set_status(book_id, valid_status[1])
+    print("  status change with counters %.2fus" % ((time.perf_counter() - start) / len(ids) * 1e6))
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    main(int(arguments[0]) if arguments else 100_000, int(arguments[1]) if len(arguments) > 1 else 5)
@@ -0,0 +1,45 @@
+"""
+Measures how the parallel scan of the record backend scales with the number of workers.
+
+A record file with the given number of books is searched by author and by year, first on
+a single process and then on process pools of increasing size. The workers map the file
+themselves, so only the numbers of the matching slots are sent back.
+
+Usage:
+    python -m benchmarks.bench_scan [books] [workers ...]
+"""
+import os
+import sys
+import tempfile
+import time
+from database.record_database import RecordDatabase
+from benchmarks.data import generate_books
+
+QUERIES = (("ов", "author"), ("мир", "title"), ("199", "year"))
+REPEATS = 3
+
+
+def main(size: int, pools: list[int]) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "library.records")
+        database = RecordDatabase(path, fsync=False)
+        database.add_books(generate_books(size))
+        database.close()
+        print("%d books, %d CPUs" % (size, os.cpu_count() or 1))
+        baseline = None
+        for workers in pools:
+            database = RecordDatabase(path, fsync=False, workers=workers, parallel_min=0)
+            database.find_books("", "year")
+            start = time.perf_counter()
+            for _ in range(REPEATS):
+                for query, field in QUERIES:
+                    database.find_books(query, field)
+            elapsed = (time.perf_counter() - start) / REPEATS / len(QUERIES)
+            database.close()
+            baseline = baseline or elapsed
+            print("  %2d workers %9.1fms per search  speedup %5.2fx" % (workers, elapsed * 1000, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    main(int(arguments[0]) if arguments else 200_000, [int(value) for value in arguments[1:]] or [1, 2, 4, 8])
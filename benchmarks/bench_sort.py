@@ -0,0 +1,46 @@
+"""
+Measures sorted listings of an uncached JSON library with different sort buffers.
+
+For each buffer size the library is streamed through the external merge sort. The
+benchmark reports the time until the first page is available, the time to read the whole
+listing, and the peak memory traced while the first page is produced.
+
+Usage:
+    python -m benchmarks.bench_sort [books] [buffer ...]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+from database.json_database import JsonDatabase
+from benchmarks.data import generate_books
+from core.config import per_page
+
+
+def main(size: int, buffers: list[int]) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "library.json")
+        database = JsonDatabase(path, fsync=False)
+        database.save_books(list(generate_books(size)))
+        print("%d books sorted by title" % size)
+        for buffer_size in buffers:
+            tracemalloc.start()
+            start = time.perf_counter()
+            books = database.iter_sorted("title", buffer_size)
+            list(islice(books, per_page))
+            first = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            start = time.perf_counter()
+            rest = sum(1 for _ in books)
+            total = first + time.perf_counter() - start
+            print("  buffer %7d  first page %6.2fs  all %6.2fs  peak %7.1f MB  (%d books)" % (
+                buffer_size, first, total, peak / 2 ** 20, per_page + rest,
+            ))
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    main(int(arguments[0]) if arguments else 200_000, [int(value) for value in arguments[1:]] or [200_000, 20_000])
@@ -0,0 +1,51 @@
+"""
+Measures the cold start of the cached JSON backend with and without index sidecars.
+
+A start opens the library and answers one title search, one fuzzy author search and one
+compound query by year and status, which needs four indexes. Without sidecars they are
+built from the books; with sidecars saved by a previous run they are loaded from disk.
+
+Usage:
+    python -m benchmarks.bench_startup [books]
+"""
+import os
+import sys
+import tempfile
+import time
+from database.json_database import JsonDatabase
+from database.query import parse_conditions
+from benchmarks.data import generate_books
+
+
+def start(path: str, sidecars: bool) -> tuple[float, float]:
+    """
+    Opens the library and runs the first searches.
+
+    Returns:
+        tuple[float, float]: The seconds spent loading the books, then the whole start.
+    """
+    began = time.perf_counter()
+    database = JsonDatabase(path, cache=True, fsync=False, sidecars=sidecars)
+    database.load_books()
+    loaded = time.perf_counter()
+    database.find_books("мир", "title")
+    database.fuzzy_find_books("толстй", "author")
+    database.query(parse_conditions("year=1990..2000; status=выдана"))
+    finished = time.perf_counter()
+    database.close()
+    return loaded - began, finished - began
+
+
+def main(size: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "library.json")
+        JsonDatabase(path, fsync=False).save_books(list(generate_books(size)))
+        print("%d books" % size)
+        for name, sidecars in (("rebuilt", False), ("first run", True), ("from sidecars", True)):
+            loaded, total = start(path, sidecars)
+            print("  %-14s load %6.2fs  indexes %6.2fs  start %6.2fs" % (name, loaded, total - loaded, total))
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    main(int(arguments[0]) if arguments else 100_000)
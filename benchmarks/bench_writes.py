@@ -0,0 +1,61 @@
+"""
+Measures JsonDatabase mutation throughput with per-mutation writes and with group commit.
+
+Usage:
+    python -m benchmarks.bench_writes [books] [mutations] [commit_interval]
+"""
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+from database import files
+from database.json_database import JsonDatabase
+from benchmarks.data import generate_books
+from core.config import valid_status
+
+
+def run(books: int, mutations: int, commit_interval: float) -> tuple[float, int]:
+    """
+    Changes the status of ``mutations`` books and waits until everything is durable.
+
+    Returns:
+        tuple[float, int]: The elapsed seconds and the number of file writes.
+    """
+    writes = []
+    atomic_write_json = files.atomic_write_json
+
+    def counted(*args, **kwargs) -> int:
+        writes.append(1)
+        return atomic_write_json(*args, **kwargs)
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "library.json")
+        JsonDatabase(file_path).save_books(list(generate_books(books)))
+        database = JsonDatabase(file_path, cache=True, commit_interval=commit_interval)
+        ids = [book.id for book in database.load_books()]
+        with patch("database.json_database.atomic_write_json", counted):
+            start = time.perf_counter()
+            for number in range(mutations):
+                database.change_book_status(ids[number % len(ids)], valid_status[number % 2])
+            database.close()
+            return time.perf_counter() - start, len(writes)
+
+
+def main(books: int, mutations: int, commit_interval: float) -> None:
+    for title, interval in (("per-mutation write", 0.0), ("group commit %.3fs" % commit_interval, commit_interval)):
+        elapsed, writes = run(books, mutations, interval)
+        print(
+            "%-22s %d books: %5d mutations in %6.2fs, %4d writes, %8.1f mutations/s" % (
+                title, books, mutations, elapsed, writes, mutations / elapsed,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    main(
+        int(arguments[0]) if arguments else 10_000,
+        int(arguments[1]) if len(arguments) > 1 else 200,
+        float(arguments[2]) if len(arguments) > 2 else 0.05,
+    )
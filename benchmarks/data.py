@@ -0,0 +1,44 @@
+import random
+from typing import Iterator
+from models.models import Book
+from core.config import valid_status
+
+TITLE_WORDS = (
+    "война", "мир", "преступление", "наказание", "идиот", "бесы", "отцы", "дети", "мёртвые",
+    "души", "герой", "нашего", "времени", "мастер", "маргарита", "тихий", "дон", "доктор",
+    "живаго", "обломов", "горе", "от", "ума", "капитанская", "дочка", "евгений", "онегин",
+    "белая", "гвардия", "собачье", "сердце", "записки", "охотника", "вишнёвый", "сад",
+)
+FIRST_NAMES = (
+    "Лев", "Фёдор", "Николай", "Михаил", "Иван", "Александр", "Антон", "Борис", "Анна",
+    "Марина", "Владимир", "Сергей", "Максим", "Ольга", "Евгений",
+)
+LAST_NAMES = (
+    "Толстой", "Достоевский", "Гоголь", "Лермонтов", "Булгаков", "Шолохов", "Пастернак",
+    "Гончаров", "Грибоедов", "Пушкин", "Чехов", "Тургенев", "Ахматова", "Цветаева",
+    "Набоков", "Есенин", "Горький", "Куприн", "Бунин", "Платонов",
+)
+
+
+def generate_books(count: int, seed: int = 0) -> Iterator[Book]:
+    """
+    Generates a reproducible synthetic library with Cyrillic titles and authors.
+
+    Args:
+        count (int): The number of books to generate.
+        seed (int): The random seed.
+
+    Returns:
+        Iterator[Book]: The generated books.
+    """
+    rnd = random.Random(seed)
+    for number in range(count):
+        title = " ".join(rnd.choice(TITLE_WORDS) for _ in range(rnd.randint(1, 4))).capitalize()
+        author = "%s %s" % (rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES))
+        yield Book(
+            title=title,
+            author=author,
+            year=rnd.randint(1800, 2024),
+            id="%032x" % rnd.getrandbits(128),
+            status=valid_status[number % 7 == 0],
+        )
@@ -0,0 +1,211 @@
+"""
+Microbenchmarks every AbstractDatabase operation for every backend and dataset size.
+
+Each (backend, size) pair runs in a fresh process, so the reported peak RSS belongs to
+that pair alone. The results are written as JSON with stable keys, and two result files
+can be compared to spot regressions between releases.
+
+Usage:
+    python -m benchmarks.suite --sizes 1000 10000 100000 --output results.json
+    python -m benchmarks.suite --compare old.json new.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from datetime import datetime as dt
+from typing import Callable
+from models.models import Book
+from database.abstract_base import AbstractDatabase
+from database.json_database import JsonDatabase
+from database.log_database import LogDatabase
+from database.sqlite_database import SqliteDatabase
+from database.sharded_database import ShardedDatabase
+from database.record_database import RecordDatabase
+from benchmarks.data import generate_books, LAST_NAMES, TITLE_WORDS
+from core.config import valid_status
+
+
+def create_columnar(directory: str) -> AbstractDatabase:
+    from database.columnar_database import ColumnarDatabase
+    return ColumnarDatabase(os.path.join(directory, "library.json"))
+
+
+BACKENDS: dict[str, Callable[[str], AbstractDatabase]] = {
+    "json": lambda directory: JsonDatabase(os.path.join(directory, "library.json")),
+    "json-cached": lambda directory: JsonDatabase(os.path.join(directory, "library.json"), cache=True),
+    "log": lambda directory: LogDatabase(os.path.join(directory, "library.json")),
+    "sharded": lambda directory: ShardedDatabase(os.path.join(directory, "library.json")),
+    "sharded-cached": lambda directory: ShardedDatabase(os.path.join(directory, "library.json"), cache=True),
+    "records": lambda directory: RecordDatabase(os.path.join(directory, "library.records")),
+    "sqlite": lambda directory: SqliteDatabase(os.path.join(directory, "library.sqlite3")),
+    "columnar": create_columnar,
+}
+OPERATIONS = (
+    "save_books", "load_books", "find_books", "find_book", "change_book_status", "add_book", "delete_book",
+)
+
+
+def written_bytes() -> int | None:
+    """
+    Returns the bytes this process has passed to write() so far, where the OS reports it.
+    """
+    try:
+        with open("/proc/self/io", "r", encoding="ascii") as file:
+            for line in file:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def repetitions(size: int, budget: int) -> int:
+    """
+    Scales the number of runs of an operation down for large libraries.
+    """
+    return max(3, min(budget, 1_000_000 // size))
+
+
+def summarise(latencies: list[float], written: int | None) -> dict:
+    """
+    Turns raw latencies in seconds into the reported statistics.
+    """
+    ordered = sorted(latencies)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "runs": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": cuts[49] * 1000,
+        "p90_ms": cuts[89] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "bytes_written_per_op": None if written is None else written / len(ordered),
+    }
+
+
+def measure(runs: list[Callable[[], object]]) -> dict:
+    """
+    Times each call and the bytes written across all of them.
+    """
+    latencies = []
+    before = written_bytes()
+    for run in runs:
+        start = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - start)
+    after = written_bytes()
+    return summarise(latencies, None if before is None or after is None else after - before)
+
+
+def bench_backend(backend: str, size: int, budget: int) -> dict:
+    """
+    Runs every operation against one backend holding ``size`` books.
+    """
+    rnd = random.Random(size)
+    books = list(generate_books(size))
+    ids = [book.id for book in books]
+    count = repetitions(size, budget)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        database = BACKENDS[backend](directory)
+        results["save_books"] = measure([partial(database.save_books, books)] * max(1, count // 10))
+        results["load_books"] = measure([database.load_books] * count)
+        fields = ("author", "title", "year")
+        queries = [
+            rnd.choice(LAST_NAMES).lower() if field == "author"
+            else rnd.choice(TITLE_WORDS) if field == "title"
+            else str(rnd.randint(1800, 2024))
+            for field in (fields[number % 3] for number in range(count))
+        ]
+        results["find_books"] = measure([
+            partial(database.find_books, query, fields[number % 3]) for number, query in enumerate(queries)
+        ])
+        results["find_book"] = measure([partial(database.find_book, rnd.choice(ids)) for _ in range(count)])
+        results["change_book_status"] = measure([
+            partial(database.change_book_status, rnd.choice(ids), rnd.choice(valid_status)) for _ in range(count)
+        ])
+        new_books = [Book("Новая книга %s" % number, "Новый Автор", 2000) for number in range(count)]
+        results["add_book"] = measure([partial(database.add_book, book) for book in new_books])
+        results["delete_book"] = measure([partial(database.delete_book, book.id) for book in new_books])
+        database.close()
+    return {
+        "backend": backend,
+        "size": size,
+        "operations": results,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run_isolated(backend: str, size: int, budget: int) -> dict:
+    """
+    Runs bench_backend in a fresh process. Unlike Pool workers, executor workers are not
+    daemonic, so backends can start worker processes of their own.
+    """
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(bench_backend, backend, size, budget).result()
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """
+    Prints the p50 latency ratio new/old for every measurement present in both files.
+    """
+    def index(path: str) -> dict:
+        with open(path, "r", encoding="utf-8") as file:
+            runs = json.load(file)["results"]
+        return {
+            (run["backend"], run["size"], operation): stats["p50_ms"]
+            for run in runs for operation, stats in run["operations"].items()
+        }
+
+    old, new = index(old_path), index(new_path)
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key] / old[key] if old[key] else float("inf")
+        flag = "  <-- slower" if ratio > 1.1 else ""
+        print("%-14s %7d %-20s %10.3fms -> %10.3fms  x%.2f%s" % (*key, old[key], new[key], ratio, flag))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS))
+    parser.add_argument("--runs", type=int, default=200, help="maximum runs per operation")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    arguments = parser.parse_args()
+    if arguments.compare:
+        return compare(*arguments.compare)
+    results = []
+    for size in arguments.sizes:
+        for backend in arguments.backends:
+            result = run_isolated(backend, size, arguments.runs)
+            results.append(result)
+            for operation in OPERATIONS:
+                stats = result["operations"][operation]
+                print("%-14s %7d %-20s p50 %9.3fms  p99 %9.3fms" % (
+                    backend, size, operation, stats["p50_ms"], stats["p99_ms"],
+                ), file=sys.stderr)
+    report = {
+        "meta": {
+            "created": dt.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    with open(arguments.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,27 @@
-commands = ("add", "delete", "find", "list", "status", "help", "exit")
+commands = ("add", "import", "delete", "find", "fuzzy", "query", "list", "status", "report", "stats", "help", "exit")
 per_page = 3
+fuzzy_limit = 10
+report_limit = 5
 lang = "ru"
+DATABASE_BACKEND = "json"
 FILE_PATH = "library_books.json"
+SQLITE_PATH = "library_books.sqlite3"
+SHARD_COUNT = 8
+RECORDS_PATH = "library_books.records"
+SCAN_WORKERS = 0
+PARALLEL_SCAN_MIN = 50_000
+SORT_BUFFER_SIZE = 50_000
+LOG_COMPACT_BYTES = 16 << 20
+LOG_COMPACT_RECORDS = 100_000
+LOG_COMPACT_DEAD_RATIO = 0.5
+LOG_COMPACT_MIN_RECORDS = 1_000
+CACHE_BOOKS = True
+INDEX_SIDECARS = True
+QUERY_CACHE_SIZE = 256
+QUERY_CACHE_TTL = 60.0
+SERVER_COMMIT_INTERVAL = 5.0
+COLLECT_STATS = True
+STATS_PATH: str | None = None
 valid_fields = ("author", "title", "year")
 valid_status = ("В наличии", "Выдана")
 
@@ -19,9 +39,19 @@ MESSAGES = {
         "enter_status": "\nВведите новый статус книги: ",
         "invalid_status": "Неверный статус. Возможные значения: %s",
         "status_changed": "Статус книги успешно изменен на \"%s\"\n\n\n",
+        "enter_path": "\nВведите путь к файлу (CSV или JSONL): ",
+        "file_not_found": "Файл не найден: %s\n",
+        "invalid_import_format": "Неподдерживаемый формат файла: %s. Ожидается .csv или .jsonl\n",
+        "invalid_import_encoding": "Файл %s не в кодировке UTF-8\n",
+        "invalid_import_csv": "Повреждённый CSV файл %s: %s\n",
+        "import_read_error": "Не удалось прочитать файл %s: %s\n",
+        "books_imported": "Импортировано книг: %s, отклонено строк: %s\n\n\n",
         "enter_keywords": "Введите ключевые слова: ",
         "enter_field": "По какому полю искать: ",
         "invalid_field": "Неверное поле. Возможные значения: %s",
+        "enter_conditions": "Введите условия (например: author~толстой; year=1860..1870; status=в наличии): ",
+        "invalid_query": "Неверное условие запроса: %s",
+        "enter_order": "Сортировать по (title, author, year; Enter — в порядке добавления): ",
         "books_in_library": "Книги в библиотеке:",
         "next_page": "\n\n\nСледующая страница:",
         "exit": "\n\n\nВыход:",
@@ -32,13 +62,27 @@ MESSAGES = {
         "book_deleted": "Книга успешно удалена.\n",
         "book_added": "Книга успешно добавлена в библиотеку.\n\n\n",
         "no_books": "Нет книг, подходящих вашему запросу.\n",
+        "report_header": "Отчёт по библиотеке:",
+        "report_total": "Всего книг: %s",
+        "report_status": "  %-30s %8s",
+        "report_top": "\nАвторов: %s, лет издания: %s. Чаще всего встречаются:",
+        "report_line": "  %-30s %8s",
+        "stats_disabled": "Сбор статистики выключен (COLLECT_STATS).\n",
+        "stats_header": "Статистика работы:",
+        "stats_operation": "%-32s вызовов: %6s  среднее: %9.3f мс  p99: %9.3f мс  макс: %9.3f мс",
+        "stats_counter": "%-32s %s",
         "goodbye": "Всего доброго!",
         "help_message": """Доступные команды:
 add - Добавить новую книгу
+import - Импортировать книги из CSV или JSONL файла
 delete - Удалить книгу по ID
 find - Найти книги по title, author или year
-list - Показать все книги
+fuzzy - Найти похожие книги с учётом опечаток
+query - Найти книги по нескольким условиям сразу
+list - Показать все книги, по порядку добавления или отсортированные по title, author или year
 status - Изменить статус книги
+report - Показать число книг по статусам, авторам и годам
+stats - Показать статистику работы
 help - Показать доступные команды
 exit - Выйти из приложения
 """,
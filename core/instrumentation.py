@@ -0,0 +1,175 @@
+import json
+import time
+from typing import Callable
+from database.abstract_base import AbstractDatabase
+from database.proxy import DatabaseProxy
+
+BUCKETS = 32
+
+
+class Histogram:
+    """
+    Latency histogram with power-of-two microsecond buckets.
+
+    Bucket ``n`` holds latencies below 2**n microseconds, so recording is O(1) and the
+    percentiles are upper bounds within a factor of two.
+    """
+
+    def __init__(self):
+        self.buckets = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """
+        Adds one latency.
+
+        Args:
+            seconds (float): The latency in seconds.
+        """
+        micros = int(seconds * 1_000_000)
+        self.buckets[min(micros.bit_length(), BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Returns the upper bound of the bucket holding the given percentile.
+
+        Args:
+            fraction (float): The percentile as a fraction, e.g. 0.99.
+
+        Returns:
+            float: The latency bound in seconds, 0 if nothing was recorded.
+        """
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min((1 << bucket) / 1_000_000, self.max)
+        return 0.0
+
+    def to_dict(self) -> dict:
+        """
+        Summarises the histogram.
+
+        Returns:
+            dict: Counts and latencies in milliseconds.
+        """
+        return {
+            "calls": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+            "buckets_us": {str(1 << bucket): count for bucket, count in enumerate(self.buckets) if count},
+        }
+
+
+class Metrics:
+    """
+    Collects call latencies by operation name together with counters from other sources.
+    """
+
+    def __init__(self):
+        self.operations: dict[str, Histogram] = {}
+        self.errors: dict[str, int] = {}
+        self.sources: dict[str, Callable[[], dict[str, int]]] = {}
+
+    def record(self, name: str, seconds: float, failed: bool = False) -> None:
+        """
+        Records one call.
+
+        Args:
+            name (str): The operation name, e.g. "database.find_books".
+            seconds (float): The call latency.
+            failed (bool): Whether the call raised.
+        """
+        histogram = self.operations.get(name)
+        if histogram is None:
+            histogram = self.operations[name] = Histogram()
+        histogram.record(seconds)
+        if failed:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def timed(self, name: str, func: Callable, *args):
+        """
+        Calls a function and records its latency under the given name.
+
+        An exception counts as a failure. SystemExit and KeyboardInterrupt, which end the
+        program rather than the call, are passed through without being recorded.
+
+        Args:
+            name (str): The operation name.
+            func (Callable): The function to call.
+            *args: The positional arguments.
+
+        Returns:
+            Any: The result of the call.
+        """
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception:
+            self.record(name, time.perf_counter() - start, failed=True)
+            raise
+        self.record(name, time.perf_counter() - start)
+        return result
+
+    def add_source(self, name: str, counters: Callable[[], dict[str, int]]) -> None:
+        """
+        Registers a callable whose counters are included in every snapshot.
+
+        Args:
+            name (str): The name the counters are reported under.
+            counters (Callable[[], dict[str, int]]): Returns the current counter values.
+        """
+        self.sources[name] = counters
+
+    def snapshot(self) -> dict:
+        """
+        Returns all collected metrics.
+
+        Returns:
+            dict: Operations, errors and counters, ready for json.dump.
+        """
+        counters = {name: counters() for name, counters in self.sources.items()}
+        for values in counters.values():
+            lookups = values.get("cache_hits", 0) + values.get("cache_misses", 0)
+            if lookups:
+                values["cache_hit_rate_pct"] = round(values.get("cache_hits", 0) * 100 / lookups)
+        return {
+            "operations": {name: histogram.to_dict() for name, histogram in sorted(self.operations.items())},
+            "errors": dict(self.errors),
+            "counters": counters,
+        }
+
+    def dump(self, file_path: str) -> None:
+        """
+        Writes a snapshot as JSON.
+
+        Args:
+            file_path (str): The target path.
+        """
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(self.snapshot(), file, ensure_ascii=False, indent=4)
+
+
+class InstrumentedDatabase(DatabaseProxy):
+    """
+    Records the latency of every call to the wrapped database as "database.<method>".
+
+    iter_books is timed up to the creation of its iterator, not while it is consumed.
+    """
+
+    def __init__(self, database: AbstractDatabase, metrics: Metrics):
+        super().__init__(database)
+        self.metrics = metrics
+        metrics.add_source("database", database.counters)
+
+    def _call(self, name: str, *args):
+        return self.metrics.timed("database.%s" % name, getattr(self.database, name), *args)
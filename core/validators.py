@@ -0,0 +1,41 @@
+from datetime import datetime as dt
+
+from core.config import message, valid_status
+
+
+def validate_year(value: object) -> int:
+    """
+    Checks that a publication year is a number from 1 to the current year.
+
+    Args:
+        value (object): The year as entered or read from a file.
+
+    Returns:
+        int: The year.
+
+    Raises:
+        ValueError: If the year is not a number or is out of range.
+    """
+    year = int(str(value).strip())
+    if 1 <= year <= dt.utcnow().year:
+        return year
+    raise ValueError(message["invalid_year"] % str(dt.utcnow().year))
+
+
+def validate_status(value: object) -> str:
+    """
+    Checks that a status is one of the valid statuses.
+
+    Args:
+        value (object): The status as entered or read from a file.
+
+    Returns:
+        str: The capitalized status.
+
+    Raises:
+        ValueError: If the status is not in valid_status.
+    """
+    status = str(value).strip().capitalize()
+    if status in valid_status:
+        return status
+    raise ValueError(message["invalid_status"] % str(valid_status))
@@ -1,5 +1,11 @@
 from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Iterable, Iterator
 from models.models import Book
+from database.aggregates import Aggregates
+from database.indexes import rank_fuzzy
+from database.query import Condition
+from database.sorting import external_sort
 
 
 class AbstractDatabase(ABC):
@@ -22,6 +28,9 @@ class AbstractDatabase(ABC):
         """
         Saves books to a data source.
 
+        A book whose ID is already used by an earlier book of the list gets a fresh ID,
+        which is set on the Book instance itself.
+
         Args:
             books (List[Book]): A list of Book instances to be saved.
         """
@@ -32,11 +41,33 @@ class AbstractDatabase(ABC):
         """
         Adds a new book to the library.
 
+        If the ID of the book is already taken, the book gets a fresh ID, which is set on
+        the Book instance itself; ``book.id`` afterwards always holds the stored ID.
+
         Args:
             book (Book): The Book instance to be added.
         """
         raise NotImplementedError()
 
+    def add_books(self, books: Iterable[Book]) -> int:
+        """
+        Adds many books at once.
+
+        Backends should override this to persist the whole batch with one write. Taken IDs
+        are replaced as in add_book().
+
+        Args:
+            books (Iterable[Book]): The books to be added, possibly a lazy iterator.
+
+        Returns:
+            int: The number of books added.
+        """
+        count = 0
+        for book in books:
+            self.add_book(book)
+            count += 1
+        return count
+
     @abstractmethod
     def delete_book(self, book_id: str) -> bool:
         """
@@ -64,6 +95,53 @@ class AbstractDatabase(ABC):
         """
         raise NotImplementedError()
 
+    def fuzzy_find_books(self, query: str, field: str, limit: int = 10) -> list[Book]:
+        """
+        Finds the books whose field is most similar to the query, tolerating typos.
+
+        Books are ranked by the trigrams they share with the query. This default scores
+        every book; backends with a trigram index should override it.
+
+        Args:
+            query (str): The possibly misspelt search query.
+            field (str): The field to search by ('title', 'author', or 'year').
+            limit (int): The maximum number of books to return.
+
+        Returns:
+            List[Book]: The best matches, best first.
+        """
+        books = {book.id: book for book in self.load_books()}
+        return [books[book_id] for book_id in rank_fuzzy(
+            query, ((book.id, getattr(book, field)) for book in books.values()), limit,
+        )]
+
+    def query(self, conditions: list[Condition]) -> list[Book]:
+        """
+        Finds the books matching all conditions of a compound query.
+
+        This default checks every condition on each book in a single pass; backends with
+        indexes should override it to start from the most selective one.
+
+        Args:
+            conditions (list[Condition]): The conditions, all of which must hold.
+
+        Returns:
+            List[Book]: The matching books.
+        """
+        return [book for book in self.iter_books() if all(condition.matches(book) for condition in conditions)]
+
+    def aggregates(self) -> Aggregates:
+        """
+        Returns the book counts per status, author and year.
+
+        This default counts every book; backends that keep the counts up to date on every
+        mutation should override it.
+
+        Returns:
+            Aggregates: The counts. Callers must not change them.
+        """
+        return Aggregates(self.iter_books())
+
     @abstractmethod
     def change_book_status(self, book_id: str, new_status: str) -> bool:
         """
@@ -90,3 +168,84 @@ class AbstractDatabase(ABC):
             Book: The book with the matching ID, or None if no such book exists.
         """
         raise NotImplementedError()
+
+    def has_book(self, book_id: str) -> bool:
+        """
+        Checks whether a book with the given ID exists.
+
+        Backends with an ID index should override this to avoid building the Book.
+
+        Args:
+            book_id (str): The ID of the book.
+
+        Returns:
+            bool: True if the book exists.
+        """
+        return self.find_book(book_id) is not None
+
+    def flush(self) -> None:
+        """
+        Persists mutations that the database has applied but not yet written.
+        """
+
+    def close(self) -> None:
+        """
+        Persists pending mutations and releases files or connections held by the database.
+        """
+
+    def iter_books(self, offset: int = 0, limit: int | None = None) -> Iterator[Book]:
+        """
+        Lazily yields books in storage order, starting at ``offset``.
+
+        The iterator is the paging cursor: each page consumes only the records it shows.
+        Backends that can read records incrementally should override this.
+
+        Args:
+            offset (int): The number of books to skip.
+            limit (int | None): The maximum number of books to yield, or None for all.
+
+        Returns:
+            Iterator[Book]: The books.
+        """
+        stop = None if limit is None else offset + limit
+        return islice(self.load_books(), offset, stop)
+
+    def iter_sorted(self, field: str, buffer_size: int) -> Iterator[Book]:
+        """
+        Lazily yields all books in ascending order of a field.
+
+        This default runs an external merge sort over iter_books(), so at most
+        ``buffer_size`` books are held in memory and longer catalogues spill sorted runs to
+        temporary files. Backends that keep every book in memory or can sort natively
+        should override it.
+
+        Args:
+            field (str): "title", "author" or "year".
+            buffer_size (int): The number of books the sort may hold in memory.
+
+        Returns:
+            Iterator[Book]: The books, in insertion order among equal values.
+        """
+        return external_sort(self.iter_books(), field, buffer_size)
+
+    def counters(self) -> dict[str, int]:
+        """
+        Returns I/O and cache counters kept by the backend, such as bytes read and written.
+
+        Returns:
+            dict[str, int]: Counter values by name, empty if the backend keeps none.
+        """
+        return {}
+
+    def data_version(self) -> object:
+        """
+        Returns a token that changes whenever the stored books may have changed.
+
+        Backends whose storage another process may write should override this, so callers
+        caching results can tell when they are outdated. Backends that see every change
+        through their own methods may keep the default.
+
+        Returns:
+            object: A comparable token, or None if the backend cannot tell.
+        """
+        return None
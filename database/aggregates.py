@@ -0,0 +1,126 @@
+from collections import Counter
+from typing import Iterable
+from models.models import Book
+
+AGGREGATE_FIELDS = ("status", "author", "year")
+
+
+class Aggregates:
+    """
+    Book counts per status, per author and per year.
+
+    Every mutation adjusts a few counters, so a question such as "how many books are out"
+    is a dict lookup instead of a scan. Values are counted exactly as stored.
+    """
+
+    def __init__(self, books: Iterable[Book] = ()):
+        self.total = 0
+        self._counts: dict[str, Counter] = {field: Counter() for field in AGGREGATE_FIELDS}
+        for book in books:
+            self.add(book)
+
+    @classmethod
+    def from_counts(cls, counts: dict[str, Iterable[tuple[object, int]]]) -> "Aggregates":
+        """
+        Creates aggregates from counts computed elsewhere, such as by a GROUP BY.
+
+        Args:
+            counts (dict[str, Iterable[tuple[object, int]]]): (value, count) pairs for every
+                field of AGGREGATE_FIELDS.
+
+        Returns:
+            Aggregates: The counts.
+        """
+        aggregates = cls()
+        for field in AGGREGATE_FIELDS:
+            aggregates._counts[field].update(dict(counts[field]))
+        aggregates.total = sum(aggregates._counts["status"].values())
+        return aggregates
+
+    def add(self, book: Book) -> None:
+        """
+        Counts a new book.
+
+        Args:
+            book (Book): The book.
+        """
+        self.total += 1
+        for field, counts in self._counts.items():
+            counts[getattr(book, field)] += 1
+
+    def remove(self, book: Book) -> None:
+        """
+        Stops counting a removed book.
+
+        Args:
+            book (Book): The book, with the field values it was counted with.
+        """
+        self.total -= 1
+        for field, counts in self._counts.items():
+            value = getattr(book, field)
+            counts[value] -= 1
+            if not counts[value]:
+                del counts[value]
+
+    def change_status(self, old_status: str, new_status: str) -> None:
+        """
+        Moves one book from one status to another.
+
+        Args:
+            old_status (str): The previous status.
+            new_status (str): The new status.
+        """
+        counts = self._counts["status"]
+        counts[old_status] -= 1
+        if not counts[old_status]:
+            del counts[old_status]
+        counts[new_status] += 1
+
+    def update(self, other: "Aggregates") -> None:
+        """
+        Adds the counts of another set of books, such as another shard.
+
+        Args:
+            other (Aggregates): The counts to add.
+        """
+        self.total += other.total
+        for field, counts in self._counts.items():
+            counts.update(other._counts[field])
+
+    def count(self, field: str, value: object) -> int:
+        """
+        Returns the number of books with the given value of a field.
+
+        Args:
+            field (str): One of AGGREGATE_FIELDS.
+            value (object): The value.
+
+        Returns:
+            int: The number of books.
+        """
+        return self._counts[field][value]
+
+    def distinct(self, field: str) -> int:
+        """
+        Returns the number of distinct values of a field.
+
+        Args:
+            field (str): One of AGGREGATE_FIELDS.
+
+        Returns:
+            int: The number of values held by at least one book.
+        """
+        return len(self._counts[field])
+
+    def top(self, field: str, limit: int) -> list[tuple[object, int]]:
+        """
+        Returns the most common values of a field.
+
+        Args:
+            field (str): One of AGGREGATE_FIELDS.
+            limit (int): The maximum number of values.
+
+        Returns:
+            list[tuple[object, int]]: The values with their counts, most common first.
+        """
+        return self._counts[field].most_common(limit)
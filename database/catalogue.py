@@ -0,0 +1,362 @@
+import uuid
+import sys
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+from models.models import Book
+from database.aggregates import Aggregates
+from database.indexes import TrigramIndex, ValueIndex
+from database.query import Condition, CONTAINS, EQUALS
+
+PAGE_CHUNK = 256
+
+
+class Catalogue:
+    """
+    In-memory set of books kept in insertion order and indexed by book ID.
+
+    The ID index is the storage itself: a dict preserves insertion order, so lookups,
+    deletes and status changes by ID are O(1) while iteration keeps the file order.
+    Trigram indexes for substring search are built per field on the first search and
+    maintained on every later mutation, and so are the value indexes of the year and the
+    status used by compound queries. Book counts per status, author and year are kept in
+    ``aggregates`` from the start.
+
+    An optional ``loader`` is asked for a saved index, by kind ("trigram" or "value") and
+    field, before one is built. A saved index is used only if it covers exactly the books
+    of the catalogue.
+
+    A book added under an ID that is already taken gets an ID derived from the taken one
+    and its position, so loading the same file always gives the same IDs; ``renumbered``
+    counts such books.
+    """
+
+    def __init__(
+        self,
+        books: Iterable[Book] = (),
+        loader: Callable[[str, str], TrigramIndex | ValueIndex | None] | None = None,
+    ):
+        self._books: dict[str, Book] = {}
+        self._indexes: dict[str, TrigramIndex] = {}
+        self._values: dict[str, ValueIndex] = {}
+        self._loader = loader
+        self.aggregates = Aggregates()
+        self.renumbered = 0
+        self._changes = 0
+        for book in books:
+            self.add(book)
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def __contains__(self, book_id: object) -> bool:
+        return book_id in self._books
+
+    def __iter__(self) -> Iterator[Book]:
+        return iter(self._books.values())
+
+    def books(self) -> list[Book]:
+        """
+        Returns the books in insertion order.
+
+        Returns:
+            list[Book]: A new list with the stored books.
+        """
+        return list(self._books.values())
+
+    def page(self, offset: int = 0, stop: int | None = None) -> Iterator[Book]:
+        """
+        Lazily yields a range of books in insertion order from snapshots of their IDs.
+
+        The IDs are copied PAGE_CHUNK at a time, the first chunk when this is called, so the
+        first page costs the offset plus one chunk however long the range is. The iterator
+        may be consumed while the catalogue changes: books removed in the meantime are
+        skipped, and books added in the meantime may be yielded at the end. The caller
+        should hold the lock that guards mutations while calling it.
+
+        Args:
+            offset (int): The number of books to skip.
+            stop (int | None): The position to stop at, or None for the end.
+
+        Returns:
+            Iterator[Book]: The books.
+        """
+        ids = iter(self._books)
+        chunk = list(islice(ids, offset, offset + PAGE_CHUNK if stop is None else min(stop, offset + PAGE_CHUNK)))
+        return self._page(ids, chunk, offset, stop, self._changes)
+
+    def _page(
+        self, ids: Iterator[str], chunk: list[str], position: int, stop: int | None, changes: int,
+    ) -> Iterator[Book]:
+        """
+        Yields the books of one chunk of IDs after another, for page().
+
+        The dict iterator is only advanced while the catalogue has not been added to or
+        removed from; after a change the rest of the IDs is copied once, starting after the
+        last book of the chunk that still exists.
+        """
+        while chunk:
+            yield from (book for book in map(self._books.get, chunk) if book is not None)
+            position += len(chunk)
+            size = PAGE_CHUNK if stop is None else min(PAGE_CHUNK, stop - position)
+            if size <= 0:
+                return
+            if changes != self._changes:
+                changes = self._changes
+                remaining = list(self._books)
+                start = next((
+                    remaining.index(book_id) + 1 for book_id in reversed(chunk) if book_id in self._books
+                ), min(position - len(chunk), len(remaining)))
+                ids = iter(remaining[start:])
+            chunk = list(islice(ids, size))
+
+    def add(self, book: Book) -> str:
+        """
+        Adds a book to the catalogue.
+
+        A book whose ID is already taken gets a fresh one, so every ID stays a primary key.
+        This keeps every book of a legacy file whose books share an ID. The fresh ID is the
+        UUID5 of the taken ID and the position of the book, so the same file is always
+        renumbered the same way even if it is never written back. It is set on the given
+        book itself and returned, so the caller learns where the book went.
+
+        Args:
+            book (Book): The book to add.
+
+        Returns:
+            str: The ID the book is stored under.
+        """
+        if book.id in self._books:
+            position = len(self._books)
+            taken = book.id
+            while book.id in self._books:
+                book.id = str(uuid.uuid5(uuid.NAMESPACE_URL, "%s#%d" % (taken, position)))
+                position += 1
+            self.renumbered += 1
+        self._books[book.id] = book
+        self._changes += 1
+        self.aggregates.add(book)
+        for field, index in self._indexes.items():
+            index.add(book.id, getattr(book, field))
+        for field, values in self._values.items():
+            values.add(book.id, getattr(book, field))
+        return book.id
+
+    def remove(self, book_id: str) -> Book | None:
+        """
+        Removes a book by its ID.
+
+        Args:
+            book_id (str): The ID of the book to remove.
+
+        Returns:
+            Book | None: The removed book, or None if no such book exists.
+        """
+        book = self._books.pop(book_id, None)
+        if book is not None:
+            self._changes += 1
+            self.aggregates.remove(book)
+            for index in self._indexes.values():
+                index.remove(book_id)
+            for values in self._values.values():
+                values.remove(book_id)
+        return book
+
+    def get(self, book_id: str) -> Book | None:
+        """
+        Returns a book by its ID.
+
+        Args:
+            book_id (str): The ID of the book.
+
+        Returns:
+            Book | None: The book, or None if no such book exists.
+        """
+        return self._books.get(book_id)
+
+    def set_status(self, book_id: str, new_status: str) -> bool:
+        """
+        Changes the status of a book by its ID.
+
+        Args:
+            book_id (str): The ID of the book.
+            new_status (str): The new status of the book.
+
+        Returns:
+            bool: True if the status was changed, False if the book was not found.
+        """
+        book = self._books.get(book_id)
+        if book is None:
+            return False
+        new_status = sys.intern(new_status)
+        self.aggregates.change_status(book.status, new_status)
+        book.status = new_status
+        if index := self._indexes.get("status"):
+            index.remove(book_id)
+            index.add(book_id, new_status)
+        if values := self._values.get("status"):
+            values.remove(book_id)
+            values.add(book_id, new_status)
+        return True
+
+    def search(self, query: str, field: str) -> list[Book]:
+        """
+        Finds the books whose field contains the query, ignoring case.
+
+        Args:
+            query (str): The search query.
+            field (str): The field to search by.
+
+        Returns:
+            list[Book]: The matching books in insertion order.
+        """
+        return [self._books[book_id] for book_id in self._index(field).search(query)]
+
+    def fuzzy_search(self, query: str, field: str, limit: int) -> list[Book]:
+        """
+        Finds the books whose field is most similar to a possibly misspelt query.
+
+        Args:
+            query (str): The search query.
+            field (str): The field to search by.
+            limit (int): The maximum number of books to return.
+
+        Returns:
+            list[Book]: The best matches, best first.
+        """
+        return [self._books[book_id] for book_id in self._index(field).similar(query, limit)]
+
+    def plan(self, conditions: list[Condition]) -> list[tuple[Condition, int]]:
+        """
+        Orders the conditions of a compound query by their estimated selectivity.
+
+        An ID is looked up directly, the year and the status are counted in their value
+        indexes, and text conditions are bounded by the shortest trigram posting list. An
+        equality on a text field is bounded like a substring search for the same text.
+
+        Args:
+            conditions (list[Condition]): The conditions of the query.
+
+        Returns:
+            list[tuple[Condition, int]]: Each condition with an upper bound on the number of
+                books matching it, most selective first.
+        """
+        estimates = []
+        for condition in conditions:
+            if condition.field == "id" and condition.op == EQUALS:
+                estimate = int(condition.value in self._books)
+            elif condition.op != CONTAINS and condition.field in ("year", "status"):
+                estimate = self._value_index(condition.field).count(*self._bounds(condition))
+            else:
+                estimate = self._index(condition.field).estimate(str(condition.value))
+            estimates.append((condition, estimate))
+        return sorted(estimates, key=lambda item: item[1])
+
+    def query(self, conditions: list[Condition]) -> list[Book]:
+        """
+        Finds the books matching all conditions of a compound query.
+
+        Candidates come from the index of the most selective condition; only they are
+        checked against the remaining ones, so no condition costs a full scan of its own.
+
+        Args:
+            conditions (list[Condition]): The conditions, all of which must hold.
+
+        Returns:
+            list[Book]: The matching books, in the order of the index the plan starts from:
+                insertion order, or ascending year for a year range.
+        """
+        if not conditions:
+            return self.books()
+        driver = self.plan(conditions)[0][0]
+        books = self._books
+        return [
+            book for book in (books[book_id] for book_id in self._candidates(driver))
+            if all(condition.matches(book) for condition in conditions)
+        ]
+
+    def _candidates(self, condition: Condition) -> list[str]:
+        """
+        Returns the IDs of a superset of the books matching one condition, using its index.
+        """
+        if condition.field == "id" and condition.op == EQUALS:
+            return [str(condition.value)] if condition.value in self._books else []
+        if condition.op != CONTAINS and condition.field in ("year", "status"):
+            return list(self._value_index(condition.field).ids(*self._bounds(condition)))
+        return self._index(condition.field).search(str(condition.value))
+
+    @staticmethod
+    def _bounds(condition: Condition) -> tuple:
+        """
+        Returns the inclusive value range of an equality or a range condition.
+        """
+        return condition.value if isinstance(condition.value, tuple) else (condition.value, condition.value)
+
+    def _value_index(self, field: str) -> ValueIndex:
+        """
+        Returns the value index of a field, building it on first use.
+
+        Args:
+            field (str): The field name.
+
+        Returns:
+            ValueIndex: The index.
+        """
+        values = self._values.get(field)
+        if values is None:
+            saved = self._load("value", field)
+            if isinstance(saved, ValueIndex):
+                values = saved
+            else:
+                values = ValueIndex((book.id, getattr(book, field)) for book in self._books.values())
+            self._values[field] = values
+        return values
+
+    def _load(self, kind: str, field: str) -> TrigramIndex | ValueIndex | None:
+        """
+        Asks the loader for a saved index and checks that it covers exactly these books.
+
+        Args:
+            kind (str): "trigram" or "value".
+            field (str): The field name.
+
+        Returns:
+            TrigramIndex | ValueIndex | None: The saved index, or None if there is none.
+        """
+        if self._loader is None:
+            return None
+        index = self._loader(kind, field)
+        if index is None or len(index) != len(self._books) or index.book_ids() != self._books.keys():
+            return None
+        return index
+
+    def built_indexes(self) -> Iterator[tuple[str, str, TrigramIndex | ValueIndex]]:
+        """
+        Yields the indexes built or loaded so far, to be saved for the next start.
+
+        Returns:
+            Iterator[tuple[str, str, TrigramIndex | ValueIndex]]: The kind, field and index.
+        """
+        for field, index in self._indexes.items():
+            yield "trigram", field, index
+        for field, values in self._values.items():
+            yield "value", field, values
+
+    def _index(self, field: str) -> TrigramIndex:
+        """
+        Returns the trigram index of a field, building it on first use.
+
+        Args:
+            field (str): The field name.
+
+        Returns:
+            TrigramIndex: The index.
+        """
+        index = self._indexes.get(field)
+        if index is None:
+            saved = self._load("trigram", field)
+            if isinstance(saved, TrigramIndex):
+                index = saved
+            else:
+                index = TrigramIndex((book.id, getattr(book, field)) for book in self._books.values())
+            self._indexes[field] = index
+        return index
@@ -0,0 +1,390 @@
+import uuid
+from array import array
+from typing import Callable, Iterable, Iterator
+import numpy as np
+from models.models import Book
+from database.abstract_base import AbstractDatabase
+from database.aggregates import Aggregates
+from database.json_database import JsonDatabase
+from database.query import Condition, CONTAINS, EQUALS
+from core.config import valid_status
+
+SEPARATOR = "\0"
+
+
+class ColumnarDatabase(AbstractDatabase):
+    """
+    A class to handle database operations with an in-memory column store over a JSON file.
+
+    Books are held as columns instead of objects: ``year`` as an int32 array, ``status`` as
+    an int8 code into a small status table, and title and author as lists plus a lowercased,
+    separator-joined text blob with a row offset array. Year and status filters are NumPy
+    mask operations, and substring searches run ``str.find`` over the blob and map hits back
+    to rows with ``searchsorted``. Compound queries AND the masks of their conditions, and
+    the report counts status codes with ``bincount`` and years and authors with
+    ``np.unique``. The JSON file at ``file_path`` is read on start and rewritten atomically
+    after every mutation.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._storage = JsonDatabase(file_path)
+        self._reset(self._storage.load_books())
+
+    def _reset(self, books: Iterable[Book]) -> None:
+        """
+        Replaces all columns with the given books.
+
+        Args:
+            books (Iterable[Book]): The books to hold.
+        """
+        self._ids: list[str] = []
+        self._titles: list[str] = []
+        self._authors: list[str] = []
+        self._years = array("i")
+        self._codes = array("b")
+        self._alive = array("b")
+        self._rows: dict[str, int] = {}
+        self._statuses: list[str] = list(valid_status)
+        self._blobs: dict[str, tuple[str, np.ndarray]] = {}
+        for book in books:
+            self._append(book)
+
+    def _status_code(self, status: str) -> int:
+        if status not in self._statuses:
+            self._statuses.append(status)
+        return self._statuses.index(status)
+
+    def _append(self, book: Book) -> None:
+        """
+        Appends a book as a new row.
+
+        Args:
+            book (Book): The book to append. A taken ID is replaced with a fresh one.
+        """
+        if book.id in self._rows:
+            book.id = str(uuid.uuid4())
+        self._rows[book.id] = len(self._ids)
+        self._ids.append(book.id)
+        self._titles.append(book.title)
+        self._authors.append(book.author)
+        self._years.append(int(book.year))
+        self._codes.append(self._status_code(book.status))
+        self._alive.append(1)
+        self._blobs.clear()
+
+    def _book(self, row: int) -> Book:
+        return Book(
+            self._titles[row], self._authors[row], self._years[row], self._ids[row],
+            self._statuses[self._codes[row]],
+        )
+
+    def _live_rows(self) -> Iterator[int]:
+        return (row for row in range(len(self._ids)) if self._alive[row])
+
+    def _books(self, mask: np.ndarray) -> list[Book]:
+        """
+        Builds the books of the live rows selected by a mask.
+
+        Args:
+            mask (np.ndarray): A boolean mask over all rows.
+
+        Returns:
+            list[Book]: The selected books in insertion order.
+        """
+        return [self._book(int(row)) for row in np.flatnonzero(mask & self._alive_mask())]
+
+    def _blob(self, field: str) -> tuple[str, np.ndarray]:
+        """
+        Returns the lowercased text column of a field and the start offset of every row.
+
+        Args:
+            field (str): "title" or "author".
+
+        Returns:
+            tuple[str, np.ndarray]: The joined text and the row offsets.
+        """
+        if field not in self._blobs:
+            values = [value.lower() for value in (self._titles if field == "title" else self._authors)]
+            lengths = np.fromiter((len(value) + 1 for value in values), dtype=np.int64, count=len(values))
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(values) else lengths
+            self._blobs[field] = (SEPARATOR.join(values), offsets)
+        return self._blobs[field]
+
+    def _alive_mask(self) -> np.ndarray:
+        return np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+
+    def _persist(self) -> None:
+        self._storage.save_books(self.load_books())
+
+    def _text_mask(self, needle: str, field: str) -> np.ndarray:
+        """
+        Marks the rows whose title or author contains the needle.
+        """
+        mask = np.zeros(len(self._ids), dtype=bool)
+        if SEPARATOR in needle:
+            return mask
+        if not needle:
+            mask[:] = True
+            return mask
+        blob, offsets = self._blob(field)
+        hits = []
+        position = blob.find(needle)
+        while position != -1:
+            hits.append(position)
+            position = blob.find(needle, position + 1)
+        if hits:
+            mask[np.searchsorted(offsets, np.array(hits), side="right") - 1] = True
+        return mask
+
+    def _year_text_mask(self, needle: str) -> np.ndarray:
+        """
+        Marks the rows whose year, written out, contains the needle.
+        """
+        years = np.frombuffer(self._years, dtype=np.int32)
+        if not len(years):
+            return np.zeros(0, dtype=bool)
+        matching = [year for year in range(int(years.min()), int(years.max()) + 1) if needle in str(year)]
+        return np.isin(years, matching)
+
+    def _status_mask(self, matches: Callable[[str], bool]) -> np.ndarray:
+        """
+        Marks the rows whose status satisfies a predicate, checking each status name once.
+        """
+        codes = [code for code, status in enumerate(self._statuses) if matches(status.lower())]
+        return np.isin(np.frombuffer(self._codes, dtype=np.int8), codes)
+
+    def _condition_mask(self, condition: Condition) -> np.ndarray | None:
+        """
+        Marks the rows matching a condition with column operations.
+
+        Args:
+            condition (Condition): The condition.
+
+        Returns:
+            np.ndarray | None: A boolean mask over all rows, or None if the condition has
+                to be checked book by book.
+        """
+        field, value = condition.field, condition.value
+        if field == "year":
+            years = np.frombuffer(self._years, dtype=np.int32)
+            if isinstance(value, tuple):
+                low, high = value
+                mask = np.ones(len(years), dtype=bool)
+                if low is not None:
+                    mask &= years >= low
+                if high is not None:
+                    mask &= years <= high
+                return mask
+            if condition.op == EQUALS:
+                return years == value
+            return self._year_text_mask(str(value))
+        if field == "status":
+            if condition.op == CONTAINS:
+                return self._status_mask(lambda status: str(value) in status)
+            return self._status_mask(lambda status: status == value)
+        if field in ("title", "author") and condition.op == CONTAINS:
+            return self._text_mask(str(value), field)
+        if field == "id" and condition.op == EQUALS:
+            mask = np.zeros(len(self._ids), dtype=bool)
+            row = self._rows.get(str(value))
+            if row is not None:
+                mask[row] = True
+            return mask
+        return None
+
+    def counters(self) -> dict[str, int]:
+        """
+        Returns the I/O counters of the JSON file behind the store.
+
+        Returns:
+            dict[str, int]: Bytes read and written and file writes.
+        """
+        return self._storage.counters()
+
+    def load_books(self) -> list[Book]:
+        """
+        Builds the books from the columns.
+
+        Returns:
+            List[Book]: A list of Book instances.
+        """
+        return [self._book(row) for row in self._live_rows()]
+
+    def iter_books(self, offset: int = 0, limit: int | None = None) -> Iterator[Book]:
+        """
+        Lazily builds books from the columns, starting at ``offset``.
+
+        Args:
+            offset (int): The number of books to skip.
+            limit (int | None): The maximum number of books to yield, or None for all.
+
+        Returns:
+            Iterator[Book]: The books.
+        """
+        for number, row in enumerate(self._live_rows()):
+            if limit is not None and number >= offset + limit:
+                return
+            if number >= offset:
+                yield self._book(row)
+
+    def save_books(self, books: list[Book]) -> None:
+        """
+        Replaces the contents of the store and the file with the given books.
+
+        Args:
+            books (List[Book]): A list of Book instances to be saved.
+        """
+        self._reset(books)
+        self._persist()
+
+    def add_book(self, book: Book) -> None:
+        """
+        Adds a new book to the library.
+
+        Args:
+            book (Book): The Book instance to be added.
+        """
+        self._append(book)
+        self._persist()
+
+    def add_books(self, books: Iterable[Book]) -> int:
+        """
+        Adds many books with a single rewrite of the file.
+
+        Args:
+            books (Iterable[Book]): The books to be added.
+
+        Returns:
+            int: The number of books added.
+        """
+        count = len(self._rows)
+        for book in books:
+            self._append(book)
+        self._persist()
+        return len(self._rows) - count
+
+    def delete_book(self, book_id: str) -> bool:
+        """
+        Deletes a book from the library by its ID.
+
+        Args:
+            book_id (str): The ID of the book to be deleted.
+
+        Returns:
+            bool: True if the book was deleted, False if the book was not found.
+        """
+        row = self._rows.pop(book_id, None)
+        if row is None:
+            return False
+        self._alive[row] = 0
+        if len(self._rows) * 2 < len(self._ids):
+            self._reset(self.load_books())
+        self._persist()
+        return True
+
+    def find_books(self, query: str, field: str) -> list[Book]:
+        """
+        Searches for books by a specified field (title, author, year or status).
+
+        Args:
+            query (str): The search query.
+            field (str): The field to search by ('title', 'author', or 'year').
+
+        Returns:
+            List[Book]: A list of Book instances that match the search criteria.
+        """
+        needle = str(query).lower()
+        if field in ("title", "author"):
+            return self._books(self._text_mask(needle, field))
+        if field == "year":
+            return self._books(self._year_text_mask(needle))
+        if field == "status":
+            return self._books(self._status_mask(lambda status: needle in status))
+        if field == "id":
+            return [self._book(row) for row in self._live_rows() if needle in self._ids[row].lower()]
+        raise AttributeError(field)
+
+    def query(self, conditions: list[Condition]) -> list[Book]:
+        """
+        Finds the books matching all conditions of a compound query.
+
+        The year, the status, substring searches in the title and author, and an ID lookup
+        become masks that are ANDed together; only the rows left are built as books and
+        checked against the remaining conditions, such as a whole-title equality.
+
+        Args:
+            conditions (list[Condition]): The conditions, all of which must hold.
+
+        Returns:
+            List[Book]: The matching books in insertion order.
+        """
+        mask = np.ones(len(self._ids), dtype=bool)
+        remaining = []
+        for condition in conditions:
+            condition_mask = self._condition_mask(condition)
+            if condition_mask is None:
+                remaining.append(condition)
+            else:
+                mask &= condition_mask
+        return [book for book in self._books(mask) if all(condition.matches(book) for condition in remaining)]
+
+    def aggregates(self) -> Aggregates:
+        """
+        Counts the books per status, author and year with column operations.
+
+        Returns:
+            Aggregates: The counts.
+        """
+        alive = self._alive_mask()
+        codes = np.bincount(np.frombuffer(self._codes, dtype=np.int8)[alive], minlength=len(self._statuses))
+        years, year_counts = np.unique(np.frombuffer(self._years, dtype=np.int32)[alive], return_counts=True)
+        authors, author_counts = np.unique(np.array(self._authors, dtype=object)[alive], return_counts=True)
+        return Aggregates.from_counts({
+            "status": [(status, int(codes[code])) for code, status in enumerate(self._statuses) if codes[code]],
+            "author": zip(authors.tolist(), author_counts.tolist()),
+            "year": zip(years.tolist(), year_counts.tolist()),
+        })
+
+    def change_book_status(self, book_id: str, new_status: str) -> bool:
+        """
+        Changes the status of a book by its ID.
+
+        Args:
+            book_id (str): The ID of the book.
+            new_status (str): The new status of the book ('в наличии' or 'выдана').
+
+        Returns:
+            bool: True if the status was changed, False if the book was not found.
+        """
+        row = self._rows.get(book_id)
+        if row is None:
+            return False
+        self._codes[row] = self._status_code(new_status)
+        self._persist()
+        return True
+
+    def find_book(self, book_id: str) -> Book | None:
+        """
+        Finds and returns a book by its ID.
+
+        Args:
+            book_id (str): The ID of the book to find.
+
+        Returns:
+            Book: The book with the matching ID, or None if no such book exists.
+        """
+        row = self._rows.get(book_id)
+        return None if row is None else self._book(row)
+
+    def has_book(self, book_id: str) -> bool:
+        """
+        Checks whether a book with the given ID exists.
+
+        Args:
+            book_id (str): The ID of the book.
+
+        Returns:
+            bool: True if the book exists.
+        """
+        return book_id in self._rows
@@ -0,0 +1,73 @@
+import json
+import os
+import tempfile
+from typing import IO, Callable
+
+
+def fsync_directory(path: str) -> None:
+    """
+    Flushes a directory entry so a rename inside it survives a crash.
+
+    Args:
+        path (str): The directory path.
+    """
+    if os.name != "posix":
+        return
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def atomic_write(file_path: str, write: Callable[[IO], object], binary: bool = False, fsync: bool = True) -> int:
+    """
+    Writes a temporary file next to the target and renames it over the target.
+
+    Readers and crashes see either the old or the new file, never a truncated one.
+
+    Args:
+        file_path (str): The target path.
+        write (Callable[[IO], object]): Writes the content to the open temporary file.
+        binary (bool): Whether the file is opened in binary rather than UTF-8 text mode.
+        fsync (bool): Whether to flush the file and the directory to disk.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=".%s." % os.path.basename(file_path))
+    try:
+        with os.fdopen(descriptor, "wb" if binary else "w", encoding=None if binary else "utf-8") as file:
+            write(file)
+            file.flush()
+            if fsync:
+                os.fsync(file.fileno())
+            written = file.tell()
+        if os.path.exists(file_path):
+            os.chmod(temp_path, os.stat(file_path).st_mode)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    if fsync:
+        fsync_directory(directory)
+    return written
+
+
+def atomic_write_json(file_path: str, data: object, indent: int | None = None, fsync: bool = True) -> int:
+    """
+    Atomically replaces a file with JSON.
+
+    Args:
+        file_path (str): The target path.
+        data (object): The JSON-serialisable data.
+        indent (int | None): The indentation passed to json.dump.
+        fsync (bool): Whether to flush the file and the directory to disk.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    return atomic_write(
+        file_path, lambda file: json.dump(data, file, ensure_ascii=False, indent=indent), fsync=fsync,
+    )
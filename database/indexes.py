@@ -0,0 +1,350 @@
+import bisect
+import heapq
+import math
+from collections import Counter
+from typing import Iterable, Iterator, KeysView
+
+GRAM_SIZE = 3
+FUZZY_THRESHOLD = 0.4
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    Splits a lowercased text into its distinct character trigrams.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        set[str]: The trigrams of the text, empty if it is shorter than three characters.
+    """
+    return {text[pos:pos + GRAM_SIZE] for pos in range(len(text) - GRAM_SIZE + 1)}
+
+
+def similarity(query_grams: set[str], text: str) -> tuple[float, float]:
+    """
+    Scores a text against the trigrams of a query.
+
+    Args:
+        query_grams (set[str]): The trigrams of the lowercased query.
+        text (str): The lowercased text.
+
+    Returns:
+        tuple[float, float]: The share of query trigrams found in the text, then the Jaccard
+            similarity of both trigram sets, which prefers texts without extra words.
+    """
+    grams = trigrams(text)
+    shared = len(query_grams & grams)
+    union = len(query_grams) + len(grams) - shared
+    return (shared / len(query_grams) if query_grams else 0.0), (shared / union if union else 0.0)
+
+
+def rank_fuzzy(query: str, entries: Iterable[tuple[str, object]], limit: int) -> list[str]:
+    """
+    Ranks values by trigram similarity to a query by scoring every one of them.
+
+    This is the brute-force counterpart of TrigramIndex.similar and finds the same matches.
+
+    Args:
+        query (str): The possibly misspelt query.
+        entries (Iterable[tuple[str, object]]): (ID, value) pairs.
+        limit (int): The maximum number of IDs to return.
+
+    Returns:
+        list[str]: The IDs of the best matches, best first.
+    """
+    needle = str(query).lower()
+    grams = trigrams(needle)
+    if not grams:
+        return [key for key, value in entries if needle in str(value).lower()][:limit]
+    scored = []
+    for key, value in entries:
+        score = similarity(grams, str(value).lower())
+        if score[0] >= FUZZY_THRESHOLD:
+            scored.append((score, key))
+    return [key for _, key in heapq.nlargest(limit, scored, key=lambda item: item[0])]
+
+
+class TrigramIndex:
+    """
+    Inverted index from character trigrams to the IDs of the books containing them.
+
+    Every substring of three or more characters contains all of its own trigrams, so the
+    intersection of their posting lists is a superset of the substring matches. Candidates
+    are then checked against the stored lowercased value, which keeps the exact semantics
+    of the ``query in value`` scan. Posting lists are dicts used as ordered sets, so results
+    come back in the order the books were added.
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, object]] = ()):
+        self._values: dict[str, str] = {}
+        self._postings: dict[str, dict[str, None]] = {}
+        for book_id, value in entries:
+            self.add(book_id, value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "TrigramIndex":
+        """
+        Restores an index from the value returned by state().
+
+        Args:
+            state (tuple): The saved state.
+
+        Returns:
+            TrigramIndex: The index.
+        """
+        index = cls()
+        index._values, index._postings = state
+        return index
+
+    def state(self) -> tuple:
+        """
+        Returns the contents of the index as plain dicts, which marshal can save.
+
+        Returns:
+            tuple: The indexed values and the posting lists.
+        """
+        return self._values, self._postings
+
+    def book_ids(self) -> KeysView[str]:
+        """
+        Returns the IDs of the indexed books.
+
+        Returns:
+            KeysView[str]: A live view of the IDs.
+        """
+        return self._values.keys()
+
+    def add(self, book_id: str, value: object) -> None:
+        """
+        Indexes the value of a book field.
+
+        Args:
+            book_id (str): The ID of the book.
+            value (object): The field value, indexed as its lowercased string.
+        """
+        text = str(value).lower()
+        self._values[book_id] = text
+        for gram in trigrams(text):
+            self._postings.setdefault(gram, {})[book_id] = None
+
+    def remove(self, book_id: str) -> None:
+        """
+        Drops a book from the index.
+
+        Args:
+            book_id (str): The ID of the book.
+        """
+        text = self._values.pop(book_id, None)
+        if text is None:
+            return
+        for gram in trigrams(text):
+            posting = self._postings[gram]
+            del posting[book_id]
+            if not posting:
+                del self._postings[gram]
+
+    def search(self, query: str) -> list[str]:
+        """
+        Returns the IDs of the books whose value contains the query.
+
+        Args:
+            query (str): The substring to look for.
+
+        Returns:
+            list[str]: The matching IDs in insertion order.
+        """
+        needle = str(query).lower()
+        grams = trigrams(needle)
+        if not grams:
+            return [book_id for book_id, text in self._values.items() if needle in text]
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        smallest, others = postings[0], postings[1:]
+        values = self._values
+        return [
+            book_id for book_id in smallest
+            if all(book_id in posting for posting in others) and needle in values[book_id]
+        ]
+
+    def estimate(self, query: str) -> int:
+        """
+        Returns an upper bound on the number of books search() will return for the query.
+
+        Args:
+            query (str): The substring to look for.
+
+        Returns:
+            int: The size of the shortest posting list of the query trigrams, or the number
+                of indexed books if the query is too short to have trigrams.
+        """
+        grams = trigrams(str(query).lower())
+        if not grams:
+            return len(self._values)
+        return min(len(self._postings.get(gram, ())) for gram in grams)
+
+    def similar(self, query: str, limit: int) -> list[str]:
+        """
+        Returns the IDs of the values most similar to the query, tolerating typos.
+
+        Only the posting lists of the query trigrams are read: a value that shares fewer
+        than FUZZY_THRESHOLD of them is never scored. The rest are ranked by similarity(),
+        computed once per distinct value, since many books share an author.
+
+        Args:
+            query (str): The possibly misspelt query.
+            limit (int): The maximum number of IDs to return.
+
+        Returns:
+            list[str]: The IDs of the best matches, best first.
+        """
+        needle = str(query).lower()
+        grams = trigrams(needle)
+        if not grams:
+            return self.search(needle)[:limit]
+        counts: Counter[str] = Counter()
+        for gram in grams:
+            counts.update(self._postings.get(gram, {}).keys())
+        required = math.ceil(FUZZY_THRESHOLD * len(grams))
+        values = self._values
+        scores: dict[str, tuple[float, float]] = {}
+        scored = []
+        for book_id, shared in counts.items():
+            if shared >= required:
+                text = values[book_id]
+                score = scores.get(text)
+                if score is None:
+                    score = scores[text] = similarity(grams, text)
+                scored.append((score, book_id))
+        return [book_id for _, book_id in heapq.nlargest(limit, scored, key=lambda item: item[0])]
+
+
+class ValueIndex:
+    """
+    Index from the exact value of a field to the IDs of the books having it.
+
+    Meant for fields with few distinct values, such as the year or the status. The distinct
+    values are also kept in a sorted list, so the books in a range of values are found by
+    bisection without looking at the others. Strings are indexed lowercased.
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, object]] = ()):
+        self._values: dict[str, object] = {}
+        self._postings: dict[object, dict[str, None]] = {}
+        self._keys: list = []
+        for book_id, value in entries:
+            self.add(book_id, value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "ValueIndex":
+        """
+        Restores an index from the value returned by state().
+
+        Args:
+            state (tuple): The saved state.
+
+        Returns:
+            ValueIndex: The index.
+        """
+        index = cls()
+        index._values, index._postings = state
+        index._keys = sorted(index._postings)
+        return index
+
+    def state(self) -> tuple:
+        """
+        Returns the contents of the index as plain dicts, which marshal can save.
+
+        Returns:
+            tuple: The indexed values and the posting lists.
+        """
+        return self._values, self._postings
+
+    def book_ids(self) -> KeysView[str]:
+        """
+        Returns the IDs of the indexed books.
+
+        Returns:
+            KeysView[str]: A live view of the IDs.
+        """
+        return self._values.keys()
+
+    def add(self, book_id: str, value: object) -> None:
+        """
+        Indexes the value of a book field.
+
+        Args:
+            book_id (str): The ID of the book.
+            value (object): The field value.
+        """
+        key = value.lower() if isinstance(value, str) else value
+        self._values[book_id] = key
+        posting = self._postings.get(key)
+        if posting is None:
+            posting = self._postings[key] = {}
+            bisect.insort(self._keys, key)
+        posting[book_id] = None
+
+    def remove(self, book_id: str) -> None:
+        """
+        Drops a book from the index.
+
+        Args:
+            book_id (str): The ID of the book.
+        """
+        if book_id not in self._values:
+            return
+        key = self._values.pop(book_id)
+        posting = self._postings[key]
+        del posting[book_id]
+        if not posting:
+            del self._postings[key]
+            del self._keys[bisect.bisect_left(self._keys, key)]
+
+    def _range(self, low: object, high: object) -> list:
+        """
+        Returns the distinct values between two inclusive bounds, where None is unbounded.
+        """
+        start = 0 if low is None else bisect.bisect_left(self._keys, low)
+        end = len(self._keys) if high is None else bisect.bisect_right(self._keys, high)
+        return self._keys[start:end]
+
+    def count(self, low: object, high: object) -> int:
+        """
+        Returns the number of books whose value lies between two bounds.
+
+        Args:
+            low (object): The inclusive lower bound, or None.
+            high (object): The inclusive upper bound, or None.
+
+        Returns:
+            int: The number of matching books.
+        """
+        return sum(len(self._postings[key]) for key in self._range(low, high))
+
+    def ids(self, low: object, high: object) -> Iterator[str]:
+        """
+        Yields the IDs of the books whose value lies between two bounds.
+
+        Books come grouped by value in ascending order, and in insertion order within a value.
+
+        Args:
+            low (object): The inclusive lower bound, or None.
+            high (object): The inclusive upper bound, or None.
+
+        Yields:
+            str: The matching IDs.
+        """
+        for key in self._range(low, high):
+            yield from self._postings[key]
@@ -1,15 +1,436 @@
 import json
+import os
+import re
+import threading
+from itertools import islice
+from typing import IO, Iterable, Iterator
 from models.models import Book
 from database.abstract_base import AbstractDatabase
+from database.aggregates import Aggregates
+from database.catalogue import Catalogue
+from database.indexes import TrigramIndex, ValueIndex
+from database.files import atomic_write_json
+from database.locks import FileLock
+from database.query import Condition
+from database.sidecar import load_index, save_index, sidecar_path
+from database.sorting import sort_key
+
+READ_CHUNK = 1 << 16
+VERSION_PATTERN = re.compile(r'\s*\{\s*"version"\s*:\s*(\d+)')
+MAX_RETRIES = 10
+
+
+class VersionConflict(RuntimeError):
+    """
+    Raised when the library file was replaced by another writer since it was read.
+    """
+
+
+def iter_json_array(file: IO[str]) -> Iterator[dict]:
+    """
+    Incrementally decodes the objects of the book array of a library file.
+
+    Both layouts are accepted: a top-level array, and an object whose "books" key holds
+    the array. Only the chunk being decoded is held in memory, so the first records of a
+    large file are available without parsing the rest.
+
+    Args:
+        file (IO[str]): A text file containing a JSON array of objects.
+
+    Returns:
+        Iterator[dict]: The decoded objects. Decoding stops quietly at malformed data.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    opened = False
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer):
+            if not opened:
+                if buffer[pos] == "{":
+                    key = buffer.find('"books"', pos)
+                    start = -1 if key == -1 else buffer.find("[", key)
+                    if start == -1:
+                        if eof:
+                            return
+                        chunk = file.read(READ_CHUNK)
+                        eof = not chunk
+                        buffer, pos = buffer[pos:] + chunk, 0
+                        continue
+                    pos = start
+                if buffer[pos] != "[":
+                    return
+                opened = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    return
+            else:
+                yield item
+                continue
+        if eof:
+            return
+        chunk = file.read(READ_CHUNK)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
 
 
 class JsonDatabase(AbstractDatabase):
     """
     A class to handle database operations for the library system using JSON file storage.
+
+    When ``cache`` is enabled the parsed books stay resident in memory as a Catalogue and
+    the file is parsed again only if its mtime, size or inode changed since the last read
+    or write.
+
+    Every write goes to a temporary file that is fsynced and renamed over the library, so
+    a crash leaves either the old or the new file. With a positive ``commit_interval`` (which
+    requires the cache) mutations return once applied in memory, and all mutations made
+    within the interval are persisted together by one write from a timer thread; call
+    flush() or close() to persist them immediately.
+
+    Several processes may share one file. Readers hold a shared and writers an exclusive
+    lock on ``file_path + ".lock"``, and the file carries a version counter that every
+    write increments. A writer whose copy is older than the file reloads it and applies its
+    mutations again, so concurrent updates are not lost. A file holding a bare list of
+    books, as written before the counter existed, is read as version 0.
+
+    With ``sidecars`` (which requires the cache) the search indexes built by the resident
+    catalogue are saved next to the file on close, stamped with the version, mtime, size
+    and inode of the file they describe. After a restart each one is loaded on its first
+    use instead of being rebuilt, as long as the file still has the same stamp.
     """
 
-    def __init__(self, file_path: str):
+    def __init__(
+        self,
+        file_path: str,
+        cache: bool = False,
+        commit_interval: float = 0,
+        fsync: bool = True,
+        sidecars: bool = False,
+    ):
+        if commit_interval and not cache:
+            raise ValueError("Group commit needs the resident cache")
+        if sidecars and not cache:
+            raise ValueError("Index sidecars need the resident cache")
         self.file_path = file_path
+        self.cache = cache
+        self.commit_interval = commit_interval
+        self.fsync = fsync
+        self.sidecars = sidecars
+        self._sidecar_stamps: dict[tuple[str, str], tuple] = {}
+        self._catalogue: Catalogue | None = None
+        self._stamp: tuple | None = None
+        self._version = 0
+        self._counters = {
+            "bytes_read": 0, "bytes_written": 0, "writes": 0, "cache_hits": 0, "cache_misses": 0, "conflicts": 0,
+            "indexes_loaded": 0, "indexes_saved": 0,
+        }
+        self._pending: list[tuple] = []
+        self._timer: threading.Timer | None = None
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._file_lock = FileLock(file_path + ".lock")
+
+    def _file_stamp(self) -> tuple | None:
+        """
+        Returns the identity of the data file as seen by the filesystem.
+
+        Returns:
+            tuple | None: (mtime_ns, size, inode) or None if the file does not exist.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _disk_version(self) -> int:
+        """
+        Reads the version counter from the head of the JSON file.
+
+        Returns:
+            int: The version, or 0 for a missing file or a file without a counter.
+        """
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as file:
+                match = VERSION_PATTERN.match(file.read(64))
+        except FileNotFoundError:
+            return 0
+        return int(match.group(1)) if match else 0
+
+    def _read_books(self) -> list[Book]:
+        """
+        Parses the JSON file and remembers its version.
+
+        Returns:
+            List[Book]: A list of Book instances.
+        """
+        with self._file_lock.shared():
+            try:
+                with open(self.file_path, "r", encoding="utf-8") as file:
+                    self._counters["bytes_read"] += os.fstat(file.fileno()).st_size
+                    data = json.load(file)
+            except (FileNotFoundError, json.JSONDecodeError):
+                data = []
+        if isinstance(data, dict):
+            self._version = int(data.get("version", 0))
+            data = data.get("books", [])
+        else:
+            self._version = 0
+        return [Book.from_dict(book) for book in data]
+
+    def _resident_catalogue(self) -> Catalogue:
+        """
+        Returns the indexed books, reusing the in-memory copy while the file is unchanged.
+
+        Returns:
+            Catalogue: The resident catalogue, or a fresh one when caching is disabled.
+        """
+        if not self.cache:
+            return Catalogue(self._read_books())
+        with self._lock:
+            if self._pending and self._catalogue is not None:
+                self._counters["cache_hits"] += 1
+                return self._catalogue
+            stamp = self._file_stamp()
+            if self._catalogue is None or stamp != self._stamp:
+                self._counters["cache_misses"] += 1
+                self._catalogue = Catalogue(self._read_books(), self._load_sidecar if self.sidecars else None)
+                self._stamp = stamp
+            else:
+                self._counters["cache_hits"] += 1
+            return self._catalogue
+
+    def _sidecar_stamp(self) -> tuple | None:
+        """
+        Returns the stamp of the file the resident catalogue mirrors, or None if it differs.
+        """
+        if self._pending or self._stamp is None:
+            return None
+        return (self._version, *self._stamp)
+
+    def _load_sidecar(self, kind: str, field: str) -> TrigramIndex | ValueIndex | None:
+        """
+        Loads a saved index of the resident catalogue if it is not stale.
+
+        Args:
+            kind (str): "trigram" or "value".
+            field (str): The indexed field.
+
+        Returns:
+            TrigramIndex | ValueIndex | None: The index, or None to build it.
+        """
+        stamp = self._sidecar_stamp()
+        if stamp is None:
+            return None
+        index = load_index(sidecar_path(self.file_path, kind, field), kind, stamp)
+        if index is not None:
+            self._counters["indexes_loaded"] += 1
+            self._sidecar_stamps[kind, field] = stamp
+        return index
+
+    def _save_sidecars(self) -> None:
+        """
+        Saves the indexes of the resident catalogue whose sidecar is missing or stale.
+
+        Nothing is saved if another process replaced the file since it was read.
+        """
+        with self._lock:
+            stamp = self._sidecar_stamp()
+            if self._catalogue is None or stamp is None:
+                return
+            with self._file_lock.shared():
+                if self._file_stamp() != self._stamp:
+                    return
+                for kind, field, index in self._catalogue.built_indexes():
+                    if self._sidecar_stamps.get((kind, field)) != stamp:
+                        self._counters["bytes_written"] += save_index(
+                            sidecar_path(self.file_path, kind, field), stamp, index, self.fsync,
+                        )
+                        self._counters["indexes_saved"] += 1
+                        self._sidecar_stamps[kind, field] = stamp
+
+    @staticmethod
+    def _apply(catalogue: Catalogue, operation: tuple) -> bool:
+        """
+        Applies one mutation to a catalogue.
+
+        Args:
+            catalogue (Catalogue): The catalogue to change.
+            operation (tuple): The mutation name ("add", "delete" or "status") followed by
+                its arguments.
+
+        Returns:
+            bool: True if the catalogue changed.
+        """
+        name, *args = operation
+        if name == "add":
+            for book in args[0]:
+                catalogue.add(book)
+            return bool(args[0])
+        if name == "delete":
+            return catalogue.remove(args[0]) is not None
+        return catalogue.set_status(*args)
+
+    def _mutate(self, *operation) -> bool:
+        """
+        Applies a mutation and persists it, or leaves it for the group commit.
+
+        Without group commit the write happens under the exclusive file lock. If the file
+        turns out to have been replaced since it was read, the mutation is applied again to
+        a fresh copy, up to MAX_RETRIES times.
+
+        Args:
+            *operation: The mutation name followed by its arguments, as understood by _apply.
+
+        Returns:
+            bool: True if the catalogue changed.
+
+        Raises:
+            VersionConflict: If every attempt lost the race to another writer.
+        """
+        with self._lock:
+            if self.commit_interval:
+                changed = self._apply(self._resident_catalogue(), operation)
+                if changed:
+                    self._pending.append(operation)
+                    self._schedule_flush()
+                return changed
+            for _ in range(MAX_RETRIES):
+                with self._file_lock.exclusive():
+                    catalogue = self._resident_catalogue()
+                    try:
+                        if not self._apply(catalogue, operation):
+                            return False
+                        self._persist(catalogue)
+                    except VersionConflict:
+                        self._catalogue = None
+                        continue
+                    except BaseException:
+                        self._catalogue = None
+                        raise
+                    return True
+            raise VersionConflict(self.file_path)
+
+    def _schedule_flush(self) -> None:
+        """
+        Starts the group commit timer unless it is already running.
+        """
+        if self._timer is None:
+            self._timer = threading.Timer(self.commit_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _persist(self, catalogue: Catalogue, check_version: bool = True) -> None:
+        """
+        Atomically replaces the JSON file with the catalogue under the next version.
+
+        Must be called with the exclusive file lock held.
+
+        Args:
+            catalogue (Catalogue): The books to be saved.
+            check_version (bool): Whether to refuse the write when the file is no longer at
+                the version the catalogue was read from.
+
+        Raises:
+            VersionConflict: If another writer replaced the file in the meantime.
+        """
+        disk_version = self._disk_version()
+        if check_version and disk_version != self._version:
+            self._counters["conflicts"] += 1
+            raise VersionConflict(self.file_path)
+        self._counters["bytes_written"] += atomic_write_json(
+            self.file_path,
+            {"version": disk_version + 1, "books": [book.to_dict() for book in catalogue]},
+            indent=4,
+            fsync=self.fsync,
+        )
+        self._counters["writes"] += 1
+        self._version = disk_version + 1
+        if self.cache:
+            self._catalogue = catalogue
+            self._stamp = self._file_stamp()
+
+    def flush(self) -> None:
+        """
+        Persists the mutations waiting for the group commit.
+
+        The books are serialised under the database lock, but the file is written and
+        synced after releasing it, so readers and new mutations do not wait for the disk.
+        Mutations made meanwhile stay pending for the next flush. If another process wrote
+        the file in the meantime, the file is reloaded and the waiting mutations are
+        applied again on top of it.
+
+        Raises:
+            VersionConflict: If every attempt lost the race to another writer.
+        """
+        with self._flush_lock:
+            for _ in range(MAX_RETRIES):
+                with self._lock:
+                    if self._timer is not None:
+                        self._timer.cancel()
+                        self._timer = None
+                    if not self._pending or self._catalogue is None:
+                        return
+                    with self._file_lock.exclusive():
+                        version = self._disk_version()
+                        if version != self._version:
+                            self._counters["conflicts"] += 1
+                            catalogue = Catalogue(self._read_books())
+                            for operation in self._pending:
+                                self._apply(catalogue, operation)
+                            self._catalogue = catalogue
+                    flushed = len(self._pending)
+                    records = [book.to_dict() for book in self._catalogue]
+                with self._file_lock.exclusive():
+                    if self._disk_version() != version:
+                        continue
+                    written = atomic_write_json(
+                        self.file_path, {"version": version + 1, "books": records}, indent=4, fsync=self.fsync,
+                    )
+                    stamp = self._file_stamp()
+                with self._lock:
+                    self._counters["bytes_written"] += written
+                    self._counters["writes"] += 1
+                    self._version = version + 1
+                    self._stamp = stamp
+                    del self._pending[:flushed]
+                return
+            raise VersionConflict(self.file_path)
+
+    def close(self) -> None:
+        """
+        Persists pending mutations and, with sidecars enabled, the search indexes.
+        """
+        self.flush()
+        if self.sidecars:
+            self._save_sidecars()
+
+    def counters(self) -> dict[str, int]:
+        """
+        Returns the I/O and cache counters.
+
+        Returns:
+            dict[str, int]: Bytes read and written, file writes, cache hits and misses,
+                version conflicts with other writers, and index sidecars loaded and saved.
+        """
+        return dict(self._counters)
+
+    def data_version(self) -> object:
+        """
+        Returns the stamp of the data file, which changes with every write by any process.
+
+        Returns:
+            object: (mtime_ns, size, inode) of the file, or None if it does not exist.
+        """
+        return self._file_stamp()
 
     def load_books(self) -> list[Book]:
         """
@@ -18,24 +439,78 @@ class JsonDatabase(AbstractDatabase):
         Returns:
             List[Book]: A list of Book instances.
         """
+        return self._resident_catalogue().books()
+
+    def iter_books(self, offset: int = 0, limit: int | None = None) -> Iterator[Book]:
+        """
+        Lazily yields books in file order, starting at ``offset``.
+
+        Without the cache the file is decoded incrementally, so a page of a large library
+        costs only the records up to that page. With the cache the IDs of the range are
+        copied a chunk at a time, so the books may be consumed while the library changes.
+
+        Args:
+            offset (int): The number of books to skip.
+            limit (int | None): The maximum number of books to yield, or None for all.
+
+        Returns:
+            Iterator[Book]: The books.
+        """
+        stop = None if limit is None else offset + limit
+        if self.cache:
+            with self._lock:
+                return self._resident_catalogue().page(offset, stop)
+        return islice(self._stream_books(), offset, stop)
+
+    def iter_sorted(self, field: str, buffer_size: int) -> Iterator[Book]:
+        """
+        Lazily yields all books in ascending order of a field.
+
+        With the cache on, the resident books are sorted in memory, which costs only a list
+        of references; otherwise the file is streamed through an external merge sort.
+
+        Args:
+            field (str): "title", "author" or "year".
+            buffer_size (int): The number of books the external sort may hold in memory.
+
+        Returns:
+            Iterator[Book]: The books, in insertion order among equal values.
+        """
+        if self.cache:
+            with self._lock:
+                return iter(sorted(self._resident_catalogue(), key=sort_key(field)))
+        return super().iter_sorted(field, buffer_size)
+
+    def _stream_books(self) -> Iterator[Book]:
+        """
+        Decodes books one at a time from the JSON file.
+
+        The shared lock is held only while opening: writers replace the file rather than
+        change it, so an open file stays consistent however long it is read.
+
+        Returns:
+            Iterator[Book]: The books in file order.
+        """
         try:
-            with open(self.file_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                return [Book.from_dict(book) for book in data]
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+            with self._file_lock.shared():
+                file = open(self.file_path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with file:
+            for data in iter_json_array(file):
+                yield Book.from_dict(data)
 
     def save_books(self, books: list[Book]) -> None:
         """
-        Saves books to a JSON file.
+        Saves books to a JSON file, replacing whatever it holds.
 
         Args:
             books list[Book]: A instance of Book to be saved.
         """
-        with open(self.file_path, "w", encoding="utf-8") as file:
-            json.dump(
-                [book.to_dict() for book in books], file, ensure_ascii=False, indent=4,
-            )
+        with self._flush_lock, self._lock:
+            with self._file_lock.exclusive():
+                self._persist(Catalogue(books), check_version=False)
+            self._pending.clear()
 
     def add_book(self, book: Book) -> None:
         """
@@ -44,9 +519,21 @@ class JsonDatabase(AbstractDatabase):
         Args:
             book (Book)
         """
-        books = self.load_books()
-        books.append(book)
-        self.save_books(books)
+        self._mutate("add", [book])
+
+    def add_books(self, books: Iterable[Book]) -> int:
+        """
+        Adds many books with a single rewrite of the file.
+
+        Args:
+            books (Iterable[Book]): The books to be added.
+
+        Returns:
+            int: The number of books added.
+        """
+        new_books = list(books)
+        self._mutate("add", new_books)
+        return len(new_books)
 
     def delete_book(self, book_id: str) -> bool:
         """
@@ -58,12 +545,7 @@ class JsonDatabase(AbstractDatabase):
         Returns:
             bool: True if the book was deleted, False if the book was not found.
         """
-        books = self.load_books()
-        updated_books = [book for book in books if book.id != book_id]
-        if len(books) == len(updated_books):
-            return False
-        self.save_books(updated_books)
-        return True
+        return self._mutate("delete", book_id)
 
     def find_books(self, query: str, field: str) -> list[Book]:
         """
@@ -76,9 +558,56 @@ class JsonDatabase(AbstractDatabase):
         Returns:
             List[Book]: A list of Book instances that match the search criteria.
         """
-        books = self.load_books()
+        if self.cache:
+            return self._resident_catalogue().search(query, field)
+        books = self._read_books()
         return [book for book in books if str(query).lower() in str(getattr(book, field)).lower()]
 
+    def fuzzy_find_books(self, query: str, field: str, limit: int = 10) -> list[Book]:
+        """
+        Finds the books whose field is most similar to the query, tolerating typos.
+
+        Args:
+            query (str): The possibly misspelt search query.
+            field (str): The field to search by ('title', 'author', or 'year').
+            limit (int): The maximum number of books to return.
+
+        Returns:
+            List[Book]: The best matches, best first.
+        """
+        if self.cache:
+            return self._resident_catalogue().fuzzy_search(query, field, limit)
+        return super().fuzzy_find_books(query, field, limit)
+
+    def query(self, conditions: list[Condition]) -> list[Book]:
+        """
+        Finds the books matching all conditions of a compound query.
+
+        With the cache on, the resident catalogue plans the query over its indexes.
+
+        Args:
+            conditions (list[Condition]): The conditions, all of which must hold.
+
+        Returns:
+            List[Book]: The matching books.
+        """
+        if self.cache:
+            return self._resident_catalogue().query(conditions)
+        return super().query(conditions)
+
+    def aggregates(self) -> Aggregates:
+        """
+        Returns the book counts per status, author and year.
+
+        With the cache on, they are the counts the resident catalogue keeps up to date.
+
+        Returns:
+            Aggregates: The counts. Callers must not change them.
+        """
+        if self.cache:
+            return self._resident_catalogue().aggregates
+        return super().aggregates()
+
     def change_book_status(self, book_id: str, new_status: str) -> bool:
         """
         Changes the status of a book by its ID.
@@ -90,13 +619,7 @@ class JsonDatabase(AbstractDatabase):
         Returns:
             bool: True if the status was changed, False if the book was not found.
         """
-        books = self.load_books()
-        for book in books:
-            if book.id == book_id:
-                book.status = new_status
-                self.save_books(books)
-                return True
-        return False
+        return self._mutate("status", book_id, new_status)
 
     def find_book(self, book_id: str) -> Book | None:
         """
@@ -108,8 +631,16 @@ class JsonDatabase(AbstractDatabase):
         Returns:
             Book: The book with the matching ID, or None if no such book exists.
         """
-        books = self.load_books()
-        for book in books:
-            if book.id == book_id:
-                return book
-        return None
+        return self._resident_catalogue().get(book_id)
+
+    def has_book(self, book_id: str) -> bool:
+        """
+        Checks whether a book with the given ID exists.
+
+        Args:
+            book_id (str): The ID of the book.
+
+        Returns:
+            bool: True if the book exists.
+        """
+        return book_id in self._resident_catalogue()
@@ -0,0 +1,74 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore[assignment]
+
+SHARED = fcntl.LOCK_SH if fcntl else 1
+EXCLUSIVE = fcntl.LOCK_EX if fcntl else 2
+
+
+class FileLock:
+    """
+    Advisory reader/writer lock shared between processes through a lock file.
+
+    The lock is taken on a separate ``.lock`` file because the data file is replaced on
+    every write, and a lock on a replaced inode protects nothing. Acquisitions nest within a
+    process: a shared lock requested while the exclusive lock is held is granted at once.
+    On platforms without fcntl the lock only serialises threads of one process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._guard = threading.RLock()
+        self._descriptor: int | None = None
+        self._mode: int | None = None
+        self._depth = 0
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """
+        Holds the lock in shared mode, for readers.
+        """
+        with self._hold(SHARED):
+            yield
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """
+        Holds the lock in exclusive mode, for writers.
+        """
+        with self._hold(EXCLUSIVE):
+            yield
+
+    @contextmanager
+    def _hold(self, mode: int) -> Iterator[None]:
+        with self._guard:
+            if self._depth and self._mode == SHARED and mode == EXCLUSIVE:
+                raise RuntimeError("A shared file lock cannot be upgraded to an exclusive one")
+            if not self._depth:
+                self._acquire(mode)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if not self._depth:
+                    self._release()
+
+    def _acquire(self, mode: int) -> None:
+        if fcntl is not None:
+            self._descriptor = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._descriptor, mode)
+        self._mode = mode
+
+    def _release(self) -> None:
+        if self._descriptor is not None:
+            fcntl.flock(self._descriptor, fcntl.LOCK_UN)
+            os.close(self._descriptor)
+            self._descriptor = None
+        self._mode = None
@@ -0,0 +1,560 @@
+import json
+import os
+import shutil
+import threading
+from typing import IO, Callable, Iterable, Iterator
+from models.models import Book
+from database.abstract_base import AbstractDatabase
+from database.aggregates import Aggregates
+from database.catalogue import Catalogue
+from database.sorting import sort_key
+from database.files import atomic_write_json, fsync_directory
+from database.query import Condition
+
+
+def apply_record(catalogue: Catalogue, record: dict) -> None:
+    """
+    Applies one log record to a catalogue.
+
+    Replaying is idempotent: an "add" of a book that is already present only restores the
+    status it was added with, which later records of the same log then bring up to date.
+    So a log segment may safely be replayed over a snapshot that already contains it,
+    which happens when compaction is interrupted after writing the new snapshot.
+
+    Args:
+        catalogue (Catalogue): The catalogue to change.
+        record (dict): An "add", "delete" or "status" record.
+    """
+    operation = record["op"]
+    if operation == "add":
+        if record["book"]["id"] in catalogue:
+            catalogue.set_status(record["book"]["id"], record["book"]["status"])
+        else:
+            catalogue.add(Book.from_dict(record["book"]))
+    elif operation == "delete":
+        catalogue.remove(record["id"])
+    elif operation == "status":
+        catalogue.set_status(record["id"], record["status"])
+
+
+def replay_log(
+    catalogue: Catalogue, log_path: str, generation: int = 0, observe: Callable[[dict], None] | None = None,
+) -> int:
+    """
+    Applies the records of a JSONL log to a catalogue, stopping at a torn last line.
+
+    A log starts with a "generation" record naming the snapshot it was written against; a
+    log without one belongs to generation 0. Replay also stops at the first record of
+    another generation, so a log left over from before save_books() replaced the snapshot
+    is never applied to the new one.
+
+    Args:
+        catalogue (Catalogue): The catalogue to change.
+        log_path (str): The path of the log.
+        generation (int): The generation of the snapshot in the catalogue.
+        observe (Callable[[dict], None] | None): Called with every applied record.
+
+    Returns:
+        int: The length in bytes of the part of the log that belongs to the snapshot.
+    """
+    valid = 0
+    current = generation == 0
+    try:
+        with open(log_path, "rb") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if record["op"] == "generation":
+                    current = record["generation"] == generation
+                if not current:
+                    break
+                if record["op"] != "generation":
+                    apply_record(catalogue, record)
+                    if observe is not None:
+                        observe(record)
+                valid += len(line)
+    except FileNotFoundError:
+        pass
+    return valid
+
+
+def load_snapshot(snapshot_path: str) -> tuple[int, list[Book]]:
+    """
+    Reads a snapshot written by LogDatabase together with its generation.
+
+    A file written by JsonDatabase is accepted too, so a JSON library can be opened as
+    the snapshot of a log. A missing or corrupt snapshot is empty, as in JsonDatabase.
+
+    Args:
+        snapshot_path (str): The path of the snapshot.
+
+    Returns:
+        tuple[int, list[Book]]: The generation, 0 if none is recorded, and the books.
+    """
+    try:
+        with open(snapshot_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return 0, []
+    if isinstance(data, dict):
+        return int(data.get("generation", 0)), [Book.from_dict(book) for book in data.get("books", [])]
+    return 0, [Book.from_dict(book) for book in data]
+
+
+def read_snapshot(snapshot_path: str) -> list[Book]:
+    """
+    Reads the books of a snapshot written by LogDatabase.
+
+    Args:
+        snapshot_path (str): The path of the snapshot.
+
+    Returns:
+        list[Book]: The books of the snapshot, empty if there is none.
+    """
+    return load_snapshot(snapshot_path)[1]
+
+
+def write_snapshot(snapshot_path: str, generation: int, books: Iterable[Book], fsync: bool = True) -> int:
+    """
+    Atomically replaces a snapshot.
+
+    Args:
+        snapshot_path (str): The path of the snapshot.
+        generation (int): The generation the log records are written against.
+        books (Iterable[Book]): The books.
+        fsync (bool): Whether to flush the file to disk.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    return atomic_write_json(
+        snapshot_path, {"generation": generation, "books": [book.to_dict() for book in books]}, fsync=fsync,
+    )
+
+
+def fold_segment(snapshot_path: str, segment_path: str, fsync: bool = True) -> int:
+    """
+    Folds a rotated log segment into the snapshot and removes the segment.
+
+    Only the files are read, never the live catalogue, so this can run in a background
+    thread while new mutations go to the next log segment.
+
+    Args:
+        snapshot_path (str): The path of the snapshot.
+        segment_path (str): The path of the rotated log segment.
+        fsync (bool): Whether to flush the new snapshot and the removal to disk.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    generation, books = load_snapshot(snapshot_path)
+    catalogue = Catalogue(books)
+    replay_log(catalogue, segment_path, generation)
+    written = write_snapshot(snapshot_path, generation, catalogue, fsync)
+    os.remove(segment_path)
+    if fsync:
+        fsync_directory(os.path.dirname(os.path.abspath(segment_path)))
+    return written
+
+
+class LogDatabase(AbstractDatabase):
+    """
+    A class to handle database operations using a snapshot plus an append-only log.
+
+    The snapshot at ``file_path`` is a JSON object with the books and a generation, and
+    every mutation is appended as one JSON line to ``file_path + ".log"``. On start the log is replayed over the
+    snapshot, so each add, delete or status change costs one append instead of a rewrite
+    of the whole library. With ``fsync`` enabled every append is flushed to disk before
+    the call returns.
+
+    The log is compacted once it reaches ``compact_bytes`` bytes or ``compact_records``
+    records, or once it holds at least ``compact_min_records`` records of which more than
+    ``compact_dead_ratio`` are dead (an estimate of the records superseded by later ones);
+    a threshold of 0 is disabled. Compaction renames the log to ``file_path + ".log.1"``
+    while holding the mutation lock, and a background thread then folds that segment into
+    a new snapshot, so commands wait only for the rename. Start up replays the snapshot,
+    a segment left by an interrupted compaction, and the log, so its cost is bounded by
+    the snapshot size and the thresholds rather than by the whole mutation history.
+
+    A legacy snapshot whose books share an ID is rewritten with the renumbered IDs when it
+    is opened, before any log record can refer to them.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        fsync: bool = True,
+        compact_bytes: int = 0,
+        compact_records: int = 0,
+        compact_dead_ratio: float = 0,
+        compact_min_records: int = 1000,
+    ):
+        self.file_path = file_path
+        self.log_path = file_path + ".log"
+        self.segment_path = self.log_path + ".1"
+        self.fsync = fsync
+        self.compact_bytes = compact_bytes
+        self.compact_records = compact_records
+        self.compact_dead_ratio = compact_dead_ratio
+        self.compact_min_records = compact_min_records
+        self._lock = threading.RLock()
+        self._compactor: threading.Thread | None = None
+        self._reset_log_stats()
+        self._generation, books = load_snapshot(file_path)
+        self._catalogue = Catalogue(books)
+        if self._catalogue.renumbered:
+            write_snapshot(file_path, self._generation, self._catalogue, fsync)
+        segment = replay_log(self._catalogue, self.segment_path, self._generation)
+        valid = replay_log(self._catalogue, self.log_path, self._generation, self._track)
+        for path, length in ((self.segment_path, segment), (self.log_path, valid)):
+            if os.path.exists(path) and os.path.getsize(path) > length:
+                os.truncate(path, length)
+        self._log: IO[str] | None = None
+        self._log_bytes = valid
+        snapshot_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        self._counters = {
+            "bytes_read": snapshot_size + segment + valid, "bytes_written": 0, "appends": 0, "records": 0,
+            "compactions": 0,
+        }
+        if os.path.exists(self.segment_path) or self._should_compact():
+            self.compact()
+
+    def _reset_log_stats(self) -> None:
+        """
+        Forgets the statistics of the current log segment.
+        """
+        self._log_bytes = 0
+        self._log_records = 0
+        self._needed = 0
+        self._added: dict[str, bool] = {}
+
+    def _track(self, record: dict) -> None:
+        """
+        Counts a record of the current log and estimates how many of them are still needed.
+
+        A book added in this log needs one record while it exists and none once deleted; a
+        book from the snapshot needs one record once changed or deleted.
+
+        Args:
+            record (dict): The record appended to or replayed from the log.
+        """
+        self._log_records += 1
+        book_id = record["book"]["id"] if record["op"] == "add" else record["id"]
+        added = self._added.get(book_id)
+        if record["op"] == "add":
+            self._added[book_id] = True
+            self._needed += 1
+        elif added is None:
+            self._added[book_id] = False
+            self._needed += 1
+        elif added and record["op"] == "delete":
+            del self._added[book_id]
+            self._needed -= 1
+
+    def _should_compact(self) -> bool:
+        """
+        Checks the compaction thresholds against the current log.
+
+        Returns:
+            bool: True if the log should be compacted.
+        """
+        if self.compact_bytes and self._log_bytes >= self.compact_bytes:
+            return True
+        if self.compact_records and self._log_records >= self.compact_records:
+            return True
+        if not self.compact_dead_ratio or self._log_records < self.compact_min_records:
+            return False
+        return (self._log_records - self._needed) / self._log_records > self.compact_dead_ratio
+
+    def _append(self, records: Iterable[dict]) -> None:
+        """
+        Appends records to the log, then starts a compaction if a threshold is reached.
+
+        Args:
+            records (Iterable[dict]): The records to append.
+        """
+        if self._log is None:
+            self._log = open(self.log_path, "a", encoding="utf-8")
+        lines = [json.dumps(record, ensure_ascii=False) + "\n" for record in records]
+        header = [] if self._log.tell() else [json.dumps({"op": "generation", "generation": self._generation}) + "\n"]
+        self._log.writelines(header + lines)
+        self._log.flush()
+        size = sum(len(line.encode("utf-8")) for line in header + lines)
+        self._log_bytes += size
+        self._counters["bytes_written"] += size
+        self._counters["appends"] += 1
+        self._counters["records"] += len(lines)
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        if self._should_compact():
+            self.compact()
+
+    def compact(self, wait: bool = False) -> None:
+        """
+        Rotates the log and folds the rotated segment into the snapshot in the background.
+
+        Does nothing while an earlier compaction is still running. A segment left over by a
+        failed compaction gets the current log appended and is folded again.
+
+        Args:
+            wait (bool): Whether to block until the new snapshot is written.
+        """
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                if wait:
+                    self._compactor.join()
+                return
+            self._close_log()
+            if os.path.exists(self.log_path):
+                if os.path.exists(self.segment_path):
+                    with open(self.log_path, "rb") as source, open(self.segment_path, "ab") as target:
+                        shutil.copyfileobj(source, target)
+                    os.remove(self.log_path)
+                else:
+                    os.replace(self.log_path, self.segment_path)
+            self._reset_log_stats()
+            if not os.path.exists(self.segment_path):
+                return
+            self._compactor = threading.Thread(target=self._fold, name="log-compaction", daemon=True)
+            self._compactor.start()
+        if wait:
+            self._compactor.join()
+
+    def _fold(self) -> None:
+        written = fold_segment(self.file_path, self.segment_path, self.fsync)
+        self._counters["bytes_written"] += written
+        self._counters["compactions"] += 1
+
+    def _close_log(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def close(self) -> None:
+        """
+        Waits for a running compaction and closes the log file.
+        """
+        with self._lock:
+            if self._compactor is not None:
+                self._compactor.join()
+            self._close_log()
+
+    def counters(self) -> dict[str, int]:
+        """
+        Returns the I/O counters.
+
+        Returns:
+            dict[str, int]: Bytes read at start, bytes written, log appends and records, and
+                finished compactions.
+        """
+        return dict(self._counters)
+
+    def load_books(self) -> list[Book]:
+        """
+        Returns the books of the snapshot with the log applied.
+
+        Returns:
+            List[Book]: A list of Book instances.
+        """
+        return self._catalogue.books()
+
+    def iter_books(self, offset: int = 0, limit: int | None = None) -> Iterator[Book]:
+        """
+        Lazily yields books in insertion order, starting at ``offset``.
+
+        The IDs of the range are copied a chunk at a time, so the books may be consumed
+        while the library changes; books deleted in the meantime are skipped.
+
+        Args:
+            offset (int): The number of books to skip.
+            limit (int | None): The maximum number of books to yield, or None for all.
+
+        Returns:
+            Iterator[Book]: The books.
+        """
+        stop = None if limit is None else offset + limit
+        with self._lock:
+            return self._catalogue.page(offset, stop)
+
+    def iter_sorted(self, field: str, buffer_size: int) -> Iterator[Book]:
+        """
+        Yields all books in ascending order of a field, sorted in memory.
+
+        Args:
+            field (str): "title", "author" or "year".
+            buffer_size (int): Unused, the books are resident anyway.
+
+        Returns:
+            Iterator[Book]: The books, in insertion order among equal values.
+        """
+        with self._lock:
+            return iter(sorted(self._catalogue, key=sort_key(field)))
+
+    def save_books(self, books: list[Book]) -> None:
+        """
+        Writes the books as a new snapshot and empties the log.
+
+        The new snapshot gets the next generation, so if the process stops before the log
+        is emptied, the records of the old log are recognised as stale and not replayed.
+
+        Args:
+            books (List[Book]): A list of Book instances to be saved.
+        """
+        catalogue = Catalogue(books)
+        with self._lock:
+            self.close()
+            self._counters["bytes_written"] += write_snapshot(
+                self.file_path, self._generation + 1, catalogue, self.fsync,
+            )
+            self._generation += 1
+            with open(self.log_path, "w", encoding="utf-8"):
+                pass
+            if os.path.exists(self.segment_path):
+                os.remove(self.segment_path)
+            self._reset_log_stats()
+            self._catalogue = catalogue
+
+    def add_book(self, book: Book) -> None:
+        """
+        Adds a new book to the library.
+
+        Args:
+            book (Book): The Book instance to be added.
+        """
+        with self._lock:
+            self._catalogue.add(book)
+            self._append(self._tracked([{"op": "add", "book": book.to_dict()}]))
+
+    def add_books(self, books: Iterable[Book]) -> int:
+        """
+        Adds many books with one append and one fsync.
+
+        The whole input is read before anything changes, so an input that fails partway
+        through adds nothing.
+
+        Args:
+            books (Iterable[Book]): The books to be added.
+
+        Returns:
+            int: The number of books added.
+        """
+        new_books = list(books)
+        with self._lock:
+            for book in new_books:
+                self._catalogue.add(book)
+            self._append(self._tracked([{"op": "add", "book": book.to_dict()} for book in new_books]))
+            return len(new_books)
+
+    def _tracked(self, records: Iterable[dict]) -> Iterator[dict]:
+        for record in records:
+            self._track(record)
+            yield record
+
+    def delete_book(self, book_id: str) -> bool:
+        """
+        Deletes a book from the library by its ID.
+
+        Args:
+            book_id (str): The ID of the book to be deleted.
+
+        Returns:
+            bool: True if the book was deleted, False if the book was not found.
+        """
+        with self._lock:
+            if self._catalogue.remove(book_id) is None:
+                return False
+            self._append(self._tracked([{"op": "delete", "id": book_id}]))
+            return True
+
+    def find_books(self, query: str, field: str) -> list[Book]:
+        """
+        Searches for books by a specified field (title, author, or year).
+
+        Args:
+            query (str): The search query.
+            field (str): The field to search by ('title', 'author', or 'year').
+
+        Returns:
+            List[Book]: A list of Book instances that match the search criteria.
+        """
+        return self._catalogue.search(query, field)
+
+    def fuzzy_find_books(self, query: str, field: str, limit: int = 10) -> list[Book]:
+        """
+        Finds the books whose field is most similar to the query, tolerating typos.
+
+        Args:
+            query (str): The possibly misspelt search query.
+            field (str): The field to search by ('title', 'author', or 'year').
+            limit (int): The maximum number of books to return.
+
+        Returns:
+            List[Book]: The best matches, best first.
+        """
+        return self._catalogue.fuzzy_search(query, field, limit)
+
+    def query(self, conditions: list[Condition]) -> list[Book]:
+        """
+        Finds the books matching all conditions of a compound query through the catalogue.
+
+        Args:
+            conditions (list[Condition]): The conditions, all of which must hold.
+
+        Returns:
+            List[Book]: The matching books.
+        """
+        return self._catalogue.query(conditions)
+
+    def aggregates(self) -> Aggregates:
+        """
+        Returns the book counts per status, author and year kept by the catalogue.
+
+        Returns:
+            Aggregates: The counts. Callers must not change them.
+        """
+        return self._catalogue.aggregates
+
+    def change_book_status(self, book_id: str, new_status: str) -> bool:
+        """
+        Changes the status of a book by its ID.
+
+        Args:
+            book_id (str): The ID of the book.
+            new_status (str): The new status of the book ('в наличии' or 'выдана').
+
+        Returns:
+            bool: True if the status was changed, False if the book was not found.
+        """
+        with self._lock:
+            if not self._catalogue.set_status(book_id, new_status):
+                return False
+            self._append(self._tracked([{"op": "status", "id": book_id, "status": new_status}]))
+            return True
+
+    def find_book(self, book_id: str) -> Book | None:
+        """
+        Finds and returns a book by its ID.
+
+        Args:
+            book_id (str): The ID of the book to find.
+
+        Returns:
+            Book: The book with the matching ID, or None if no such book exists.
+        """
+        return self._catalogue.get(book_id)
+
+    def has_book(self, book_id: str) -> bool:
+        """
+        Checks whether a book with the given ID exists.
+
+        Args:
+            book_id (str): The ID of the book.
+
+        Returns:
+            bool: True if the book exists.
+        """
+        return book_id in self._catalogue
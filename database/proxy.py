@@ -0,0 +1,84 @@
+from typing import Iterable, Iterator
+from models.models import Book
+from database.abstract_base import AbstractDatabase
+from database.aggregates import Aggregates
+from database.query import Condition
+
+
+class DatabaseProxy(AbstractDatabase):
+    """
+    Forwards every AbstractDatabase call to a wrapped database.
+
+    All calls go through _call(), so a subclass can observe or intercept them by
+    overriding that one method, or replace single operations.
+    """
+
+    def __init__(self, database: AbstractDatabase):
+        self.database = database
+
+    def _call(self, name: str, *args):
+        """
+        Calls a method of the wrapped database.
+
+        Args:
+            name (str): The method name.
+            *args: The positional arguments.
+
+        Returns:
+            Any: The result of the call.
+        """
+        return getattr(self.database, name)(*args)
+
+    def load_books(self) -> list[Book]:
+        return self._call("load_books")
+
+    def save_books(self, books: list[Book]) -> None:
+        return self._call("save_books", books)
+
+    def add_book(self, book: Book) -> None:
+        return self._call("add_book", book)
+
+    def add_books(self, books: Iterable[Book]) -> int:
+        return self._call("add_books", books)
+
+    def delete_book(self, book_id: str) -> bool:
+        return self._call("delete_book", book_id)
+
+    def find_books(self, query: str, field: str) -> list[Book]:
+        return self._call("find_books", query, field)
+
+    def fuzzy_find_books(self, query: str, field: str, limit: int = 10) -> list[Book]:
+        return self._call("fuzzy_find_books", query, field, limit)
+
+    def query(self, conditions: list[Condition]) -> list[Book]:
+        return self._call("query", conditions)
+
+    def aggregates(self) -> Aggregates:
+        return self._call("aggregates")
+
+    def change_book_status(self, book_id: str, new_status: str) -> bool:
+        return self._call("change_book_status", book_id, new_status)
+
+    def find_book(self, book_id: str) -> Book | None:
+        return self._call("find_book", book_id)
+
+    def has_book(self, book_id: str) -> bool:
+        return self._call("has_book", book_id)
+
+    def iter_books(self, offset: int = 0, limit: int | None = None) -> Iterator[Book]:
+        return self._call("iter_books", offset, limit)
+
+    def iter_sorted(self, field: str, buffer_size: int) -> Iterator[Book]:
+        return self._call("iter_sorted", field, buffer_size)
+
+    def flush(self) -> None:
+        return self._call("flush")
+
+    def close(self) -> None:
+        return self._call("close")
+
+    def counters(self) -> dict[str, int]:
+        return self._call("counters")
+
+    def data_version(self) -> object:
+        return self._call("data_version")
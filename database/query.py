@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from models.models import Book
+from core.config import message
+
+CONTAINS = "contains"
+EQUALS = "equals"
+BETWEEN = "between"
+QUERY_FIELDS = ("id", "title", "author", "year", "status")
+
+
+@dataclass(frozen=True, slots=True)
+class Condition:
+    """
+    One term of a compound query.
+
+    Text comparisons ignore case, while IDs and years are compared exactly. A ``between``
+    condition applies to the year only; its value is a (low, high) pair with inclusive
+    bounds, either of which may be None.
+
+    Attributes:
+        field (str): One of QUERY_FIELDS.
+        op (str): CONTAINS, EQUALS or BETWEEN.
+        value (object): The text or year to compare with, or the bounds of a range.
+    """
+
+    field: str
+    op: str
+    value: object
+
+    def __post_init__(self):
+        if self.field not in QUERY_FIELDS:
+            raise ValueError(message["invalid_field"] % str(QUERY_FIELDS))
+        if self.op == BETWEEN:
+            if self.field != "year" or not isinstance(self.value, tuple) or len(self.value) != 2:
+                raise ValueError(message["invalid_query"] % self)
+        elif self.op not in (CONTAINS, EQUALS):
+            raise ValueError(message["invalid_query"] % self)
+        elif self.field == "year" and self.op == EQUALS:
+            object.__setattr__(self, "value", int(str(self.value)))
+        elif self.field == "id" and self.op == EQUALS:
+            object.__setattr__(self, "value", str(self.value))
+        else:
+            object.__setattr__(self, "value", str(self.value).lower())
+
+    def matches(self, book: Book) -> bool:
+        """
+        Checks the condition against a book.
+
+        Args:
+            book (Book): The book to check.
+
+        Returns:
+            bool: True if the book satisfies the condition.
+        """
+        actual = getattr(book, self.field)
+        if isinstance(self.value, tuple):
+            low, high = self.value
+            return (low is None or actual >= low) and (high is None or actual <= high)
+        if self.op == EQUALS and self.field in ("id", "year"):
+            return actual == self.value
+        text = str(actual).lower()
+        if self.op == CONTAINS:
+            return str(self.value) in text
+        return text == self.value
+
+
+def parse_conditions(text: str) -> list[Condition]:
+    """
+    Parses a compound query such as ``author~толстой; year=1860..1870; status=в наличии``.
+
+    Terms are separated by semicolons. ``field~text`` matches a substring and
+    ``field=text`` the whole value; for the year, ``year=from..to`` matches a range in
+    which either bound may be left out.
+
+    Args:
+        text (str): The query.
+
+    Returns:
+        list[Condition]: The conditions, all of which must hold.
+
+    Raises:
+        ValueError: If a term cannot be parsed.
+    """
+    conditions = []
+    for term in text.split(";"):
+        term = term.strip()
+        if not term:
+            continue
+        positions = [pos for pos in (term.find("~"), term.find("=")) if pos > 0]
+        if not positions:
+            raise ValueError(message["invalid_query"] % term)
+        pos = min(positions)
+        field, value = term[:pos].strip().lower(), term[pos + 1:].strip()
+        if term[pos] == "~":
+            conditions.append(Condition(field, CONTAINS, value))
+        elif field == "year" and ".." in value:
+            low, high = (part.strip() for part in value.split("..", 1))
+            try:
+                bounds = (int(low) if low else None, int(high) if high else None)
+            except ValueError:
+                raise ValueError(message["invalid_query"] % term) from None
+            conditions.append(Condition(field, BETWEEN, bounds))
+        else:
+            if field == "year" and not value.lstrip("-").isdigit():
+                raise ValueError(message["invalid_query"] % term)
+            conditions.append(Condition(field, EQUALS, value))
+    if not conditions:
+        raise ValueError(message["invalid_query"] % text)
+    return conditions
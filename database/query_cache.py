@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable
+from models.models import Book
+from database.abstract_base import AbstractDatabase
+from database.proxy import DatabaseProxy
+
+
+class QueryCache(DatabaseProxy):
+    """
+    Keeps recent find_books results of the wrapped database in an LRU cache.
+
+    Entries are keyed by the lowercased query and the field, which every backend matches
+    case-insensitively, and are tagged with the generation counter and the data_version()
+    of the wrapped database at the time of the search. Every mutation made through the
+    cache bumps the generation, so a result found before a mutation is never returned
+    after it. Changes made around the cache, such as another process writing a shared
+    JSON file or SQLite database, change the data version, so they outdate the entry on
+    the next lookup. With a backend that reports no data version they are only noticed
+    once the entry is older than ``ttl`` seconds, after which every entry is searched
+    again (0 keeps entries until they are evicted or outdated).
+
+    At most ``max_entries`` results are kept; the least recently used one is evicted first.
+    """
+
+    def __init__(self, database: AbstractDatabase, max_entries: int = 256, ttl: float = 0):
+        super().__init__(database)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: OrderedDict[tuple[str, str], tuple[int, object, float, list[Book]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"cache_hits": 0, "cache_misses": 0, "evictions": 0, "expirations": 0}
+
+    def _mutated(self, name: str, *args):
+        """
+        Forwards a mutation and invalidates every cached result, even if the call fails.
+        """
+        try:
+            return self._call(name, *args)
+        finally:
+            with self._lock:
+                self.generation += 1
+                self._entries.clear()
+
+    def cache_counters(self) -> dict[str, int]:
+        """
+        Returns the counters of the query cache itself.
+
+        Returns:
+            dict[str, int]: Hits, misses, LRU evictions, TTL expirations and the number of
+                cached results.
+        """
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries)}
+
+    def find_books(self, query: str, field: str) -> list[Book]:
+        """
+        Returns the cached result of a search, or searches the wrapped database.
+
+        Args:
+            query (str): The search query.
+            field (str): The field to search by ('title', 'author', or 'year').
+
+        Returns:
+            List[Book]: A new list with the matching books.
+        """
+        key = (str(query).lower(), field)
+        now = time.monotonic()
+        with self._lock:
+            generation = self.generation
+        version = self._call("data_version")
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                current = entry[0] == generation and entry[1] == version
+                if current and not (self.ttl and now - entry[2] > self.ttl):
+                    self._entries.move_to_end(key)
+                    self._counters["cache_hits"] += 1
+                    return list(entry[3])
+                del self._entries[key]
+                if current:
+                    self._counters["expirations"] += 1
+            self._counters["cache_misses"] += 1
+        books = self._call("find_books", query, field)
+        with self._lock:
+            if generation == self.generation and self.max_entries:
+                self._entries[key] = (generation, version, now, list(books))
+                self._entries.move_to_end(key)
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        return books
+
+    def save_books(self, books: list[Book]) -> None:
+        return self._mutated("save_books", books)
+
+    def add_book(self, book: Book) -> None:
+        return self._mutated("add_book", book)
+
+    def add_books(self, books: Iterable[Book]) -> int:
+        return self._mutated("add_books", books)
+
+    def delete_book(self, book_id: str) -> bool:
+        return self._mutated("delete_book", book_id)
+
+    def change_book_status(self, book_id: str, new_status: str) -> bool:
+        return self._mutated("change_book_status", book_id, new_status)
@@ -0,0 +1,560 @@
+"""
+Fixed-size binary record storage, and a converter from the JSON library format.
+
+Usage:
+    python -m database.record_database library_books.json library_books.records
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import chain, islice, repeat
+from typing import Iterable, Iterator
+from models.models import Book
+from database.abstract_base import AbstractDatabase
+from database.aggregates import Aggregates
+from database.files import fsync_directory
+from database.json_database import JsonDatabase
+from core.config import valid_status
+
+MAGIC = b"LBRC"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+RECORD = struct.Struct("<BBxxi64s256s128s")
+LIVE = 1
+YEAR_MIN, YEAR_MAX = -2 ** 31, 2 ** 31 - 1
+FIELD_SLICES = {"id": (8, 72), "title": (72, 328), "author": (328, 456)}
+INITIAL_CAPACITY = 64
+READ_BLOCK = 1024
+PARALLEL_MIN_SLOTS = 50_000
+CHUNKS_PER_WORKER = 4
+
+
+def encode_record(book: Book) -> bytes:
+    """
+    Packs a book into one live record.
+
+    Args:
+        book (Book): The book to pack.
+
+    Returns:
+        bytes: The record.
+
+    Raises:
+        ValueError: If the status is unknown, the year does not fit a 32-bit integer or a text
+            field does not fit its slot.
+    """
+    if book.status not in valid_status:
+        raise ValueError("Unknown status: %s" % book.status)
+    if not YEAR_MIN <= int(book.year) <= YEAR_MAX:
+        raise ValueError("The year %s is out of range" % book.year)
+    fields = {"id": book.id, "title": book.title, "author": book.author}
+    encoded = {name: value.encode("utf-8") for name, value in fields.items()}
+    for name, value in encoded.items():
+        start, stop = FIELD_SLICES[name]
+        if len(value) > stop - start:
+            raise ValueError("The %s is longer than %d bytes" % (name, stop - start))
+    return RECORD.pack(
+        LIVE, valid_status.index(book.status), int(book.year), encoded["id"], encoded["title"], encoded["author"],
+    )
+
+
+def decode_record(record: bytes) -> Book:
+    """
+    Unpacks a record into a book.
+
+    Args:
+        record (bytes): The record.
+
+    Returns:
+        Book: The book.
+    """
+    _, status, year, book_id, title, author = RECORD.unpack(record)
+    return Book(
+        title.rstrip(b"\0").decode("utf-8"),
+        author.rstrip(b"\0").decode("utf-8"),
+        year,
+        book_id.rstrip(b"\0").decode("utf-8"),
+        valid_status[status],
+    )
+
+
+def match_slots(buffer: mmap.mmap, start: int, stop: int, query: str, field: str) -> list[int]:
+    """
+    Returns the live slots in a range whose field contains the query.
+
+    Only the searched field of each record is decoded.
+
+    Args:
+        buffer (mmap.mmap): The mapped record file.
+        start (int): The first slot to check.
+        stop (int): The slot after the last one to check.
+        query (str): The lowercased search query.
+        field (str): The field to search by.
+
+    Returns:
+        list[int]: The matching slots in ascending order.
+    """
+    found = []
+    for slot in range(start, stop):
+        offset = HEADER.size + slot * RECORD.size
+        if buffer[offset] != LIVE:
+            continue
+        if field == "year":
+            value = str(struct.unpack_from("<i", buffer, offset + 4)[0])
+        elif field in FIELD_SLICES:
+            first, last = FIELD_SLICES[field]
+            value = buffer[offset + first:offset + last].rstrip(b"\0").decode("utf-8").lower()
+        else:
+            value = str(getattr(decode_record(buffer[offset:offset + RECORD.size]), field)).lower()
+        if query in value:
+            found.append(slot)
+    return found
+
+
+def scan_records(file_path: str, start: int, stop: int, query: str, field: str) -> list[int]:
+    """
+    Searches a range of slots of a record file; run in a worker process.
+
+    The worker maps the file itself, so the records are shared through the page cache
+    instead of being pickled, and only the numbers of the matching slots travel back.
+
+    Args:
+        file_path (str): The record file.
+        start (int): The first slot to check.
+        stop (int): The slot after the last one to check.
+        query (str): The lowercased search query.
+        field (str): The field to search by.
+
+    Returns:
+        list[int]: The matching slots in ascending order.
+    """
+    with open(file_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return match_slots(buffer, start, stop, query, field)
+
+
+class RecordDatabase(AbstractDatabase):
+    """
+    A class to handle database operations over a file of fixed-size binary records.
+
+    After a 16-byte header every book takes RECORD.size bytes: a live flag, a status code
+    into ``valid_status``, the year, and the ID, title and author as NUL-padded UTF-8. The
+    file is memory-mapped, and an in-memory dict maps IDs to record slots, so find_book
+    decodes a single record and change_book_status and delete_book each change one byte in
+    place. Deleted slots are reused by later additions, and the file grows by doubling.
+    The counts of the report are taken by one scan on first use and then kept up to date
+    by every mutation.
+
+    A text that does not fit its field (IDs up to 64, titles up to 256 and authors up to
+    128 bytes) or an unknown status is rejected with ValueError. The file is meant to be
+    opened by one process at a time.
+
+    With ``workers`` above 1 (None for one per CPU), a search over at least
+    ``parallel_min`` slots is split into chunks scanned by a process pool. The workers map
+    the same file, so the scan scales with the cores without copying the records.
+    """
+
+    def __init__(
+        self, file_path: str, fsync: bool = True, workers: int | None = 1, parallel_min: int = PARALLEL_MIN_SLOTS,
+    ):
+        self.file_path = file_path
+        self.fsync = fsync
+        self.parallel_min = parallel_min
+        self._workers = workers or os.cpu_count() or 1
+        self._processes: Executor | None = None
+        self._lock = threading.RLock()
+        self._counters = {"records_written": 0, "bytes_written": 0, "syncs": 0}
+        if not os.path.exists(file_path):
+            self._create(file_path, [])
+        self._open()
+
+    @staticmethod
+    def _create(file_path: str, records: list[bytes]) -> None:
+        """
+        Atomically writes a new record file holding the given records.
+
+        Args:
+            file_path (str): The target path.
+            records (list[bytes]): The encoded records.
+        """
+        directory = os.path.dirname(os.path.abspath(file_path))
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=".%s." % os.path.basename(file_path))
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size, len(records)))
+                file.write(b"".join(records))
+                file.truncate(HEADER.size + RECORD.size * max(len(records), INITIAL_CAPACITY))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, file_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        fsync_directory(directory)
+
+    def _open(self) -> None:
+        """
+        Maps the file and indexes the live records.
+
+        Raises:
+            ValueError: If the file is not a record file of this format.
+        """
+        self._file = open(self.file_path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, version, record_size, used = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError("Not a library record file: %s" % self.file_path)
+        self._used = used
+        self._slots: dict[str, int] = {}
+        self._free: list[int] = []
+        self._aggregates: Aggregates | None = None
+        start, stop = FIELD_SLICES["id"]
+        for slot in range(used):
+            offset = self._offset(slot)
+            if self._map[offset] == LIVE:
+                self._slots[self._map[offset + start:offset + stop].rstrip(b"\0").decode("utf-8")] = slot
+            else:
+                self._free.append(slot)
+        self._free.reverse()
+
+    @staticmethod
+    def _offset(slot: int) -> int:
+        return HEADER.size + slot * RECORD.size
+
+    def _capacity(self) -> int:
+        return (len(self._map) - HEADER.size) // RECORD.size
+
+    def _grow(self) -> None:
+        """
+        Doubles the room for records and maps the file again.
+        """
+        size = self._offset(self._capacity() * 2)
+        self._map.close()
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _sync(self, start: int, stop: int) -> None:
+        """
+        Flushes the changed byte range of the map to disk when fsync is enabled.
+
+        Args:
+            start (int): The first changed byte.
+            stop (int): The byte after the last changed one.
+        """
+        if not self.fsync:
+            return
+        aligned = start - start % mmap.ALLOCATIONGRANULARITY
+        self._map.flush(aligned, stop - aligned)
+        self._counters["syncs"] += 1
+
+    def _store(self, record: bytes) -> tuple[int, int]:
+        """
+        Writes a live record into a free slot, publishing it by its flag byte last.
+
+        Args:
+            record (bytes): The encoded record.
+
+        Returns:
+            tuple[int, int]: The slot and the offset of the record.
+        """
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = self._used
+            if slot >= self._capacity():
+                self._grow()
+        offset = self._offset(slot)
+        self._map[offset + 1:offset + RECORD.size] = record[1:]
+        self._map[offset] = LIVE
+        if slot == self._used:
+            self._used += 1
+            struct.pack_into("<Q", self._map, 8, self._used)
+        self._counters["records_written"] += 1
+        self._counters["bytes_written"] += RECORD.size
+        return slot, offset
+
+    def _add(self, books: Iterable[Book]) -> int:
+        """
+        Adds books, giving a fresh ID to a book whose ID is taken, and syncs once.
+
+        Args:
+            books (Iterable[Book]): The books to add.
+
+        Returns:
+            int: The number of books added.
+        """
+        new_books = list(books)
+        for book in new_books:
+            encode_record(book)
+        with self._lock:
+            start, stop = len(self._map), 0
+            for book in new_books:
+                if book.id in self._slots:
+                    book.id = str(uuid.uuid4())
+                slot, offset = self._store(encode_record(book))
+                self._slots[book.id] = slot
+                if self._aggregates is not None:
+                    self._aggregates.add(book)
+                start, stop = min(start, offset), max(stop, offset + RECORD.size)
+            if new_books:
+                self._sync(0, HEADER.size)
+                self._sync(start, stop)
+        return len(new_books)
+
+    def close(self) -> None:
+        """
+        Flushes and unmaps the file and stops the worker pool.
+        """
+        with self._lock:
+            if not self._map.closed:
+                if self.fsync:
+                    self._map.flush()
+                self._map.close()
+            self._file.close()
+            if self._processes is not None:
+                self._processes.shutdown()
+                self._processes = None
+
+    def counters(self) -> dict[str, int]:
+        """
+        Returns the write counters.
+
+        Returns:
+            dict[str, int]: Records and bytes written, and range syncs.
+        """
+        return dict(self._counters)
+
+    def load_books(self) -> list[Book]:
+        """
+        Decodes every live record.
+
+        Returns:
+            List[Book]: A list of Book instances.
+        """
+        return list(self.iter_books())
+
+    def iter_books(self, offset: int = 0, limit: int | None = None) -> Iterator[Book]:
+        """
+        Lazily yields books in slot order, starting at ``offset``.
+
+        Args:
+            offset (int): The number of books to skip.
+            limit (int | None): The maximum number of books to yield, or None for all.
+
+        Returns:
+            Iterator[Book]: The books.
+        """
+        stop = None if limit is None else offset + limit
+        return islice(self._iter_records(), offset, stop)
+
+    def _iter_records(self) -> Iterator[Book]:
+        for start in range(0, self._used, READ_BLOCK):
+            stop = min(start + READ_BLOCK, self._used)
+            block = self._map[self._offset(start):self._offset(stop)]
+            for flag, status, year, book_id, title, author in RECORD.iter_unpack(block):
+                if flag == LIVE:
+                    yield Book(
+                        title.rstrip(b"\0").decode("utf-8"),
+                        author.rstrip(b"\0").decode("utf-8"),
+                        year,
+                        book_id.rstrip(b"\0").decode("utf-8"),
+                        valid_status[status],
+                    )
+
+    def save_books(self, books: list[Book]) -> None:
+        """
+        Replaces the file with one holding exactly the given books.
+
+        Args:
+            books list[Book]: A instance of Book to be saved.
+        """
+        taken: set[str] = set()
+        records = []
+        for book in books:
+            if book.id in taken:
+                book.id = str(uuid.uuid4())
+            taken.add(book.id)
+            records.append(encode_record(book))
+        with self._lock:
+            self._create(self.file_path, records)
+            self.close()
+            self._open()
+        self._counters["records_written"] += len(records)
+        self._counters["bytes_written"] += HEADER.size + RECORD.size * len(records)
+
+    def add_book(self, book: Book) -> None:
+        """
+        Adds a new book to the library.
+
+        Args:
+            book (Book)
+        """
+        self._add([book])
+
+    def add_books(self, books: Iterable[Book]) -> int:
+        """
+        Adds many books with a single sync.
+
+        Args:
+            books (Iterable[Book]): The books to be added.
+
+        Returns:
+            int: The number of books added.
+        """
+        return self._add(books)
+
+    def delete_book(self, book_id: str) -> bool:
+        """
+        Deletes a book by clearing the live flag of its record.
+
+        Args:
+            book_id (str): The ID of the book to be deleted.
+
+        Returns:
+            bool: True if the book was deleted, False if the book was not found.
+        """
+        with self._lock:
+            slot = self._slots.pop(book_id, None)
+            if slot is None:
+                return False
+            offset = self._offset(slot)
+            if self._aggregates is not None:
+                self._aggregates.remove(decode_record(self._map[offset:offset + RECORD.size]))
+            self._map[offset] = 0
+            self._free.append(slot)
+            self._sync(offset, offset + 1)
+            return True
+
+    def find_books(self, query: str, field: str) -> list[Book]:
+        """
+        Searches for books by a specified field (title, author, or year).
+
+        Only the searched field is decoded until a record matches. Large files are scanned
+        in parallel when the database has more than one worker.
+
+        Args:
+            query (str): The search query.
+            field (str): The field to search by ('title', 'author', or 'year').
+
+        Returns:
+            List[Book]: A list of Book instances that match the search criteria.
+        """
+        query = str(query).lower()
+        with self._lock:
+            used = self._used
+            if self._workers > 1 and used >= self.parallel_min:
+                if self._processes is None:
+                    self._processes = ProcessPoolExecutor(self._workers)
+                step = -(-used // (self._workers * CHUNKS_PER_WORKER))
+                starts = range(0, used, step)
+                slots: Iterable[int] = chain.from_iterable(self._processes.map(
+                    scan_records, repeat(self.file_path), starts, [min(start + step, used) for start in starts],
+                    repeat(query), repeat(field),
+                ))
+            else:
+                slots = match_slots(self._map, 0, used, query, field)
+            return [decode_record(self._map[self._offset(slot):self._offset(slot + 1)]) for slot in slots]
+
+    def aggregates(self) -> Aggregates:
+        """
+        Returns the book counts per status, author and year.
+
+        The first call scans the records once; later mutations keep the counts up to date.
+
+        Returns:
+            Aggregates: The counts. Callers must not change them.
+        """
+        with self._lock:
+            if self._aggregates is None:
+                self._aggregates = Aggregates(self._iter_records())
+            return self._aggregates
+
+    def change_book_status(self, book_id: str, new_status: str) -> bool:
+        """
+        Changes the status of a book by rewriting its status byte.
+
+        Args:
+            book_id (str): The ID of the book.
+            new_status (str): The new status of the book ('в наличии' or 'выдана').
+
+        Returns:
+            bool: True if the status was changed, False if the book was not found.
+
+        Raises:
+            ValueError: If the status is unknown.
+        """
+        if new_status not in valid_status:
+            raise ValueError("Unknown status: %s" % new_status)
+        with self._lock:
+            slot = self._slots.get(book_id)
+            if slot is None:
+                return False
+            offset = self._offset(slot) + 1
+            if self._aggregates is not None:
+                self._aggregates.change_status(valid_status[self._map[offset]], new_status)
+            self._map[offset] = valid_status.index(new_status)
+            self._sync(offset, offset + 1)
+            return True
+
+    def find_book(self, book_id: str) -> Book | None:
+        """
+        Finds a book by its ID, decoding only its record.
+
+        Args:
+            book_id (str): The ID of the book to find.
+
+        Returns:
+            Book: The book with the matching ID, or None if no such book exists.
+        """
+        slot = self._slots.get(book_id)
+        if slot is None:
+            return None
+        offset = self._offset(slot)
+        return decode_record(self._map[offset:offset + RECORD.size])
+
+    def has_book(self, book_id: str) -> bool:
+        """
+        Checks whether a book with the given ID exists.
+
+        Args:
+            book_id (str): The ID of the book.
+
+        Returns:
+            bool: True if the book exists.
+        """
+        return book_id in self._slots
+
+
+def convert_json_library(json_path: str, record_path: str, batch: int = 10_000) -> int:
+    """
+    Copies a JSON library into a new record file, streaming the JSON in batches.
+
+    Args:
+        json_path (str): The JSON library.
+        record_path (str): The record file to create; an existing one is replaced.
+        batch (int): The number of books decoded per write.
+
+    Returns:
+        int: The number of books converted.
+    """
+    database = RecordDatabase(record_path)
+    database.save_books([])
+    books = JsonDatabase(json_path).iter_books()
+    count = 0
+    try:
+        while chunk := list(islice(books, batch)):
+            count += database.add_books(chunk)
+    finally:
+        database.close()
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    print("Converted %d books" % convert_json_library(sys.argv[1], sys.argv[2]))
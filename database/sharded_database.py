@@ -0,0 +1,465 @@
+import heapq
+import json
+import os
+import uuid
+import zlib
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, islice
+from typing import Iterable, Iterator
+from models.models import Book
+from database.abstract_base import AbstractDatabase
+from database.aggregates import Aggregates
+from database.indexes import rank_fuzzy
+from database.files import atomic_write_json
+from database.json_database import JsonDatabase
+from database.query import Condition, EQUALS
+from database.sorting import sort_key
+
+
+def shard_paths(file_path: str, shards: int) -> list[str]:
+    """
+    Returns the shard file names of a library: "books.json" becomes "books.00.json", ...
+
+    Args:
+        file_path (str): The path of the library.
+        shards (int): The number of shards.
+
+    Returns:
+        list[str]: One path per shard.
+    """
+    root, extension = os.path.splitext(file_path)
+    return ["%s.%02d%s" % (root, number, extension) for number in range(shards)]
+
+
+def layout_path(file_path: str) -> str:
+    """
+    Returns the path of the file that records how many shards a library has.
+
+    Args:
+        file_path (str): The path of the library.
+
+    Returns:
+        str: For example "library_books.json.shards".
+    """
+    return file_path + ".shards"
+
+
+def read_shard_count(file_path: str) -> int | None:
+    """
+    Returns the number of shards a library was created with.
+
+    A sharded library created before the count was recorded has no layout file; its count
+    is then the number of consecutive shard files.
+
+    Args:
+        file_path (str): The path of the library.
+
+    Returns:
+        int | None: The number of shards, or None if the library has no shards yet.
+
+    Raises:
+        ValueError: If the layout file is corrupt.
+    """
+    try:
+        with open(layout_path(file_path), "r", encoding="utf-8") as file:
+            layout = json.load(file)
+    except FileNotFoundError:
+        count = 0
+        while os.path.exists(shard_paths(file_path, count + 1)[count]):
+            count += 1
+        return count or None
+    except json.JSONDecodeError as ex:
+        raise ValueError("Corrupt shard layout %s: %s" % (layout_path(file_path), ex)) from None
+    if not isinstance(layout, dict) or not isinstance(layout.get("shards"), int):
+        raise ValueError("Corrupt shard layout %s" % layout_path(file_path))
+    return layout["shards"]
+
+
+def scan_shard(file_path: str, query: str, field: str) -> list[Book]:
+    """
+    Searches one shard file; run in a worker process, it returns only the matches.
+
+    Args:
+        file_path (str): The path of the shard.
+        query (str): The search query.
+        field (str): The field to search by.
+
+    Returns:
+        list[Book]: The matching books.
+    """
+    return JsonDatabase(file_path).find_books(query, field)
+
+
+class ShardedDatabase(AbstractDatabase):
+    """
+    A class to handle database operations over a library split into several JSON files.
+
+    A book lives in the shard selected by the CRC32 of its ID, so adding, deleting or
+    changing the status of a book rewrites one shard instead of the whole library. Every
+    shard is a JsonDatabase with the given ``cache``, ``commit_interval`` and ``fsync``
+    settings, including its own file lock and version counter.
+
+    Loading and searching read the shards in parallel. Resident shards are searched on a
+    thread pool. Without the cache the search is CPU bound JSON decoding, so the shards are
+    scanned on a process pool and only the matches travel back. Books are returned shard by
+    shard, so the order of insertion is kept only within a shard.
+
+    The number of shards is recorded in ``layout_path(file_path)``, because a book found by
+    the hash of its ID under one count is not found under another; opening a library with
+    a different count raises ValueError. A single-file library at ``file_path`` without
+    shards is split into shards on first open and then renamed to ``file_path + ".migrated"``.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        shards: int = 8,
+        cache: bool = False,
+        commit_interval: float = 0,
+        fsync: bool = True,
+        workers: int | None = None,
+    ):
+        if shards < 1:
+            raise ValueError("At least one shard is needed")
+        self.file_path = file_path
+        self.paths = shard_paths(file_path, shards)
+        self.cache = cache
+        self.fsync = fsync
+        migrate = not os.path.exists(layout_path(file_path)) and os.path.exists(file_path)
+        existing = None if migrate else read_shard_count(file_path)
+        if existing is not None and existing != shards:
+            raise ValueError("The library %s has %d shards, not %d" % (file_path, existing, shards))
+        self._shards = [JsonDatabase(path, cache, commit_interval, fsync) for path in self.paths]
+        self._workers = workers or min(shards, os.cpu_count() or 1)
+        self._threads = ThreadPoolExecutor(self._workers)
+        self._processes: Executor | None = None
+        if migrate:
+            self._migrate()
+        elif not os.path.exists(layout_path(file_path)):
+            atomic_write_json(layout_path(file_path), {"shards": shards}, fsync=fsync)
+
+    def _migrate(self) -> None:
+        """
+        Splits the single-file library at ``file_path`` into the shards.
+
+        The layout file is written only after every shard, and the single file is renamed
+        only after the layout file, so an interrupted migration is simply run again.
+        """
+        self.save_books(JsonDatabase(self.file_path).load_books())
+        self.flush()
+        atomic_write_json(layout_path(self.file_path), {"shards": len(self._shards)}, fsync=self.fsync)
+        os.replace(self.file_path, self.file_path + ".migrated")
+
+    def _number(self, book_id: str) -> int:
+        """
+        Returns the number of the shard that holds the book with the given ID.
+
+        Args:
+            book_id (str): The ID of the book.
+
+        Returns:
+            int: The shard number.
+        """
+        return zlib.crc32(book_id.encode("utf-8")) % len(self._shards)
+
+    def _shard(self, book_id: str) -> JsonDatabase:
+        """
+        Returns the shard that holds the book with the given ID.
+
+        Args:
+            book_id (str): The ID of the book.
+
+        Returns:
+            JsonDatabase: The shard.
+        """
+        return self._shards[self._number(book_id)]
+
+    def _place(self, number: int, books: list[Book]) -> list[Book]:
+        """
+        Adds books to a shard and takes back those the shard renumbered out of it.
+
+        A shard gives a fresh ID to a book whose ID it finds taken, for example by a book
+        another process added meanwhile. If the fresh ID hashes to another shard, the book
+        would not be found under it, so it is deleted again and returned to be re-routed.
+
+        Args:
+            number (int): The shard number.
+            books (list[Book]): The books whose IDs hash to that shard.
+
+        Returns:
+            list[Book]: The books to add to another shard under their new IDs.
+        """
+        ids = [book.id for book in books]
+        shard = self._shards[number]
+        shard.add_books(books)
+        moved = [book for book, book_id in zip(books, ids) if book.id != book_id and self._number(book.id) != number]
+        for book in moved:
+            shard.delete_book(book.id)
+        return moved
+
+    def _add(self, groups: dict[int, list[Book]]) -> None:
+        """
+        Adds grouped books to their shards in parallel, re-routing renumbered ones.
+
+        Args:
+            groups (dict[int, list[Book]]): The books of every shard, as made by _partition.
+        """
+        while groups:
+            moved = self._threads.map(lambda item: self._place(*item), groups.items())
+            groups = self._partition(chain.from_iterable(moved), stored=True)
+
+    def _partition(self, books: Iterable[Book], stored: bool = False) -> dict[int, list[Book]]:
+        """
+        Groups books by shard number, giving a fresh ID to a book whose ID is taken.
+
+        Args:
+            books (Iterable[Book]): The books to place.
+            stored (bool): Whether the IDs already stored in the shards count as taken.
+
+        Returns:
+            dict[int, list[Book]]: The books of every shard, in their original order.
+        """
+        groups: dict[int, list[Book]] = defaultdict(list)
+        taken: dict[int, set[str]] = {}
+        for book in books:
+            while True:
+                number = self._number(book.id)
+                if number not in taken:
+                    taken[number] = {existing.id for existing in self._shards[number].iter_books()} if stored else set()
+                if book.id not in taken[number]:
+                    break
+                book.id = str(uuid.uuid4())
+            taken[number].add(book.id)
+            groups[number].append(book)
+        return groups
+
+    def flush(self) -> None:
+        """
+        Persists the mutations waiting for the group commit in every shard.
+        """
+        for shard in self._shards:
+            shard.flush()
+
+    def close(self) -> None:
+        """
+        Persists pending mutations and stops the worker pools.
+        """
+        self.flush()
+        self._threads.shutdown()
+        if self._processes is not None:
+            self._processes.shutdown()
+            self._processes = None
+
+    def counters(self) -> dict[str, int]:
+        """
+        Returns the I/O and cache counters summed over the shards.
+
+        Returns:
+            dict[str, int]: The counters of JsonDatabase.
+        """
+        totals: dict[str, int] = defaultdict(int)
+        for shard in self._shards:
+            for name, value in shard.counters().items():
+                totals[name] += value
+        return dict(totals)
+
+    def data_version(self) -> object:
+        """
+        Returns the data versions of all shards.
+
+        Returns:
+            object: A tuple with the stamp of every shard file.
+        """
+        return tuple(shard.data_version() for shard in self._shards)
+
+    def load_books(self) -> list[Book]:
+        """
+        Loads the books of all shards in parallel.
+
+        Returns:
+            List[Book]: A list of Book instances.
+        """
+        return list(chain.from_iterable(self._threads.map(JsonDatabase.load_books, self._shards)))
+
+    def iter_books(self, offset: int = 0, limit: int | None = None) -> Iterator[Book]:
+        """
+        Lazily yields books shard by shard, starting at ``offset``.
+
+        Args:
+            offset (int): The number of books to skip.
+            limit (int | None): The maximum number of books to yield, or None for all.
+
+        Returns:
+            Iterator[Book]: The books.
+        """
+        stop = None if limit is None else offset + limit
+        return islice(chain.from_iterable(shard.iter_books() for shard in self._shards), offset, stop)
+
+    def save_books(self, books: list[Book]) -> None:
+        """
+        Replaces the library, writing every shard.
+
+        Args:
+            books list[Book]: A instance of Book to be saved.
+        """
+        groups = self._partition(books)
+        list(self._threads.map(
+            lambda number: self._shards[number].save_books(groups.get(number, [])), range(len(self._shards)),
+        ))
+
+    def add_book(self, book: Book) -> None:
+        """
+        Adds a new book to its shard.
+
+        Args:
+            book (Book)
+        """
+        while self._shard(book.id).has_book(book.id):
+            book.id = str(uuid.uuid4())
+        self._add({self._number(book.id): [book]})
+
+    def add_books(self, books: Iterable[Book]) -> int:
+        """
+        Adds many books with one rewrite of every shard that receives any.
+
+        Args:
+            books (Iterable[Book]): The books to be added.
+
+        Returns:
+            int: The number of books added.
+        """
+        groups = self._partition(books, stored=True)
+        count = sum(len(group) for group in groups.values())
+        self._add(groups)
+        return count
+
+    def delete_book(self, book_id: str) -> bool:
+        """
+        Deletes a book from the library by its ID.
+
+        Args:
+            book_id (str): The ID of the book to be deleted.
+
+        Returns:
+            bool: True if the book was deleted, False if the book was not found.
+        """
+        return self._shard(book_id).delete_book(book_id)
+
+    def find_books(self, query: str, field: str) -> list[Book]:
+        """
+        Searches all shards in parallel by a specified field (title, author, or year).
+
+        Args:
+            query (str): The search query.
+            field (str): The field to search by ('title', 'author', or 'year').
+
+        Returns:
+            List[Book]: A list of Book instances that match the search criteria.
+        """
+        if self.cache:
+            results = self._threads.map(lambda shard: shard.find_books(query, field), self._shards)
+        else:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(self._workers)
+            results = self._processes.map(scan_shard, self.paths, [query] * len(self.paths), [field] * len(self.paths))
+        return list(chain.from_iterable(results))
+
+    def fuzzy_find_books(self, query: str, field: str, limit: int = 10) -> list[Book]:
+        """
+        Ranks the best matches of every shard together, tolerating typos.
+
+        Args:
+            query (str): The possibly misspelt search query.
+            field (str): The field to search by ('title', 'author', or 'year').
+            limit (int): The maximum number of books to return.
+
+        Returns:
+            List[Book]: The best matches, best first.
+        """
+        results = self._threads.map(lambda shard: shard.fuzzy_find_books(query, field, limit), self._shards)
+        books = {book.id: book for book in chain.from_iterable(results)}
+        return [books[book_id] for book_id in rank_fuzzy(
+            query, ((book.id, getattr(book, field)) for book in books.values()), limit,
+        )]
+
+    def query(self, conditions: list[Condition]) -> list[Book]:
+        """
+        Runs a compound query on every shard in parallel and concatenates the results.
+
+        An equality on the ID is answered by its own shard alone.
+
+        Args:
+            conditions (list[Condition]): The conditions, all of which must hold.
+
+        Returns:
+            List[Book]: The matching books, grouped by shard.
+        """
+        for condition in conditions:
+            if condition.field == "id" and condition.op == EQUALS:
+                return self._shard(str(condition.value)).query(conditions)
+        return list(chain.from_iterable(self._threads.map(lambda shard: shard.query(conditions), self._shards)))
+
+    def aggregates(self) -> Aggregates:
+        """
+        Adds up the book counts of every shard.
+
+        Returns:
+            Aggregates: New counts for the whole library.
+        """
+        total = Aggregates()
+        for aggregates in self._threads.map(lambda shard: shard.aggregates(), self._shards):
+            total.update(aggregates)
+        return total
+
+    def iter_sorted(self, field: str, buffer_size: int) -> Iterator[Book]:
+        """
+        Sorts every shard and merges the sorted shards lazily.
+
+        Args:
+            field (str): "title", "author" or "year".
+            buffer_size (int): The number of books the sort may hold in memory, shared by
+                the shards.
+
+        Returns:
+            Iterator[Book]: The books in ascending order of the field.
+        """
+        share = max(buffer_size // len(self._shards), 1)
+        return heapq.merge(*(shard.iter_sorted(field, share) for shard in self._shards), key=sort_key(field))
+
+    def change_book_status(self, book_id: str, new_status: str) -> bool:
+        """
+        Changes the status of a book by its ID.
+
+        Args:
+            book_id (str): The ID of the book.
+            new_status (str): The new status of the book ('в наличии' or 'выдана').
+
+        Returns:
+            bool: True if the status was changed, False if the book was not found.
+        """
+        return self._shard(book_id).change_book_status(book_id, new_status)
+
+    def find_book(self, book_id: str) -> Book | None:
+        """
+        Finds and returns a book by its ID.
+
+        Args:
+            book_id (str): The ID of the book to find.
+
+        Returns:
+            Book: The book with the matching ID, or None if no such book exists.
+        """
+        return self._shard(book_id).find_book(book_id)
+
+    def has_book(self, book_id: str) -> bool:
+        """
+        Checks whether a book with the given ID exists.
+
+        Args:
+            book_id (str): The ID of the book.
+
+        Returns:
+            bool: True if the book exists.
+        """
+        return self._shard(book_id).has_book(book_id)
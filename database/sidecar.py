@@ -0,0 +1,84 @@
+import marshal
+import os
+from database.files import atomic_write
+from database.indexes import TrigramIndex, ValueIndex
+
+SIDECAR_FORMAT = 1
+INDEX_KINDS: dict[str, type[TrigramIndex] | type[ValueIndex]] = {"trigram": TrigramIndex, "value": ValueIndex}
+
+
+def sidecar_path(file_path: str, kind: str, field: str) -> str:
+    """
+    Returns the path of the file that keeps one index of a library next to it.
+
+    Args:
+        file_path (str): The path of the library.
+        kind (str): The index kind, a key of INDEX_KINDS.
+        field (str): The indexed field.
+
+    Returns:
+        str: For example "library_books.json.trigram-title.idx".
+    """
+    return "%s.%s-%s.idx" % (file_path, kind, field)
+
+
+def save_index(path: str, stamp: tuple, index: TrigramIndex | ValueIndex, fsync: bool = True) -> int:
+    """
+    Atomically writes an index to a sidecar file, stamped with the state of its data file.
+
+    A small header with the format, the kind and the stamp comes first, so a stale sidecar
+    is recognised without decoding the index.
+
+    Args:
+        path (str): The sidecar path.
+        stamp (tuple): Identifies the exact data file the index was built from.
+        index (TrigramIndex | ValueIndex): The index.
+        fsync (bool): Whether to flush the file to disk.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    kind = next(name for name, cls in INDEX_KINDS.items() if isinstance(index, cls))
+
+    def write(file):
+        marshal.dump((SIDECAR_FORMAT, kind, stamp), file)
+        marshal.dump(index.state(), file)
+
+    return atomic_write(path, write, binary=True, fsync=fsync)
+
+
+def load_index(path: str, kind: str, stamp: tuple) -> TrigramIndex | ValueIndex | None:
+    """
+    Reads an index from a sidecar file if it was saved for the given data file.
+
+    Args:
+        path (str): The sidecar path.
+        kind (str): The expected index kind.
+        stamp (tuple): Identifies the data file the index must have been built from.
+
+    Returns:
+        TrigramIndex | ValueIndex | None: The index, or None if the sidecar is missing,
+            unreadable, of another format or kind, or stale.
+    """
+    try:
+        with open(path, "rb") as file:
+            if marshal.load(file) != (SIDECAR_FORMAT, kind, tuple(stamp)):
+                return None
+            state = marshal.loads(file.read())
+        return INDEX_KINDS[kind].from_state(state)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def remove_sidecars(file_path: str) -> None:
+    """
+    Deletes every sidecar file of a library.
+
+    Args:
+        file_path (str): The path of the library.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    prefix = os.path.basename(file_path) + "."
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(".idx"):
+            os.remove(os.path.join(directory, name))
@@ -0,0 +1,97 @@
+import heapq
+import json
+import tempfile
+from itertools import islice
+from typing import IO, Callable, Iterable, Iterator
+from models.models import Book
+
+SORT_FIELDS = ("title", "author", "year")
+MAX_FAN_IN = 64
+SortKey = Callable[[Book], str | int]
+
+
+def sort_key(field: str) -> SortKey:
+    """
+    Returns the sort key of a field: text is compared ignoring case, the year as a number.
+
+    Args:
+        field (str): One of SORT_FIELDS.
+
+    Returns:
+        SortKey: The key function.
+
+    Raises:
+        ValueError: If the field cannot be sorted by.
+    """
+    if field == "year":
+        return lambda book: book.year
+    if field in SORT_FIELDS:
+        return lambda book: getattr(book, field).lower()
+    raise ValueError("Cannot sort by %s" % field)
+
+
+def _spill(books: Iterable[Book]) -> IO[str]:
+    """
+    Writes books to an anonymous temporary file as JSON lines and rewinds it.
+    """
+    run = tempfile.TemporaryFile("w+", encoding="utf-8")
+    for book in books:
+        run.write(json.dumps(book.to_dict(), ensure_ascii=False))
+        run.write("\n")
+    run.seek(0)
+    return run
+
+
+def _read(run: IO[str]) -> Iterator[Book]:
+    """
+    Reads back the books of a run written by _spill.
+    """
+    for line in run:
+        yield Book.from_dict(json.loads(line))
+
+
+def external_sort(books: Iterable[Book], field: str, buffer_size: int) -> Iterator[Book]:
+    """
+    Lazily sorts books by a field, holding at most ``buffer_size`` of them in memory.
+
+    Books are read in runs of ``buffer_size``. Each run is sorted in memory. If the input
+    fits in one run, nothing touches the disk. Otherwise every run is spilled to a
+    temporary file, and the runs are merged lazily, so the first books are yielded before
+    the rest of the merge. When there are more than MAX_FAN_IN runs, the earliest ones are
+    first merged into longer runs, to bound the number of open files. The sort is stable.
+
+    Args:
+        books (Iterable[Book]): The books, typically a lazy iterator over the storage.
+        field (str): One of SORT_FIELDS.
+        buffer_size (int): The number of books that may be held in memory.
+
+    Returns:
+        Iterator[Book]: The books in ascending order of the field.
+    """
+    key = sort_key(field)
+    books = iter(books)
+    size = max(buffer_size, 1)
+    first = sorted(islice(books, size), key=key)
+    if len(first) < size:
+        return iter(first)
+    return _merge_runs(key, first, books, size)
+
+
+def _merge_runs(key: SortKey, first: list[Book], books: Iterator[Book], size: int) -> Iterator[Book]:
+    """
+    Spills the sorted first run and the runs still to be read, then merges them.
+    """
+    runs = [_spill(first)]
+    del first
+    try:
+        while chunk := sorted(islice(books, size), key=key):
+            runs.append(_spill(chunk))
+        while len(runs) > MAX_FAN_IN:
+            merged = _spill(heapq.merge(*map(_read, runs[:MAX_FAN_IN]), key=key))
+            for run in runs[:MAX_FAN_IN]:
+                run.close()
+            runs[:MAX_FAN_IN] = [merged]
+        yield from heapq.merge(*map(_read, runs), key=key)
+    finally:
+        for run in runs:
+            run.close()
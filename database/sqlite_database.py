@@ -0,0 +1,343 @@
+import sqlite3
+import uuid
+from typing import Iterable, Iterator
+from models.models import Book
+from database.abstract_base import AbstractDatabase
+from database.aggregates import Aggregates, AGGREGATE_FIELDS
+from database.query import Condition, CONTAINS
+from database.sorting import SORT_FIELDS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS books_author ON books (author);
+CREATE INDEX IF NOT EXISTS books_year ON books (year);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+    title, author, content='books', content_rowid='seq', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+    INSERT INTO books_fts (rowid, title, author) VALUES (new.seq, new.title, new.author);
+END;
+CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+    INSERT INTO books_fts (books_fts, rowid, title, author) VALUES ('delete', old.seq, old.title, old.author);
+END;
+"""
+
+COLUMNS = "id, title, author, year, status"
+FTS_FIELDS = ("title", "author")
+SEARCH_FIELDS = ("title", "author", "year", "status", "id")
+
+
+def _lower(value: object) -> str | None:
+    """
+    Lowercases a column value the way Python does, including Cyrillic letters.
+    """
+    return None if value is None else str(value).lower()
+
+
+class SqliteDatabase(AbstractDatabase):
+    """
+    A class to handle database operations for the library system using SQLite storage.
+
+    Books live in an indexed table, so lookups and status changes by ID touch one row and
+    every mutation is a transaction. Title and author searches go through an FTS5 trigram
+    index when SQLite provides one; the candidates are re-checked with Python's lower(),
+    so the results match the substring search of JsonDatabase.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.connection = sqlite3.connect(file_path, check_same_thread=False)
+        self.connection.create_function("py_lower", 1, _lower, deterministic=True)
+        with self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+        try:
+            with self.connection:
+                self.connection.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+
+    @staticmethod
+    def _row_to_book(row: tuple) -> Book:
+        book_id, title, author, year, status = row
+        return Book(title=title, author=author, year=year, id=book_id, status=status)
+
+    @staticmethod
+    def _book_to_row(book: Book) -> tuple:
+        return book.id, book.title, book.author, int(book.year), book.status
+
+    def _insert(self, book: Book) -> None:
+        """
+        Inserts a book, giving it a fresh ID if its ID is already taken.
+
+        Args:
+            book (Book): The book to insert.
+
+        Raises:
+            sqlite3.IntegrityError: If the row violates a constraint other than the unique ID.
+        """
+        while True:
+            try:
+                self.connection.execute(
+                    "INSERT INTO books (%s) VALUES (?, ?, ?, ?, ?)" % COLUMNS, self._book_to_row(book),
+                )
+                return
+            except sqlite3.IntegrityError:
+                if self.connection.execute("SELECT 1 FROM books WHERE id = ?", (book.id,)).fetchone() is None:
+                    raise
+            book.id = str(uuid.uuid4())
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        self.connection.close()
+
+    def counters(self) -> dict[str, int]:
+        """
+        Returns the SQLite change counter.
+
+        Returns:
+            dict[str, int]: The number of rows changed through this connection.
+        """
+        return {"rows_changed": self.connection.total_changes}
+
+    def data_version(self) -> object:
+        """
+        Returns the number of commits of this connection and SQLite's data_version.
+
+        PRAGMA data_version changes when another connection commits to the file, and the
+        change counter when this one does.
+
+        Returns:
+            object: A (total_changes, data_version) tuple.
+        """
+        return self.connection.total_changes, self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def load_books(self) -> list[Book]:
+        """
+        Loads books from the database.
+
+        Returns:
+            List[Book]: A list of Book instances.
+        """
+        rows = self.connection.execute("SELECT %s FROM books ORDER BY seq" % COLUMNS)
+        return [self._row_to_book(row) for row in rows]
+
+    def iter_books(self, offset: int = 0, limit: int | None = None) -> Iterator[Book]:
+        """
+        Lazily yields books in insertion order, starting at ``offset``.
+
+        Rows are stepped from an open cursor, so only the consumed page is materialised.
+
+        Args:
+            offset (int): The number of books to skip.
+            limit (int | None): The maximum number of books to yield, or None for all.
+
+        Returns:
+            Iterator[Book]: The books.
+        """
+        rows = self.connection.execute(
+            "SELECT %s FROM books ORDER BY seq LIMIT ? OFFSET ?" % COLUMNS,
+            (-1 if limit is None else limit, offset),
+        )
+        return map(self._row_to_book, rows)
+
+    def iter_sorted(self, field: str, buffer_size: int) -> Iterator[Book]:
+        """
+        Lazily yields all books in ascending order of a field, sorted by SQLite.
+
+        SQLite uses the year index or sorts in its own temporary storage, so the buffer
+        size does not apply.
+
+        Args:
+            field (str): "title", "author" or "year".
+            buffer_size (int): Unused.
+
+        Returns:
+            Iterator[Book]: The books, in insertion order among equal values.
+        """
+        if field not in SORT_FIELDS:
+            raise ValueError("Cannot sort by %s" % field)
+        order = "year" if field == "year" else "py_lower(%s)" % field
+        rows = self.connection.execute("SELECT %s FROM books ORDER BY %s, seq" % (COLUMNS, order))
+        return map(self._row_to_book, rows)
+
+    def save_books(self, books: list[Book]) -> None:
+        """
+        Replaces the contents of the database with the given books in one transaction.
+
+        Args:
+            books (List[Book]): A list of Book instances to be saved.
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM books")
+            for book in books:
+                self._insert(book)
+
+    def add_book(self, book: Book) -> None:
+        """
+        Adds a new book to the library.
+
+        Args:
+            book (Book): The Book instance to be added.
+        """
+        with self.connection:
+            self._insert(book)
+
+    def add_books(self, books: Iterable[Book]) -> int:
+        """
+        Adds many books in one transaction.
+
+        Args:
+            books (Iterable[Book]): The books to be added.
+
+        Returns:
+            int: The number of books added.
+        """
+        count = 0
+        with self.connection:
+            for book in books:
+                self._insert(book)
+                count += 1
+        return count
+
+    def delete_book(self, book_id: str) -> bool:
+        """
+        Deletes a book from the library by its ID.
+
+        Args:
+            book_id (str): The ID of the book to be deleted.
+
+        Returns:
+            bool: True if the book was deleted, False if the book was not found.
+        """
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM books WHERE id = ?", (book_id,))
+        return cursor.rowcount > 0
+
+    def find_books(self, query: str, field: str) -> list[Book]:
+        """
+        Searches for books by a specified field (title, author, or year).
+
+        Args:
+            query (str): The search query.
+            field (str): The field to search by ('title', 'author', or 'year').
+
+        Returns:
+            List[Book]: A list of Book instances that match the search criteria.
+        """
+        if field not in SEARCH_FIELDS:
+            raise AttributeError(field)
+        needle = str(query).lower()
+        if self.fts and field in FTS_FIELDS and len(needle) >= 3:
+            phrase = '%s : "%s"' % (field, needle.replace('"', '""'))
+            rows = self.connection.execute(
+                "SELECT %s FROM books WHERE seq IN (SELECT rowid FROM books_fts WHERE books_fts MATCH ?)"
+                " AND instr(py_lower(%s), ?) > 0 ORDER BY seq" % (COLUMNS, field),
+                (phrase, needle),
+            )
+        else:
+            rows = self.connection.execute(
+                "SELECT %s FROM books WHERE instr(py_lower(%s), ?) > 0 ORDER BY seq" % (COLUMNS, field),
+                (needle,),
+            )
+        return [self._row_to_book(row) for row in rows]
+
+    def query(self, conditions: list[Condition]) -> list[Book]:
+        """
+        Finds the books matching all conditions of a compound query.
+
+        The conditions become one WHERE clause, so SQLite's own planner picks the ID or
+        year index when one of them applies.
+
+        Args:
+            conditions (list[Condition]): The conditions, all of which must hold.
+
+        Returns:
+            List[Book]: The matching books in insertion order.
+        """
+        clauses = []
+        params: list[object] = []
+        for condition in conditions:
+            if isinstance(condition.value, tuple):
+                for operator, bound in zip((">=", "<="), condition.value):
+                    if bound is not None:
+                        clauses.append("year %s ?" % operator)
+                        params.append(bound)
+            elif condition.op == CONTAINS:
+                clauses.append("instr(py_lower(%s), ?) > 0" % condition.field)
+                params.append(condition.value)
+            elif condition.field in ("id", "year"):
+                clauses.append("%s = ?" % condition.field)
+                params.append(condition.value)
+            else:
+                clauses.append("py_lower(%s) = ?" % condition.field)
+                params.append(condition.value)
+        rows = self.connection.execute(
+            "SELECT %s FROM books WHERE %s ORDER BY seq" % (COLUMNS, " AND ".join(clauses) or "1"), params,
+        )
+        return [self._row_to_book(row) for row in rows]
+
+    def aggregates(self) -> Aggregates:
+        """
+        Returns the book counts per status, author and year, grouped by SQLite.
+
+        Returns:
+            Aggregates: The counts.
+        """
+        return Aggregates.from_counts({
+            field: self.connection.execute("SELECT %s, COUNT(*) FROM books GROUP BY %s" % (field, field))
+            for field in AGGREGATE_FIELDS
+        })
+
+    def change_book_status(self, book_id: str, new_status: str) -> bool:
+        """
+        Changes the status of a book by its ID.
+
+        Args:
+            book_id (str): The ID of the book.
+            new_status (str): The new status of the book ('в наличии' or 'выдана').
+
+        Returns:
+            bool: True if the status was changed, False if the book was not found.
+        """
+        with self.connection:
+            cursor = self.connection.execute("UPDATE books SET status = ? WHERE id = ?", (new_status, book_id))
+        return cursor.rowcount > 0
+
+    def find_book(self, book_id: str) -> Book | None:
+        """
+        Finds and returns a book by its ID.
+
+        Args:
+            book_id (str): The ID of the book to find.
+
+        Returns:
+            Book: The book with the matching ID, or None if no such book exists.
+        """
+        row = self.connection.execute("SELECT %s FROM books WHERE id = ?" % COLUMNS, (book_id,)).fetchone()
+        return None if row is None else self._row_to_book(row)
+
+    def has_book(self, book_id: str) -> bool:
+        """
+        Checks whether a book with the given ID exists.
+
+        Args:
+            book_id (str): The ID of the book.
+
+        Returns:
+            bool: True if the book exists.
+        """
+        return self.connection.execute("SELECT 1 FROM books WHERE id = ?", (book_id,)).fetchone() is not None
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
+from typing import Iterable
 from models.models import Book
+from core.config import message
 
 
 class AbstractIO(ABC):
@@ -22,9 +24,8 @@ class AbstractIO(ABC):
         """
         raise NotImplementedError()
 
-    @staticmethod
     @abstractmethod
-    def input_title() -> str:
+    def input_title(self) -> str:
         """
         Prompts the user to input the title of a book.
 
@@ -33,9 +34,8 @@ class AbstractIO(ABC):
         """
         raise NotImplementedError()
 
-    @staticmethod
     @abstractmethod
-    def input_author() -> str:
+    def input_author(self) -> str:
         """
         Prompts the user to input the author of a book.
 
@@ -44,9 +44,8 @@ class AbstractIO(ABC):
         """
         raise NotImplementedError()
 
-    @staticmethod
     @abstractmethod
-    def input_year() -> str:
+    def input_year(self) -> str:
         """
         Prompts the user to input the publication year of a book.
 
@@ -55,9 +54,8 @@ class AbstractIO(ABC):
         """
         raise NotImplementedError()
 
-    @staticmethod
     @abstractmethod
-    def input_id() -> str:
+    def input_id(self) -> str:
         """
         Prompts the user to input the ID of a book.
 
@@ -66,9 +64,8 @@ class AbstractIO(ABC):
         """
         raise NotImplementedError()
 
-    @staticmethod
     @abstractmethod
-    def input_status() -> str:
+    def input_status(self) -> str:
         """
         Prompts the user to input the status of a book.
 
@@ -77,9 +74,18 @@ class AbstractIO(ABC):
         """
         raise NotImplementedError()
 
-    @staticmethod
     @abstractmethod
-    def input_query() -> str:
+    def input_path(self) -> str:
+        """
+        Prompts the user to input the path of a file to import.
+
+        Returns:
+            str: The file path.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def input_query(self) -> str:
         """
         Prompts the user to input a search query.
 
@@ -88,9 +94,8 @@ class AbstractIO(ABC):
         """
         raise NotImplementedError()
 
-    @staticmethod
     @abstractmethod
-    def input_field() -> str:
+    def input_field(self) -> str:
         """
         Prompts the user to input a search field.
 
@@ -99,6 +104,26 @@ class AbstractIO(ABC):
         """
         raise NotImplementedError()
 
+    @abstractmethod
+    def input_conditions(self) -> str:
+        """
+        Prompts the user to input the conditions of a compound query.
+
+        Returns:
+            str: The conditions, e.g. "author~толстой; year=1860..1870".
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def input_order(self) -> str | None:
+        """
+        Prompts the user to choose the field to sort a listing by.
+
+        Returns:
+            str | None: The field, "" to keep insertion order, or None if input is cancelled.
+        """
+        raise NotImplementedError()
+
     @abstractmethod
     def input_book(self) -> tuple | None:
         """
@@ -110,18 +135,17 @@ class AbstractIO(ABC):
         raise NotImplementedError()
 
     @abstractmethod
-    def output_books(self, books: list[Book]) -> None:
+    def output_books(self, books: Iterable[Book]) -> None:
         """
-        Outputs the list of books to the user.
+        Outputs books to the user.
 
         Args:
-            books (list[Book]): The list of books to output.
+            books (Iterable[Book]): The books to output, possibly a lazy iterator.
         """
         raise NotImplementedError()
 
-    @staticmethod
     @abstractmethod
-    def output_message(out_message: str, center: bool = False) -> None:
+    def output_message(self, out_message: str, center: bool = False) -> None:
         """
         Outputs a message to the user.
 
@@ -131,9 +155,17 @@ class AbstractIO(ABC):
         """
         raise NotImplementedError()
 
-    @staticmethod
+    def output_error(self, error: str) -> None:
+        """
+        Reports an error of the current command to the user.
+
+        Args:
+            error (str): The error description.
+        """
+        self.output_message(message["error"] % error)
+
     @abstractmethod
-    def input_message(in_message: str, center: bool = False) -> str:
+    def input_message(self, in_message: str, center: bool = False) -> str:
         """
         Prompts the user to input a message.
 
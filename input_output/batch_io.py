@@ -0,0 +1,203 @@
+import json
+import shlex
+import uuid
+from typing import IO, Iterable
+from input_output.abstract_class import AbstractIO
+from models.models import Book
+from core.config import commands, message, valid_fields
+from core.validators import validate_status, validate_year
+from database.query import parse_conditions
+
+
+class BatchIO(AbstractIO):
+    """
+    Class that reads commands from a text stream and writes results as JSON lines.
+
+    Every input line is a command followed by its arguments in shell quoting, e.g.
+    ``add "Война и мир" "Лев Толстой" 1869`` or ``find толстой author``. Empty lines and
+    lines starting with # are skipped. Each result is one JSON object carrying the line
+    number and command. The class never clears the screen, waits for a key or asks the
+    terminal for its size, so it works without a TTY.
+    """
+
+    def __init__(self, source: Iterable[str], output: IO[str]):
+        self.source = iter(source)
+        self.output = output
+        self.line = 0
+        self.command: str | None = None
+        self.arguments: list[str] = []
+
+    def _emit(self, **result) -> None:
+        self.output.write(json.dumps({"line": self.line, "command": self.command, **result}, ensure_ascii=False))
+        self.output.write("\n")
+
+    def _error(self, error: str) -> None:
+        self._emit(error=error.strip())
+
+    def _next_argument(self, name: str) -> str:
+        """
+        Takes the next argument of the current command.
+
+        Missing or invalid arguments are reported and returned as "", which the service
+        treats like a cancelled prompt.
+
+        Args:
+            name (str): The argument name used in the error result.
+
+        Returns:
+            str: The argument, or "" if it is missing.
+        """
+        if not self.arguments:
+            self._error("missing argument: %s" % name)
+            return ""
+        return self.arguments.pop(0)
+
+    @staticmethod
+    def clear() -> None:
+        """
+        Does nothing: there is no screen to clear.
+        """
+
+    def proceed_command(self) -> str:
+        """
+        Reads the next command line.
+
+        Returns:
+            str: The command, or "" at the end of the input.
+        """
+        for line in self.source:
+            self.line += 1
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                words = shlex.split(line)
+            except ValueError as ex:
+                self.command = None
+                self._error(message["error"] % ex)
+                continue
+            self.command, self.arguments = words[0].lower(), words[1:]
+            if self.command in commands:
+                return self.command
+            self._error(message["unknown_command"])
+        return ""
+
+    def input_title(self) -> str:
+        return self._next_argument("title")
+
+    def input_author(self) -> str:
+        return self._next_argument("author")
+
+    def input_year(self) -> str:
+        year = self._next_argument("year")
+        if not year:
+            return ""
+        try:
+            validate_year(year)
+        except ValueError as ex:
+            self._error(str(ex))
+            return ""
+        return year
+
+    def input_id(self) -> str:
+        book_id = self._next_argument("id")
+        if not book_id:
+            return ""
+        try:
+            uuid.UUID(book_id)
+        except ValueError:
+            self._error(message["invalid_id"])
+            return ""
+        return book_id
+
+    def input_status(self) -> str:
+        status = self._next_argument("status")
+        if not status:
+            return ""
+        try:
+            return validate_status(status)
+        except ValueError as ex:
+            self._error(str(ex))
+            return ""
+
+    def input_path(self) -> str:
+        return self._next_argument("path")
+
+    def input_query(self) -> str:
+        return self._next_argument("query").lower()
+
+    def input_field(self) -> str:
+        field = self._next_argument("field")
+        if not field or field.lower() in valid_fields:
+            return field.lower()
+        self._error(message["invalid_field"] % str(valid_fields))
+        return ""
+
+    def input_conditions(self) -> str:
+        conditions = self._next_argument("conditions")
+        if not conditions:
+            return ""
+        try:
+            parse_conditions(conditions)
+        except ValueError as ex:
+            self._error(str(ex))
+            return ""
+        return conditions
+
+    def input_order(self) -> str | None:
+        if not self.arguments:
+            return ""
+        order = self.arguments.pop(0).lower()
+        if order in valid_fields:
+            return order
+        self._error(message["invalid_field"] % str(valid_fields))
+        return None
+
+    def input_book(self) -> tuple | None:
+        title = self.input_title()
+        author = self.input_author() if title else ""
+        year = self.input_year() if author else ""
+        if not year:
+            return None
+        return title, author, year
+
+    def output_books(self, books: Iterable[Book]) -> None:
+        """
+        Writes the books as one JSON result.
+
+        Args:
+            books (Iterable[Book]): The books to output.
+        """
+        self._emit(books=[book.to_dict() for book in books])
+
+    def output_message(self, out_message: str, center: bool = False) -> None:
+        """
+        Writes a message as one JSON result.
+
+        Args:
+            out_message (str): The message.
+            center (bool): Ignored.
+        """
+        self._emit(message=out_message.strip())
+
+    def output_error(self, error: str) -> None:
+        """
+        Writes an error of the current command as one JSON result.
+
+        Args:
+            error (str): The error description.
+        """
+        self._error(error)
+
+    def input_message(self, in_message: str, center: bool = False) -> str:
+        """
+        Answers a prompt with the next argument, or with an empty string.
+
+        Args:
+            in_message (str): Ignored.
+            center (bool): Ignored.
+
+        Returns:
+            str: The next argument of the current command, or "".
+        """
+        return self.arguments.pop(0) if self.arguments else ""
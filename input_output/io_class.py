@@ -1,11 +1,13 @@
 import uuid
 import os
-from datetime import datetime as dt
+from typing import Iterable
 from core.dependency import handle_input
+from core.validators import validate_status, validate_year
+from database.query import parse_conditions
 from input_output.abstract_class import AbstractIO
 from core.config import commands, per_page
 from models.models import Book
-from core.config import message, valid_fields, valid_status
+from core.config import message, valid_fields
 
 
 class ConsoleIO(AbstractIO):
@@ -67,9 +69,8 @@ class ConsoleIO(AbstractIO):
             str: The year the book was published.
         """
         year: str = self.input_message(message["enter_year"]).strip()
-        if 1 <= int(year) <= dt.utcnow().year:
-            return year
-        raise ValueError(message["invalid_year"])
+        validate_year(year)
+        return year
 
     @handle_input(uuid.UUID)
     def input_id(self) -> str:
@@ -89,10 +90,17 @@ class ConsoleIO(AbstractIO):
         Returns:
             str: The status of the book.
         """
-        status: str = self.input_message(message["enter_status"]).strip().capitalize()
-        if status in valid_status:
-            return status
-        raise ValueError(message["invalid_status"] % str(valid_status))
+        return validate_status(self.input_message(message["enter_status"]))
+
+    @handle_input(str)
+    def input_path(self) -> str:
+        """
+        Prompts the user to input the path of a file to import.
+
+        Returns:
+            str: The file path.
+        """
+        return self.input_message(message["enter_path"]).strip()
 
     @handle_input(str)
     def input_query(self) -> str:
@@ -119,6 +127,36 @@ class ConsoleIO(AbstractIO):
         self.clear()
         raise ValueError(message["invalid_field"] % str(valid_fields))
 
+    @handle_input(str)
+    def input_conditions(self) -> str:
+        """
+        Prompts the user to input the conditions of a compound query.
+
+        Returns:
+            str: The conditions.
+        """
+        self.clear()
+        conditions: str = self.input_message(message["enter_conditions"]).strip()
+        parse_conditions(conditions)
+        return conditions
+
+    def input_order(self) -> str | None:
+        """
+        Prompts the user to choose the field to sort a listing by.
+
+        Returns:
+            str | None: The field, "" to keep insertion order, or None if input is cancelled.
+        """
+        while True:
+            try:
+                order: str = self.input_message(message["enter_order"]).strip().lower()
+            except KeyboardInterrupt:
+                self.clear()
+                return None
+            if not order or order in valid_fields:
+                return order
+            self.output_message(message["invalid_field"] % str(valid_fields))
+
     def input_book(self) -> tuple | None:
         """
         Prompts the user to input the details of a book.
@@ -137,33 +175,33 @@ class ConsoleIO(AbstractIO):
             return None
         return title, author, year
 
-    def output_books(self, books: list[Book]) -> None:
+    def output_books(self, books: Iterable[Book]) -> None:
         """
-        Outputs a list of books to the console.
+        Outputs books to the console page by page.
+
+        The books are pulled from the iterable one page at a time, so a lazy source only
+        has to produce the records that are actually shown.
 
         Args:
-            books (list[Book]): The list of books to output.
+            books (Iterable[Book]): The books to output.
         """
         self.clear()
-        count = 1
         self.output_message(message["books_in_library"], center=True)
         try:
-            for book in books:
+            books = iter(books)
+            book = next(books, None)
+            count = 1
+            while book is not None:
+                following = next(books, None)
                 self.output_message("%s. %s" % (count, book))
-                if (
-                        count % per_page == 0
-                        and (count // per_page) < len(books)
-                        and book != books[-1]
-                ):
-                    self.input_message(message["next_page"], center=True)
+                if following is None:
+                    self.input_message(message["exit"], center=True)
                     self.clear()
-                    self.output_message(message["books_in_library"], center=True)
-                elif count % per_page == 0 and (count // per_page) == len(books):
+                elif count % per_page == 0:
                     self.input_message(message["next_page"], center=True)
                     self.clear()
-                elif book == books[-1]:
-                    self.input_message(message["exit"], center=True)
-                    self.clear()
+                    self.output_message(message["books_in_library"], center=True)
+                book = following
                 count += 1
         except KeyboardInterrupt:
             return self.clear()
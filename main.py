@@ -1,14 +1,138 @@
+import argparse
+import asyncio
+import sys
 from service.library_service import LibraryService
+from service.server import LibraryServer
+from database.abstract_base import AbstractDatabase
 from database.json_database import JsonDatabase
+from database.log_database import LogDatabase
+from database.sqlite_database import SqliteDatabase
+from database.sharded_database import ShardedDatabase
+from database.record_database import RecordDatabase
+from database.query_cache import QueryCache
+from input_output.abstract_class import AbstractIO
+from input_output.batch_io import BatchIO
 from input_output.io_class import ConsoleIO
-from core.config import FILE_PATH
+from core.instrumentation import InstrumentedDatabase, Metrics
+from core.config import (
+    DATABASE_BACKEND, FILE_PATH, SQLITE_PATH, SHARD_COUNT, RECORDS_PATH, CACHE_BOOKS, COLLECT_STATS, STATS_PATH,
+    SERVER_COMMIT_INTERVAL, LOG_COMPACT_BYTES, LOG_COMPACT_RECORDS, LOG_COMPACT_DEAD_RATIO, LOG_COMPACT_MIN_RECORDS,
+    QUERY_CACHE_SIZE, QUERY_CACHE_TTL, SCAN_WORKERS, PARALLEL_SCAN_MIN, INDEX_SIDECARS, message,
+)
+
+
+def create_database(backend: str, commit_interval: float = 0) -> AbstractDatabase:
+    """
+    Creates the storage backend selected in the config.
+
+    Args:
+        backend (str): One of "json", "log", "sqlite", "sharded", "records" or
+            "columnar". The columnar store
+            needs NumPy, so it is imported only when selected.
+        commit_interval (float): The group commit window of the JSON and sharded backends,
+            0 to write on every mutation.
+
+    Returns:
+        AbstractDatabase: The database instance.
+    """
+    if backend == "json":
+        cache = CACHE_BOOKS or bool(commit_interval)
+        return JsonDatabase(FILE_PATH, cache=cache, commit_interval=commit_interval, sidecars=cache and INDEX_SIDECARS)
+    if backend == "log":
+        return LogDatabase(
+            FILE_PATH,
+            compact_bytes=LOG_COMPACT_BYTES,
+            compact_records=LOG_COMPACT_RECORDS,
+            compact_dead_ratio=LOG_COMPACT_DEAD_RATIO,
+            compact_min_records=LOG_COMPACT_MIN_RECORDS,
+        )
+    if backend == "sqlite":
+        return SqliteDatabase(SQLITE_PATH)
+    if backend == "sharded":
+        return ShardedDatabase(
+            FILE_PATH, SHARD_COUNT, cache=CACHE_BOOKS or bool(commit_interval), commit_interval=commit_interval,
+        )
+    if backend == "records":
+        return RecordDatabase(RECORDS_PATH, workers=SCAN_WORKERS, parallel_min=PARALLEL_SCAN_MIN)
+    if backend == "columnar":
+        from database.columnar_database import ColumnarDatabase
+        return ColumnarDatabase(FILE_PATH)
+    raise ValueError("Unknown database backend: %s" % backend)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Система управления библиотекой")
+    parser.add_argument(
+        "--batch", metavar="FILE", nargs="?", const="-",
+        help="read commands from FILE (or stdin) and print JSON results instead of the interactive console",
+    )
+    parser.add_argument(
+        "--serve", metavar="HOST:PORT",
+        help="serve JSON requests over TCP to several clients instead of the interactive console",
+    )
+    parser.add_argument(
+        "--stats", metavar="FILE", default=STATS_PATH,
+        help="write the collected statistics to FILE on exit",
+    )
+    return parser.parse_args()
+
+
+def serve(database: AbstractDatabase, address: str, metrics: Metrics | None, stats_path: str | None) -> None:
+    """
+    Runs the TCP server until interrupted.
+
+    Args:
+        database (AbstractDatabase): The shared database.
+        address (str): The HOST:PORT to listen on.
+        metrics (Metrics | None): The collected metrics.
+        stats_path (str | None): Where to dump the metrics on exit, None to keep them in memory.
+    """
+    host, _, port = address.rpartition(":")
+    try:
+        asyncio.run(LibraryServer(database).serve(host or "127.0.0.1", int(port)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        database.close()
+        if metrics is not None and stats_path:
+            metrics.dump(stats_path)
 
 
 def main() -> None:
-    database = JsonDatabase(FILE_PATH)
-    std_io = ConsoleIO()
-    service = LibraryService(database, std_io)
-    service.tracer()
+    arguments = parse_arguments()
+    source = None
+    if not arguments.serve and arguments.batch not in (None, "-"):
+        try:
+            source = open(arguments.batch, "r", encoding="utf-8")
+        except OSError as ex:
+            sys.exit(message["error"] % ex)
+    database = create_database(DATABASE_BACKEND, SERVER_COMMIT_INTERVAL if arguments.serve else 0)
+    metrics = Metrics() if COLLECT_STATS else None
+    if QUERY_CACHE_SIZE:
+        database = QueryCache(database, QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+        if metrics is not None:
+            metrics.add_source("query_cache", database.cache_counters)
+    if metrics is not None:
+        database = InstrumentedDatabase(database, metrics)
+    if arguments.serve:
+        return serve(database, arguments.serve, metrics, arguments.stats)
+    std_io: AbstractIO
+    if arguments.batch is None:
+        std_io = ConsoleIO()
+    else:
+        std_io = BatchIO(sys.stdin if source is None else source, sys.stdout)
+    service = LibraryService(database, std_io, metrics)
+    try:
+        if arguments.batch is None:
+            service.tracer()
+        else:
+            service.batch()
+    finally:
+        if source is not None:
+            source.close()
+        database.close()
+        if metrics is not None and arguments.stats:
+            metrics.dump(arguments.stats)
 
 
 if __name__ == "__main__":
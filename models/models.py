@@ -1,12 +1,17 @@
+import sys
 import uuid
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True)
 class Book:
     """
     Represents a book in the library.
 
+    The class uses slots instead of a per-instance dict, and author and status strings are
+    interned, so the many books sharing an author or a status share one string object.
+    Code that changes the status of a stored book interns the new status as well.
+
     Attributes:
         title (str): The title of the book.
         author (str): The author of the book.
@@ -18,9 +23,17 @@ class Book:
     title: str
     author: str
     year: int
-    id: str = str(uuid.uuid4())
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
     status: str = "В наличии"
 
+    def __post_init__(self):
+        self.author = sys.intern(self.author)
+        self.status = sys.intern(self.status)
+        try:
+            self.year = int(self.year)
+        except (TypeError, ValueError):
+            raise ValueError("Book %s has an invalid year: %r" % (self.id, self.year)) from None
+
     def __str__(self):
         return f"Book: {self.title}({self.author}), {self.year}, status: {self.status}. (id:{self.id})"
 
@@ -31,7 +44,13 @@ class Book:
         Returns:
             dict: A dictionary representation of the Book instance.
         """
-        return asdict(self)
+        return {
+            "title": self.title,
+            "author": self.author,
+            "year": self.year,
+            "id": self.id,
+            "status": self.status,
+        }
 
     @staticmethod
     def from_dict(data: dict) -> "Book":
@@ -43,5 +62,14 @@ class Book:
 
         Returns:
             Book: A Book instance created from the dictionary data.
+
+        Raises:
+            TypeError: If the dictionary has a key that is not a field of Book.
+            ValueError: If the year is not a number.
         """
+        if len(data) == 5:
+            try:
+                return Book(data["title"], data["author"], data["year"], data["id"], data["status"])
+            except KeyError:
+                pass
         return Book(**data)
@@ -0,0 +1,96 @@
+import csv
+import json
+import os
+import sys
+from typing import Iterator
+from models.models import Book
+from core.validators import validate_status, validate_year
+
+IMPORT_FORMATS = (".csv", ".jsonl")
+
+
+def import_format(file_path: str) -> str | None:
+    """
+    Returns the import format selected by the extension of a file.
+
+    Args:
+        file_path (str): The path of the file.
+
+    Returns:
+        str | None: ".csv" or ".jsonl", or None if the extension is not supported.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def iter_rows(file_path: str) -> Iterator[dict]:
+    """
+    Streams the rows of a CSV file with a header or of a JSONL file.
+
+    Args:
+        file_path (str): The path of the file. The extension selects the format.
+
+    Returns:
+        Iterator[dict]: One dict per row. A JSONL line that is not valid JSON yields {}.
+
+    Raises:
+        ValueError: If the extension is not .csv or .jsonl.
+    """
+    extension = import_format(file_path)
+    if extension is None:
+        raise ValueError(os.path.splitext(file_path)[1])
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as file:
+        if extension == ".csv":
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = {}
+            yield row if isinstance(row, dict) else {}
+
+
+def row_to_book(row: dict) -> Book:
+    """
+    Validates an imported row with the same rules as the console input.
+
+    Args:
+        row (dict): A row with title, author and year, and optionally status and id.
+
+    Returns:
+        Book: The book. A row without an id gets a new one.
+
+    Raises:
+        ValueError: If a field is missing or invalid.
+    """
+    title = str(row.get("title") or "").strip()
+    author = str(row.get("author") or "").strip()
+    if not title or not author:
+        raise ValueError("title and author are required")
+    book = Book(title=title, author=author, year=validate_year(row.get("year")))
+    if row.get("status"):
+        book.status = sys.intern(validate_status(row["status"]))
+    if row.get("id"):
+        book.id = str(row["id"]).strip()
+    return book
+
+
+def read_books(file_path: str, rejected: list[int]) -> Iterator[Book]:
+    """
+    Streams the valid books of an import file.
+
+    Args:
+        file_path (str): The path of a CSV or JSONL file.
+        rejected (list[int]): Receives the numbers of the rows that failed validation.
+
+    Returns:
+        Iterator[Book]: The valid books in file order.
+    """
+    for number, row in enumerate(iter_rows(file_path), start=1):
+        try:
+            yield row_to_book(row)
+        except ValueError:
+            rejected.append(number)
@@ -1,18 +1,26 @@
 from database.abstract_base import AbstractDatabase
+from database.aggregates import Aggregates
 from input_output.abstract_class import AbstractIO
+import csv
 import inspect
 import sys
-import os
+import shutil
+from itertools import chain
+from typing import Iterator
 from models.models import Book
-from core.config import message, commands
+from service.importer import import_format, read_books
+from database.query import parse_conditions
+from core.instrumentation import Metrics
+from core.config import message, commands, fuzzy_limit, report_limit, valid_status, SORT_BUFFER_SIZE
 
 
 class LibraryService:
     functions: dict = {}
 
-    def __init__(self, database: AbstractDatabase, std_io: AbstractIO):
+    def __init__(self, database: AbstractDatabase, std_io: AbstractIO, metrics: Metrics | None = None):
         self.database = database
         self.std_io = std_io
+        self.metrics = metrics
 
     def tracer(self) -> None:
         """
@@ -28,13 +36,31 @@ class LibraryService:
             except KeyError:
                 self.std_io.output_message(message["unknown_command"] % command)
 
+    def batch(self) -> None:
+        """
+        Processes commands until the input is exhausted or an exit command is read.
+
+        Unlike tracer(), no help screen is shown between commands, so a non-interactive
+        AbstractIO can drive the service without any terminal side effects. A command that
+        fails is reported as an error and the remaining commands still run.
+        """
+        while command := self.std_io.proceed_command():
+            if command == "exit":
+                break
+            try:
+                self.get_class_method(command)
+            except Exception as ex:
+                self.std_io.output_error(str(ex) or type(ex).__name__)
+
     def get_class_method(self, key: str):
         """
         Returns and executes the method corresponding to the given command key.
 
         This method dynamically collects all methods of the class (except for the constructor) and
         stores them in a dictionary. If the dictionary is not already populated, it initializes
-        it with method names as keys and method objects as values. It then retrieves and executes
+        it with method names as keys and method objects as values. A trailing underscore is
+        dropped from the name, so commands that are Python keywords (import) can have a
+        method. It then retrieves and executes
         the method corresponding to the provided key.
 
         Args:
@@ -48,8 +74,12 @@ class LibraryService:
         """
         if not self.functions:
             methods: list = inspect.getmembers(self, predicate=inspect.ismethod)
-            self.functions: dict = {method[0]: method[1] for method in methods if method[0] in commands}
-        return self.functions[key]()
+            self.functions: dict = {
+                method[0].rstrip("_"): method[1] for method in methods if method[0].rstrip("_") in commands
+            }
+        if self.metrics is None:
+            return self.functions[key]()
+        return self.metrics.timed("command.%s" % key, self.functions[key])
 
     def add(self) -> None:
         """
@@ -61,6 +91,34 @@ class LibraryService:
             self.database.add_book(book)
             self.std_io.output_message(message["book_added"], center=True)
 
+    def import_(self) -> None:
+        """
+        Imports books from a CSV or JSONL file in a single write.
+
+        Rows that fail validation are counted as rejected. An error of the database, such
+        as a value its storage format cannot hold, aborts the import and is reported as is.
+        """
+        file_path: str = self.std_io.input_path()
+        if not file_path:
+            return None
+        self.std_io.clear()
+        if import_format(file_path) is None:
+            return self.std_io.output_message(message["invalid_import_format"] % file_path)
+        rejected: list[int] = []
+        try:
+            imported: int = self.database.add_books(read_books(file_path, rejected))
+        except FileNotFoundError:
+            return self.std_io.output_message(message["file_not_found"] % file_path)
+        except OSError as ex:
+            return self.std_io.output_message(message["import_read_error"] % (file_path, ex.strerror or ex))
+        except UnicodeDecodeError:
+            return self.std_io.output_message(message["invalid_import_encoding"] % file_path)
+        except csv.Error as ex:
+            return self.std_io.output_message(message["invalid_import_csv"] % (file_path, ex))
+        except ValueError as ex:
+            return self.std_io.output_error(str(ex))
+        self.std_io.output_message(message["books_imported"] % (imported, len(rejected)), center=True)
+
     def delete(self) -> None:
         """
         Deletes a book from the library by ID.
@@ -88,14 +146,50 @@ class LibraryService:
             return self.std_io.output_books(books)
         self.std_io.output_message(message["no_books_found"] % (field, query))
 
-    def list(self) -> None:
+    def fuzzy(self) -> None:
         """
-        Lists all books in the library.
+        Finds the books most similar to a possibly misspelt query, best match first.
         """
-        self.std_io.clear()
-        books: list[Book] = self.database.load_books()
+        query: str = self.std_io.input_query()
+        if not query:
+            return None
+        field: str = self.std_io.input_field()
+        if not field:
+            return None
+        books: list[Book] = self.database.fuzzy_find_books(query, field, fuzzy_limit)
         if books:
             return self.std_io.output_books(books)
+        self.std_io.output_message(message["no_books_found"] % (field, query))
+
+    def query(self) -> None:
+        """
+        Finds books matching several conditions at once, e.g. an author, a year range and a status.
+        """
+        conditions: str = self.std_io.input_conditions()
+        if not conditions:
+            return None
+        books: list[Book] = self.database.query(parse_conditions(conditions))
+        if books:
+            return self.std_io.output_books(books)
+        self.std_io.output_message(message["no_books_found"] % ("query", conditions))
+
+    def list(self) -> None:
+        """
+        Lists all books in the library, in insertion order or sorted by a field.
+
+        A sorted listing is merged lazily from sorted runs, so the first page is shown
+        without building the whole sorted catalogue in memory.
+        """
+        order: str | None = self.std_io.input_order()
+        if order is None:
+            return None
+        self.std_io.clear()
+        books: Iterator[Book] = (
+            self.database.iter_sorted(order, SORT_BUFFER_SIZE) if order else self.database.iter_books()
+        )
+        first: Book | None = next(books, None)
+        if first is not None:
+            return self.std_io.output_books(chain([first], books))
         self.std_io.output_message(message["no_books"])
 
     def status(self) -> None:
@@ -106,7 +200,7 @@ class LibraryService:
         if not book_id:
             return None
         self.std_io.clear()
-        if self.database.find_book(book_id) is None:
+        if not self.database.has_book(book_id):
             return self.std_io.output_message(message["book_not_found_id"])
         new_status: str = self.std_io.input_status()
         if new_status:
@@ -114,6 +208,42 @@ class LibraryService:
             self.std_io.clear()
             self.std_io.output_message(message["status_changed"] % new_status, center=True)
 
+    def report(self) -> None:
+        """
+        Displays the number of books per status and the most common authors and years.
+
+        The numbers come from counters the database keeps up to date, not from a scan.
+        """
+        self.std_io.clear()
+        aggregates: Aggregates = self.database.aggregates()
+        self.std_io.output_message(message["report_header"], center=True)
+        self.std_io.output_message(message["report_total"] % aggregates.total)
+        for status in valid_status:
+            self.std_io.output_message(message["report_status"] % (status, aggregates.count("status", status)))
+        self.std_io.output_message(message["report_top"] % (aggregates.distinct("author"), aggregates.distinct("year")))
+        for field in ("author", "year"):
+            for value, count in aggregates.top(field, report_limit):
+                self.std_io.output_message(message["report_line"] % (value, count))
+        self.std_io.input_message(message["exit"], center=True)
+
+    def stats(self) -> None:
+        """
+        Displays call counts, latencies and I/O counters collected so far.
+        """
+        self.std_io.clear()
+        if self.metrics is None:
+            return self.std_io.output_message(message["stats_disabled"])
+        snapshot: dict = self.metrics.snapshot()
+        self.std_io.output_message(message["stats_header"], center=True)
+        for name, operation in snapshot["operations"].items():
+            self.std_io.output_message(message["stats_operation"] % (
+                name, operation["calls"], operation["mean_ms"], operation["p99_ms"], operation["max_ms"],
+            ))
+        for source, counters in snapshot["counters"].items():
+            for name, value in counters.items():
+                self.std_io.output_message(message["stats_counter"] % ("%s.%s" % (source, name), value))
+        self.std_io.input_message(message["exit"], center=True)
+
     def help(self) -> None:
         """
         Displays the list of available commands.
@@ -126,4 +256,4 @@ class LibraryService:
         """
         Exits the application.
         """
-        sys.exit(message["goodbye"].center(os.get_terminal_size().columns))
+        sys.exit(message["goodbye"].center(shutil.get_terminal_size().columns))
@@ -0,0 +1,327 @@
+import asyncio
+import json
+from database.abstract_base import AbstractDatabase
+from models.models import Book
+from core.config import valid_fields, valid_status, fuzzy_limit, report_limit, SORT_BUFFER_SIZE
+from core.validators import validate_status, validate_year
+from database.query import parse_conditions
+
+READ_COMMANDS = ("find", "fuzzy", "query", "list", "get", "report")
+WRITE_COMMANDS = ("add", "delete", "status")
+
+
+class RequestError(ValueError):
+    """
+    Raised when a request is malformed or fails validation.
+    """
+
+
+def require(request: dict, name: str) -> str:
+    """
+    Returns a required string argument of a request.
+
+    Args:
+        request (dict): The decoded request.
+        name (str): The argument name.
+
+    Returns:
+        str: The stripped argument.
+
+    Raises:
+        RequestError: If the argument is missing or empty.
+    """
+    value = str(request.get(name) or "").strip()
+    if not value:
+        raise RequestError("missing argument: %s" % name)
+    return value
+
+
+def integer(request: dict, name: str, default: int) -> int:
+    """
+    Returns an optional non-negative integer argument of a request.
+
+    Args:
+        request (dict): The decoded request.
+        name (str): The argument name.
+        default (int): The value used when the argument is missing or empty.
+
+    Returns:
+        int: The argument.
+
+    Raises:
+        RequestError: If the argument is not a non-negative integer.
+    """
+    value = request.get(name)
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise RequestError("invalid argument: %s" % name)
+    try:
+        number = int(value)
+    except ValueError:
+        raise RequestError("invalid argument: %s" % name) from None
+    if number < 0:
+        raise RequestError("invalid argument: %s" % name)
+    return number
+
+
+class LibraryServer:
+    """
+    Serves the library to several clients over TCP with one JSON request per line.
+
+    A request looks like ``{"command": "find", "query": "толстой", "field": "author"}`` and
+    is answered with one JSON line holding ``ok`` and either a result or an error. Reads
+    run directly on the event loop against the in-memory state. Mutations are queued to a
+    single writer task, which applies everything that has queued up, persists the batch
+    with one database flush in a worker thread, and only then answers the clients, so an
+    acknowledged mutation is durable; if the flush fails, the answer also holds
+    ``"durable": false`` and a ``warning``, and the mutation is persisted by a later flush.
+    The database should keep its state in memory and defer writes until flush(), e.g.
+    JsonDatabase with cache and commit_interval.
+
+    A sorted listing is sorted once in a worker thread, and the sorted IDs are kept until
+    the next batch of mutations, so paging through it slices the cached order.
+    """
+
+    def __init__(self, database: AbstractDatabase, max_batch: int = 1000):
+        self.database = database
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue | None = None
+        self._writer: asyncio.Task | None = None
+        self._generation = 0
+        self._sorted: dict[str, tuple[int, list[str]]] = {}
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        """
+        Starts the writer task and begins accepting clients.
+
+        Args:
+            host (str): The address to bind.
+            port (int): The port to bind, 0 for any free port.
+
+        Returns:
+            asyncio.Server: The listening server.
+        """
+        self._queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._write_batches())
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    async def serve(self, host: str, port: int) -> None:
+        """
+        Serves clients until cancelled.
+
+        Args:
+            host (str): The address to bind.
+            port (int): The port to bind.
+        """
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        """
+        Stops the writer task after persisting everything it has applied.
+        """
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        await asyncio.to_thread(self.database.flush)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Answers the requests of one client until it disconnects.
+        """
+        try:
+            while line := await reader.readline():
+                response = await self.handle_request(line)
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, line: bytes) -> dict:
+        """
+        Decodes and executes one request.
+
+        Args:
+            line (bytes): The raw JSON request.
+
+        Returns:
+            dict: The response.
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise RequestError("request must be a JSON object")
+            command = request.get("command")
+            if command == "list" and request.get("order"):
+                return {"ok": True, "result": await self.list_sorted(request)}
+            if command in READ_COMMANDS:
+                return {"ok": True, "result": self.read(command, request)}
+            if command in WRITE_COMMANDS:
+                result, warning = await self.submit(command, request)
+                if warning is None:
+                    return {"ok": True, "result": result}
+                return {"ok": True, "result": result, "durable": False, "warning": warning}
+            raise RequestError("unknown command: %s" % command)
+        except Exception as ex:
+            return {"ok": False, "error": str(ex) or type(ex).__name__}
+
+    def read(self, command: str, request: dict) -> object:
+        """
+        Executes a read request against the in-memory state.
+
+        Args:
+            command (str): "find", "fuzzy", "query", "list", "get" or "report".
+            request (dict): The request arguments.
+
+        Returns:
+            object: The JSON-serialisable result.
+        """
+        if command in ("find", "fuzzy"):
+            field = require(request, "field")
+            if field not in valid_fields:
+                raise RequestError("invalid field: %s" % field)
+            if command == "fuzzy":
+                books = self.database.fuzzy_find_books(
+                    require(request, "query"), field, integer(request, "limit", fuzzy_limit),
+                )
+            else:
+                books = self.database.find_books(require(request, "query"), field)
+            return [book.to_dict() for book in books]
+        if command == "query":
+            return [book.to_dict() for book in self.database.query(parse_conditions(require(request, "conditions")))]
+        if command == "report":
+            aggregates = self.database.aggregates()
+            limit = integer(request, "limit", report_limit)
+            return {
+                "total": aggregates.total,
+                "status": {status: aggregates.count("status", status) for status in valid_status},
+                "authors": aggregates.top("author", limit),
+                "years": aggregates.top("year", limit),
+            }
+        if command == "get":
+            book = self.database.find_book(require(request, "id"))
+            return None if book is None else book.to_dict()
+        offset = integer(request, "offset", 0)
+        limit = integer(request, "limit", 100)
+        return [book.to_dict() for book in self.database.iter_books(offset, limit)]
+
+    async def list_sorted(self, request: dict) -> list[dict]:
+        """
+        Returns a page of the books sorted by the field given as ``order``.
+
+        Args:
+            request (dict): The request arguments.
+
+        Returns:
+            list[dict]: The books of the page.
+        """
+        order = request.get("order")
+        if order not in valid_fields:
+            raise RequestError("invalid order: %s" % order)
+        offset = integer(request, "offset", 0)
+        limit = integer(request, "limit", 100)
+        generation, ids = self._sorted.get(order, (-1, []))
+        if generation != self._generation:
+            generation = self._generation
+            ids = await asyncio.to_thread(
+                lambda: [book.id for book in self.database.iter_sorted(order, SORT_BUFFER_SIZE)],
+            )
+            self._sorted[order] = (generation, ids)
+        books = (self.database.find_book(book_id) for book_id in ids[offset:offset + limit])
+        return [book.to_dict() for book in books if book is not None]
+
+    def apply(self, command: str, request: dict) -> object:
+        """
+        Applies one validated mutation to the database without flushing it.
+
+        Args:
+            command (str): "add", "delete" or "status".
+            request (dict): The request arguments.
+
+        Returns:
+            object: The ID of the added book, or whether the book was found.
+        """
+        if command == "add":
+            book = Book(
+                require(request, "title"), require(request, "author"), validate_year(require(request, "year")),
+            )
+            self.database.add_book(book)
+            return book.id
+        if command == "delete":
+            return self.database.delete_book(require(request, "id"))
+        return self.database.change_book_status(require(request, "id"), validate_status(require(request, "status")))
+
+    async def submit(self, command: str, request: dict) -> tuple[object, str | None]:
+        """
+        Queues a mutation for the writer task and waits until it is durable.
+
+        Args:
+            command (str): "add", "delete" or "status".
+            request (dict): The request arguments.
+
+        Returns:
+            tuple[object, str | None]: The result of the mutation, and None once it is durable
+                or the reason it could not be persisted yet.
+        """
+        if self._queue is None:
+            raise RuntimeError("The server is not started")
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._queue.put((command, request, future))
+        return await future
+
+    async def _write_batches(self) -> None:
+        """
+        Applies queued mutations in batches, flushing once per batch.
+        """
+        if self._queue is None:
+            return
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._write_batch(batch)
+            except Exception as ex:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(RequestError(str(ex)))
+
+    async def _write_batch(self, batch: list[tuple[str, dict, asyncio.Future]]) -> None:
+        """
+        Applies one batch of mutations, flushes it and answers the waiting clients.
+
+        A mutation that fails only fails its own request. If the flush fails, the applied
+        mutations stay in memory and pending in the database, which writes them with the
+        next flush, so they are reported as applied but not yet durable rather than failed;
+        a client retrying them would apply them twice.
+        """
+        results: list[tuple[asyncio.Future, object, Exception | None]] = []
+        self._generation += 1
+        for command, request, future in batch:
+            try:
+                results.append((future, self.apply(command, request), None))
+            except Exception as ex:
+                results.append((future, None, ex))
+        warning = None
+        try:
+            await asyncio.to_thread(self.database.flush)
+        except Exception as ex:
+            warning = str(ex) or type(ex).__name__
+        for future, result, error in results:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result((result, warning))
+            else:
+                future.set_exception(error if isinstance(error, ValueError) else RequestError(str(error)))
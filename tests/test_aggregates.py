@@ -0,0 +1,106 @@
+import unittest
+import os
+from models.models import Book
+from database.aggregates import Aggregates
+from database.catalogue import Catalogue
+from database.json_database import JsonDatabase
+from database.log_database import LogDatabase
+from database.sharded_database import ShardedDatabase, layout_path, shard_paths
+from database.sqlite_database import SqliteDatabase
+from benchmarks.data import generate_books
+
+
+def summary(aggregates: Aggregates) -> tuple:
+    return (
+        aggregates.total,
+        {field: sorted(aggregates.top(field, aggregates.distinct(field))) for field in ("status", "author", "year")},
+    )
+
+
+class TestAggregates(unittest.TestCase):
+    def setUp(self):
+        self.book1 = Book(id="1", title="Война и мир", author="Лев Толстой", year=1869)
+        self.book2 = Book(id="2", title="Анна Каренина", author="Лев Толстой", year=1877, status="Выдана")
+        self.book3 = Book(id="3", title="Чайка", author="Антон Чехов", year=1896)
+
+    def test_counts(self):
+        aggregates = Aggregates([self.book1, self.book2, self.book3])
+        self.assertEqual(aggregates.total, 3)
+        self.assertEqual(aggregates.count("status", "В наличии"), 2)
+        self.assertEqual(aggregates.count("author", "Лев Толстой"), 2)
+        self.assertEqual(aggregates.count("year", 1900), 0)
+        self.assertEqual(aggregates.top("author", 1), [("Лев Толстой", 2)])
+        self.assertEqual(aggregates.distinct("year"), 3)
+
+    def test_changes(self):
+        aggregates = Aggregates([self.book1, self.book2])
+        aggregates.change_status("В наличии", "Выдана")
+        aggregates.remove(self.book2)
+        self.assertEqual(aggregates.total, 1)
+        self.assertEqual(aggregates.count("status", "Выдана"), 1)
+        self.assertEqual(aggregates.distinct("status"), 1)
+        self.assertEqual(aggregates.distinct("year"), 1)
+
+    def test_update_and_from_counts(self):
+        aggregates = Aggregates([self.book1])
+        aggregates.update(Aggregates([self.book2, self.book3]))
+        counted = Aggregates.from_counts({
+            "status": [("В наличии", 2), ("Выдана", 1)],
+            "author": [("Лев Толстой", 2), ("Антон Чехов", 1)],
+            "year": [(1869, 1), (1877, 1), (1896, 1)],
+        })
+        self.assertEqual(summary(aggregates), summary(counted))
+        self.assertEqual(summary(aggregates), summary(Aggregates([self.book1, self.book2, self.book3])))
+
+    def test_catalogue_keeps_counts_up_to_date(self):
+        books = list(generate_books(300))
+        catalogue = Catalogue(books)
+        for book in books[::3]:
+            catalogue.set_status(book.id, "Выдана")
+        for book in books[::5]:
+            catalogue.remove(book.id)
+        catalogue.add(Book(id=books[1].id, title="Новая", author="Лев Толстой", year=1869))
+        self.assertEqual(summary(catalogue.aggregates), summary(Aggregates(catalogue)))
+
+
+class TestBackendAggregates(unittest.TestCase):
+    def setUp(self):
+        self.paths = [
+            "test_library_aggregates.json", "test_library_aggregates.json.lock", "test_library_aggregates.sqlite3",
+            "test_library_aggregates.log", "test_library_aggregates.log.log",
+            layout_path("test_library_aggregates_shards.json"),
+        ] + [
+            path + suffix
+            for path in shard_paths("test_library_aggregates_shards.json", 2) for suffix in ("", ".lock")
+        ]
+
+    def tearDown(self):
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_backends_agree(self):
+        books = list(generate_books(200))
+        databases = [
+            JsonDatabase("test_library_aggregates.json", cache=True, fsync=False),
+            SqliteDatabase("test_library_aggregates.sqlite3"),
+            LogDatabase("test_library_aggregates.log", fsync=False),
+            ShardedDatabase("test_library_aggregates_shards.json", shards=2, fsync=False, workers=1),
+        ]
+        try:
+            for database in databases:
+                database.save_books([Book(book.title, book.author, book.year, book.id, book.status) for book in books])
+                database.change_book_status(books[0].id, "Выдана")
+                database.delete_book(books[1].id)
+                database.add_book(Book(id="new", title="Новая", author="Лев Толстой", year=1869))
+            expected = summary(Aggregates(databases[0].iter_books()))
+            self.assertEqual(expected[0], 200)
+            for database in databases:
+                self.assertEqual(summary(database.aggregates()), expected, type(database).__name__)
+        finally:
+            for database in databases:
+                database.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
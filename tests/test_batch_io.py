@@ -0,0 +1,135 @@
+import unittest
+import io
+import json
+import os
+from unittest.mock import patch
+from database.json_database import JsonDatabase
+from input_output.batch_io import BatchIO
+from service.library_service import LibraryService
+
+
+class TestBatchIO(unittest.TestCase):
+    def setUp(self):
+        self.file_path = "test_library_batch.json"
+        self.database = JsonDatabase(self.file_path, cache=True)
+
+    def tearDown(self):
+        for path in (self.file_path, self.file_path + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run_batch(self, *lines: str) -> list[dict]:
+        output = io.StringIO()
+        LibraryService(self.database, BatchIO(lines, output)).batch()
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    @patch("os.system")
+    @patch("os.get_terminal_size")
+    def test_commands_without_terminal(self, mock_size, mock_system):
+        results = self.run_batch(
+            'add "Война и мир" "Лев Толстой" 1869',
+            "# comment",
+            "",
+            "find толстой author",
+            "list",
+            "fuzzy толстй author",
+            '"query" "author~толстой; year=1860..1870"',
+        )
+        self.assertEqual(results[0], {"line": 1, "command": "add", "message": "Книга успешно добавлена в библиотеку."})
+        self.assertEqual(results[1]["line"], 4)
+        self.assertEqual(results[1]["books"][0]["title"], "Война и мир")
+        self.assertEqual(results[2]["books"][0]["year"], 1869)
+        self.assertEqual(results[3]["books"][0]["author"], "Лев Толстой")
+        self.assertEqual(results[4]["books"][0]["title"], "Война и мир")
+        mock_size.assert_not_called()
+        mock_system.assert_not_called()
+
+    def test_status_and_delete(self):
+        self.run_batch('add "Book 1" "Author 1" 2000')
+        book_id = self.database.load_books()[0].id
+        results = self.run_batch("status %s выдана" % book_id, "delete %s" % book_id, "list")
+        self.assertEqual(results[0]["message"], 'Статус книги успешно изменен на "Выдана"')
+        self.assertEqual(results[1]["message"], "Книга успешно удалена.")
+        self.assertEqual(results[2]["message"], "Нет книг, подходящих вашему запросу.")
+
+    def test_invalid_input_is_reported(self):
+        results = self.run_batch(
+            "unknown",
+            'add "Book 1" "Author 1" 3000',
+            "add Book",
+            "find x nowhere",
+            'query "year=later"',
+            "delete not-an-id",
+            'add "unterminated',
+        )
+        self.assertEqual(
+            [result["command"] for result in results], ["unknown", "add", "add", "find", "query", "delete", None],
+        )
+        self.assertTrue(all("error" in result for result in results))
+        self.assertEqual(self.database.load_books(), [])
+
+    def test_sorted_list(self):
+        self.run_batch('add "Война и мир" "Лев Толстой" 1869', 'add "Анна Каренина" "Лев Толстой" 1877')
+        results = self.run_batch("list title", "list YEAR", "list", "list status")
+        self.assertEqual([book["title"] for book in results[0]["books"]], ["Анна Каренина", "Война и мир"])
+        self.assertEqual([book["year"] for book in results[1]["books"]], [1869, 1877])
+        self.assertEqual([book["year"] for book in results[2]["books"]], [1869, 1877])
+        self.assertIn("error", results[3])
+
+    def test_report(self):
+        self.run_batch('add "Война и мир" "Лев Толстой" 1869', 'add "Детство" "Лев Толстой" 1852')
+        book_id = self.database.load_books()[0].id
+        results = self.run_batch("status %s выдана" % book_id, "report")
+        messages = [result["message"] for result in results[1:]]
+        self.assertIn("Всего книг: 2", messages)
+        self.assertTrue(any(line.startswith("Выдана") and line.endswith(" 1") for line in messages))
+        self.assertTrue(any(line.startswith("Лев Толстой") and line.endswith(" 2") for line in messages))
+
+    def test_import_errors_are_reported(self):
+        paths = {"directory": "test_import_dir.csv", "encoding": "test_import_cp1251.csv", "csv": "test_import_big.csv"}
+        os.mkdir(paths["directory"])
+        with open(paths["encoding"], "wb") as file:
+            file.write("title,author,year\nВойна и мир,Лев Толстой,1869\n".encode("cp1251"))
+        with open(paths["csv"], "w", encoding="utf-8") as file:
+            file.write("title,author,year\n\"%s\",Author,2000\n" % ("x" * 200_000))
+        try:
+            results = self.run_batch(*("import %s" % path for path in paths.values()), "import books.txt")
+        finally:
+            os.rmdir(paths["directory"])
+            os.remove(paths["encoding"])
+            os.remove(paths["csv"])
+        messages = [result["message"] for result in results]
+        self.assertTrue(messages[0].startswith("Не удалось прочитать файл"))
+        self.assertTrue(messages[1].startswith("Файл test_import_cp1251.csv не в кодировке UTF-8"))
+        self.assertTrue(messages[2].startswith("Повреждённый CSV файл"))
+        self.assertTrue(messages[3].startswith("Неподдерживаемый формат файла"))
+        self.assertEqual(self.database.load_books(), [])
+
+    def test_database_error_during_import_is_not_a_format_error(self):
+        path = "test_import_rejected.jsonl"
+        with open(path, "w", encoding="utf-8") as file:
+            file.write('{"title": "Book 1", "author": "Author 1", "year": 2000}\n')
+        try:
+            with patch.object(self.database, "add_books", side_effect=ValueError("The title is longer than 256 bytes")):
+                results = self.run_batch("import %s" % path)
+        finally:
+            os.remove(path)
+        self.assertEqual(results, [{"line": 1, "command": "import", "error": "The title is longer than 256 bytes"}])
+
+    def test_failing_command_does_not_stop_the_script(self):
+        with patch.object(self.database, "delete_book", side_effect=OSError("disk full")):
+            results = self.run_batch(
+                "delete 0b1f1e3c-2b4c-4c55-9a3c-64a1f3b0c9d2", 'add "Book 1" "Author 1" 2000', "list",
+            )
+        self.assertEqual(results[0], {"line": 1, "command": "delete", "error": "disk full"})
+        self.assertEqual(results[1]["command"], "add")
+        self.assertEqual(results[2]["books"][0]["title"], "Book 1")
+
+    def test_exit_stops_processing(self):
+        results = self.run_batch("exit", 'add "Book 1" "Author 1" 2000')
+        self.assertEqual(results, [])
+        self.assertEqual(self.database.load_books(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import io
+import json
+import os
+from importlib.util import find_spec
+from unittest.mock import patch
+from models.models import Book
+from input_output.batch_io import BatchIO
+from service.library_service import LibraryService
+
+
+@unittest.skipIf(find_spec("numpy") is None, "numpy is not installed")
+class TestColumnarDatabase(unittest.TestCase):
+    def setUp(self):
+        from database.columnar_database import ColumnarDatabase
+        self.database_class = ColumnarDatabase
+        self.file_path = "test_library_columnar.json"
+        self.database = ColumnarDatabase(self.file_path)
+        self.book1 = Book(
+            id="1", title="Война и мир", author="Лев Толстой", year=1869, status="В наличии",
+        )
+        self.book2 = Book(
+            id="2", title="Book 2", author="Author 2", year=2010, status="Выдана",
+        )
+        self.book3 = Book(
+            id="3", title="Анна Каренина", author="Лев Толстой", year=1877, status="Выдана",
+        )
+
+    def tearDown(self):
+        for path in (self.file_path, self.file_path + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run_batch(self, *lines: str) -> list[dict]:
+        output = io.StringIO()
+        LibraryService(self.database, BatchIO(lines, output)).batch()
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_load_books_empty(self):
+        self.assertEqual(self.database.load_books(), [])
+        self.assertEqual(self.database.find_books("война", "title"), [])
+        self.assertEqual(self.database.query([]), [])
+        self.assertEqual(self.database.aggregates().total, 0)
+
+    def test_save_and_reload(self):
+        self.database.save_books([self.book1, self.book2])
+        self.assertEqual(self.database_class(self.file_path).load_books(), [self.book1, self.book2])
+
+    def test_find_books(self):
+        self.database.save_books([self.book1, self.book2, self.book3])
+        self.assertEqual(self.database.find_books("ТОЛСТ", "author"), [self.book1, self.book3])
+        self.assertEqual(self.database.find_books("и мир", "title"), [self.book1])
+        self.assertEqual(self.database.find_books("мирА", "title"), [])
+        self.assertEqual(self.database.find_books("18", "year"), [self.book1, self.book3])
+        self.assertEqual(self.database.find_books("выд", "status"), [self.book2, self.book3])
+
+    def test_query(self):
+        self.database.save_books([self.book1, self.book2, self.book3])
+        with patch.object(self.database, "iter_books", side_effect=AssertionError("full scan")):
+            results = self.run_batch(
+                '"query" "year=1870..2010"',
+                '"query" "author~толстой; status=выдана"',
+                '"query" "title=анна каренина; year=..1877"',
+                '"query" "year~86; status~налич"',
+                '"query" "id=2; year=2011.."',
+            )
+        self.assertEqual([book["id"] for book in results[0]["books"]], ["2", "3"])
+        self.assertEqual([book["id"] for book in results[1]["books"]], ["3"])
+        self.assertEqual([book["id"] for book in results[2]["books"]], ["3"])
+        self.assertEqual([book["id"] for book in results[3]["books"]], ["1"])
+        self.assertEqual(results[4]["message"], "Нет книг, подходящих вашему запросу: query - id=2; year=2011..")
+
+    def test_report(self):
+        self.database.save_books([self.book1, self.book2, self.book3])
+        self.database.change_book_status("3", "В наличии")
+        self.database.delete_book("2")
+        with patch.object(self.database, "iter_books", side_effect=AssertionError("full scan")):
+            messages = [result["message"] for result in self.run_batch("report")]
+        self.assertIn("Всего книг: 2", messages)
+        self.assertTrue(any(line.startswith("В наличии") and line.endswith(" 2") for line in messages))
+        self.assertTrue(any(line.startswith("Выдана") and line.endswith(" 0") for line in messages))
+        self.assertTrue(any(line.startswith("Лев Толстой") and line.endswith(" 2") for line in messages))
+        self.assertTrue(any(line.startswith("1869") and line.endswith(" 1") for line in messages))
+
+    def test_delete_book(self):
+        self.database.save_books([self.book1, self.book2, self.book3])
+        self.assertTrue(self.database.delete_book("1"))
+        self.assertFalse(self.database.delete_book("1"))
+        self.assertEqual(self.database.find_books("толстой", "author"), [self.book3])
+        self.assertTrue(self.database.delete_book("3"))
+        self.assertEqual(self.database.load_books(), [self.book2])
+        self.assertEqual(self.database.aggregates().count("status", "Выдана"), 1)
+        self.assertEqual(self.database.aggregates().count("status", "В наличии"), 0)
+
+    def test_find_book(self):
+        self.database.add_books([self.book1, self.book2])
+        self.assertEqual(self.database.find_book("2"), self.book2)
+        self.assertIsNone(self.database.find_book("3"))
+        self.assertEqual(list(self.database.iter_books(1)), [self.book2])
+
+
+if __name__ == "__main__":
+    unittest.main()
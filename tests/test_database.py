@@ -1,7 +1,22 @@
 import unittest
+import io
+import json
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
 from models.models import Book
-from database.json_database import JsonDatabase
+from database import json_database
+from database.json_database import JsonDatabase, iter_json_array
+from database.catalogue import Catalogue
+from database.indexes import TrigramIndex
+from database.sidecar import sidecar_path, remove_sidecars
+
+
+def add_books_concurrently(file_path: str, worker: int, count: int) -> None:
+    database = JsonDatabase(file_path, cache=True, fsync=False)
+    for number in range(count):
+        database.add_book(Book(id="%d-%d" % (worker, number), title="Book", author="Author", year=2000))
 
 
 class TestJsonDatabase(unittest.TestCase):
@@ -16,8 +31,9 @@ class TestJsonDatabase(unittest.TestCase):
         )
 
     def tearDown(self):
-        if os.path.exists(self.file_path):
-            os.remove(self.file_path)
+        for path in (self.file_path, self.file_path + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_load_books_empty(self):
         self.assertEqual(self.database.load_books(), [])
@@ -37,6 +53,11 @@ class TestJsonDatabase(unittest.TestCase):
         self.assertEqual(loaded_books[0].title, "Book 1")
         self.assertEqual(loaded_books[1].title, "Book 2")
 
+    def test_add_books(self):
+        self.database.add_book(self.book1)
+        self.assertEqual(self.database.add_books(iter([self.book2])), 1)
+        self.assertEqual([book.id for book in self.database.load_books()], ["1", "2"])
+
     def test_delete_book(self):
         self.database.add_book(self.book1)
         self.assertTrue(self.database.delete_book("1"))
@@ -67,6 +88,279 @@ class TestJsonDatabase(unittest.TestCase):
         self.assertEqual(found_book.id, "1")
         self.assertIsNone(self.database.find_book("2"))
 
+    def test_iter_books(self):
+        self.assertEqual(list(self.database.iter_books()), [])
+        self.database.save_books([self.book1, self.book2])
+        self.assertEqual(list(self.database.iter_books()), [self.book1, self.book2])
+        self.assertEqual(list(self.database.iter_books(1)), [self.book2])
+        self.assertEqual(list(self.database.iter_books(0, 1)), [self.book1])
+
+    def test_has_book(self):
+        self.database.save_books([self.book1])
+        self.assertTrue(self.database.has_book("1"))
+        self.assertFalse(self.database.has_book("2"))
+
+    def test_default_ids_are_unique(self):
+        self.database.add_book(Book("Book 3", "Author 3", 2020))
+        self.database.add_book(Book("Book 4", "Author 4", 2021))
+        ids = {book.id for book in self.database.load_books()}
+        self.assertEqual(len(ids), 2)
+
+    def test_duplicate_ids_are_kept(self):
+        duplicate = Book(id="1", title="Book 3", author="Author 3", year=2020)
+        self.database.save_books([self.book1, duplicate])
+        loaded_books = self.database.load_books()
+        self.assertEqual(len(loaded_books), 2)
+        self.assertNotEqual(loaded_books[0].id, loaded_books[1].id)
+        self.assertNotEqual(duplicate.id, "1")
+        self.assertEqual([book.id for book in loaded_books], ["1", duplicate.id])
+        self.assertEqual(self.database.find_book(duplicate.id).title, "Book 3")
+
+    def test_legacy_duplicate_ids_are_stable(self):
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            json.dump([{**self.book1.to_dict(), "title": "Book %d" % number} for number in range(3)], file)
+        ids = [book.id for book in self.database.load_books()]
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual([book.id for book in self.database.load_books()], ids)
+        self.assertTrue(self.database.change_book_status(ids[1], "Выдана"))
+        self.assertTrue(self.database.delete_book(ids[2]))
+        self.database.flush()
+        books = JsonDatabase(self.file_path).load_books()
+        self.assertEqual([(book.id, book.status) for book in books], [(ids[0], "В наличии"), (ids[1], "Выдана")])
+
+    def test_taken_id_is_replaced_on_the_added_book(self):
+        self.database.add_book(self.book1)
+        duplicate = Book(id="1", title="Book 3", author="Author 3", year=2020)
+        self.database.add_book(duplicate)
+        self.assertNotEqual(duplicate.id, "1")
+        self.assertEqual(self.database.find_book(duplicate.id).title, "Book 3")
+        self.assertEqual(self.database.find_book("1").title, self.book1.title)
+
+    def test_version_is_incremented(self):
+        self.database.save_books([self.book1])
+        self.database.add_book(self.book2)
+        self.database.flush()
+        with open(self.file_path, encoding="utf-8") as file:
+            self.assertEqual(json.load(file)["version"], 2)
+
+    def test_reads_unversioned_file(self):
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            json.dump([self.book1.to_dict()], file)
+        self.database.add_book(self.book2)
+        self.database.flush()
+        self.assertEqual([book.id for book in JsonDatabase(self.file_path).load_books()], ["1", "2"])
+
+    def test_concurrent_writers_lose_nothing(self):
+        workers, count = 4, 25
+        with ProcessPoolExecutor(workers) as executor:
+            for future in [
+                executor.submit(add_books_concurrently, self.file_path, worker, count) for worker in range(workers)
+            ]:
+                future.result()
+        self.assertEqual(len(JsonDatabase(self.file_path).load_books()), workers * count)
+
+
+class TestIterJsonArray(unittest.TestCase):
+    @patch("database.json_database.READ_CHUNK", 5)
+    def test_objects_across_chunks(self):
+        text = '[\n  {"title": "Война, и мир", "year": 1869},\n  {"title": "]"}\n]'
+        self.assertEqual(
+            list(iter_json_array(io.StringIO(text))),
+            [{"title": "Война, и мир", "year": 1869}, {"title": "]"}],
+        )
+
+    def test_malformed_input(self):
+        self.assertEqual(list(iter_json_array(io.StringIO(""))), [])
+        self.assertEqual(list(iter_json_array(io.StringIO('{"a": 1}'))), [])
+        self.assertEqual(list(iter_json_array(io.StringIO('[{"a": 1}, {"b"'))), [{"a": 1}])
+
+    @patch("database.json_database.READ_CHUNK", 4)
+    def test_versioned_file(self):
+        text = '{"version": 3, "books": [{"a": 1}, {"b": 2}]}'
+        self.assertEqual(list(iter_json_array(io.StringIO(text))), [{"a": 1}, {"b": 2}])
+
+
+class TestCachedJsonDatabase(TestJsonDatabase):
+    def setUp(self):
+        super().setUp()
+        self.database = JsonDatabase(self.file_path, cache=True)
+
+    def test_external_change_invalidates_cache(self):
+        self.database.save_books([self.book1])
+        self.assertEqual(len(self.database.load_books()), 1)
+        JsonDatabase(self.file_path).save_books([self.book1, self.book2])
+        self.assertEqual(len(self.database.load_books()), 2)
+        self.assertEqual(self.database.find_book("2").title, "Book 2")
+
+    def test_find_books_after_mutations(self):
+        self.database.save_books([self.book1])
+        self.assertEqual(self.database.find_books("book", "title"), [self.book1])
+        self.database.add_book(self.book2)
+        self.assertEqual(self.database.find_books("book", "title"), [self.book1, self.book2])
+        self.database.delete_book("1")
+        self.assertEqual(self.database.find_books("book", "title"), [self.book2])
+
+    def test_failed_write_keeps_old_file(self):
+        self.database.save_books([self.book1])
+        with patch("database.files.os.replace", side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.database.add_book(self.book2)
+        self.assertEqual(len(JsonDatabase(self.file_path).load_books()), 1)
+        self.assertEqual(len(self.database.load_books()), 1)
+        self.assertFalse([name for name in os.listdir(".") if name.startswith(".%s." % self.file_path)])
+
+    def test_load_books_returns_copy(self):
+        self.database.save_books([self.book1])
+        self.database.load_books().append(self.book2)
+        self.assertEqual(len(self.database.load_books()), 1)
+
+    def test_iter_books_survives_mutations(self):
+        self.database.save_books([self.book1, self.book2])
+        books = self.database.iter_books()
+        self.assertEqual(next(books).id, "1")
+        for number in (3, 4):
+            self.database.add_book(Book(id=str(number), title="Book", author="Author", year=2020))
+        self.database.delete_book("2")
+        self.assertEqual([book.id for book in books], ["3", "4"])
+
+    def test_iter_books_copies_ids_per_chunk(self):
+        self.database.save_books([
+            Book(id=str(number), title="Book", author="Author", year=2020) for number in range(1, 7)
+        ])
+        with patch("database.catalogue.PAGE_CHUNK", 2):
+            self.assertEqual([book.id for book in self.database.iter_books(1, 4)], ["2", "3", "4", "5"])
+            books = self.database.iter_books(1)
+            self.assertEqual([next(books).id, next(books).id], ["2", "3"])
+            self.database.delete_book("3")
+            self.database.delete_book("4")
+            self.database.add_book(Book(id="7", title="Book", author="Author", year=2020))
+            self.assertEqual([book.id for book in books], ["5", "6", "7"])
+            books = self.database.iter_books()
+            self.assertEqual([next(books).id, next(books).id], ["1", "2"])
+            for number in (1, 2, 5):
+                self.database.delete_book(str(number))
+            self.assertEqual([book.id for book in books], ["6", "7"])
+
+
+class TestGroupCommitJsonDatabase(TestJsonDatabase):
+    def setUp(self):
+        super().setUp()
+        self.database = JsonDatabase(self.file_path, cache=True, commit_interval=60)
+
+    def tearDown(self):
+        self.database.close()
+        super().tearDown()
+
+    def test_mutations_are_coalesced(self):
+        self.database.add_book(self.book1)
+        self.database.add_book(self.book2)
+        self.database.change_book_status("1", "Выдана")
+        self.assertFalse(os.path.exists(self.file_path))
+        self.assertEqual(len(self.database.load_books()), 2)
+        self.database.flush()
+        books = JsonDatabase(self.file_path).load_books()
+        self.assertEqual([(book.id, book.status) for book in books], [("1", "Выдана"), ("2", "Выдана")])
+
+    def test_flush_writes_without_blocking_readers(self):
+        self.database.add_book(self.book1)
+        writing, release = threading.Event(), threading.Event()
+        atomic_write_json = json_database.atomic_write_json
+
+        def slow_write(*args, **kwargs):
+            writing.set()
+            release.wait(5)
+            return atomic_write_json(*args, **kwargs)
+
+        with patch("database.json_database.atomic_write_json", slow_write):
+            flusher = threading.Thread(target=self.database.flush)
+            flusher.start()
+            self.assertTrue(writing.wait(5))
+            reader = threading.Thread(target=lambda: self.database.find_books("book 1", "title"))
+            reader.start()
+            reader.join(2)
+            self.assertFalse(reader.is_alive())
+            self.database.add_book(self.book2)
+            release.set()
+            flusher.join()
+        self.assertEqual([book.id for book in JsonDatabase(self.file_path).load_books()], ["1"])
+        self.database.flush()
+        self.assertEqual([book.id for book in JsonDatabase(self.file_path).load_books()], ["1", "2"])
+
+    def test_flush_replays_over_concurrent_write(self):
+        self.database.add_book(self.book1)
+        JsonDatabase(self.file_path).add_book(self.book2)
+        self.database.flush()
+        self.assertEqual({book.id for book in JsonDatabase(self.file_path).load_books()}, {"1", "2"})
+        self.assertEqual(self.database.counters()["conflicts"], 1)
+
+    def test_requires_cache(self):
+        with self.assertRaises(ValueError):
+            JsonDatabase(self.file_path, commit_interval=1)
+
+
+class TestIndexSidecars(unittest.TestCase):
+    def setUp(self):
+        self.file_path = "test_library_sidecars.json"
+        self.books = [
+            Book(id="1", title="Война и мир", author="Лев Толстой", year=1869),
+            Book(id="2", title="Чайка", author="Антон Чехов", year=1896, status="Выдана"),
+        ]
+        database = JsonDatabase(self.file_path, cache=True, fsync=False, sidecars=True)
+        database.save_books(self.books)
+        database.find_books("мир", "title")
+        database.fuzzy_find_books("чехв", "author")
+        database.close()
+
+    def tearDown(self):
+        remove_sidecars(self.file_path)
+        for path in (self.file_path, self.file_path + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def reopen(self) -> JsonDatabase:
+        return JsonDatabase(self.file_path, cache=True, fsync=False, sidecars=True)
+
+    def test_indexes_are_loaded_instead_of_rebuilt(self):
+        self.assertTrue(os.path.exists(sidecar_path(self.file_path, "trigram", "title")))
+        self.assertTrue(os.path.exists(sidecar_path(self.file_path, "trigram", "author")))
+        database = self.reopen()
+        with patch.object(TrigramIndex, "add") as add:
+            self.assertEqual(database.find_books("мир", "title"), [self.books[0]])
+            self.assertEqual(database.fuzzy_find_books("чехв", "author", 1), [self.books[1]])
+            add.assert_not_called()
+        database.close()
+        self.assertEqual(database.counters()["indexes_loaded"], 2)
+        self.assertEqual(database.counters()["indexes_saved"], 0)
+
+    def test_stale_sidecar_is_rebuilt(self):
+        JsonDatabase(self.file_path).change_book_status("1", "Выдана")
+        database = self.reopen()
+        self.assertEqual([book.id for book in database.find_books("мир", "title")], ["1"])
+        self.assertEqual(database.counters()["indexes_loaded"], 0)
+        database.close()
+        self.assertEqual(database.counters()["indexes_saved"], 1)
+        self.assertEqual(self.reopen().find_books("мир", "title")[0].status, "Выдана")
+
+    def test_mutations_after_load_are_indexed(self):
+        database = self.reopen()
+        database.add_book(Book(id="3", title="Мир как воля", author="Артур Шопенгауэр", year=1819))
+        self.assertEqual([book.id for book in database.find_books("мир", "title")], ["1", "3"])
+        database.close()
+        self.assertEqual([book.id for book in self.reopen().find_books("мир", "title")], ["1", "3"])
+
+    def test_corrupt_sidecar_is_ignored(self):
+        with open(sidecar_path(self.file_path, "trigram", "title"), "wb") as file:
+            file.write(b"not an index")
+        self.assertEqual(self.reopen().find_books("мир", "title"), [self.books[0]])
+
+    def test_index_of_other_books_is_ignored(self):
+        catalogue = Catalogue(self.books, lambda kind, field: TrigramIndex([("9", "мир")]))
+        self.assertEqual(catalogue.search("мир", "title"), [self.books[0]])
+
+    def test_requires_cache(self):
+        with self.assertRaises(ValueError):
+            JsonDatabase(self.file_path, sidecars=True)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import os
+from service.importer import read_books, row_to_book
+
+
+class TestImporter(unittest.TestCase):
+    def setUp(self):
+        self.paths = []
+
+    def tearDown(self):
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def write(self, file_path: str, text: str) -> str:
+        self.paths.append(file_path)
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(text)
+        return file_path
+
+    def test_read_csv(self):
+        path = self.write(
+            "test_import.csv",
+            "title,author,year,status\nВойна и мир,Лев Толстой,1869,выдана\nBad,Author,abc,\n,Author,2000,\n",
+        )
+        rejected = []
+        books = list(read_books(path, rejected))
+        self.assertEqual(len(books), 1)
+        self.assertEqual((books[0].title, books[0].year, books[0].status), ("Война и мир", 1869, "Выдана"))
+        self.assertEqual(rejected, [2, 3])
+
+    def test_read_jsonl(self):
+        path = self.write(
+            "test_import.jsonl",
+            '{"title": "Book 1", "author": "Author 1", "year": 2000}\n\nnot json\n'
+            '{"title": "Book 2", "author": "Author 2", "year": 3000}\n',
+        )
+        rejected = []
+        books = list(read_books(path, rejected))
+        self.assertEqual([book.title for book in books], ["Book 1"])
+        self.assertEqual(rejected, [2, 3])
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            list(read_books("books.txt", []))
+
+    def test_generated_ids_are_unique(self):
+        books = [row_to_book({"title": "Book", "author": "Author", "year": "2000"}) for _ in range(100)]
+        self.assertEqual(len({book.id for book in books}), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from database.indexes import TrigramIndex, rank_fuzzy, trigrams
+
+
+class TestTrigramIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = TrigramIndex([
+            ("1", "Война и мир"),
+            ("2", "Мир тесен"),
+            ("3", "Мирная жизнь"),
+            ("4", 2000),
+        ])
+
+    def test_trigrams(self):
+        self.assertEqual(trigrams("мира"), {"мир", "ира"})
+        self.assertEqual(trigrams("ми"), set())
+
+    def test_search_substring(self):
+        self.assertEqual(self.index.search("мир"), ["1", "2", "3"])
+        self.assertEqual(self.index.search("И МИР"), ["1"])
+        self.assertEqual(self.index.search("200"), ["4"])
+
+    def test_search_short_query(self):
+        self.assertEqual(self.index.search("ир"), ["1", "2", "3"])
+        self.assertEqual(self.index.search(""), ["1", "2", "3", "4"])
+
+    def test_similar_tolerates_typos(self):
+        index = TrigramIndex([
+            ("1", "Лев Толстой"),
+            ("2", "Алексей Толстой"),
+            ("3", "Фёдор Достоевский"),
+            ("4", "Антон Чехов"),
+        ])
+        self.assertEqual(index.similar("лев толстй", 10), ["1", "2"])
+        self.assertEqual(index.similar("Дастоевский", 10), ["3"])
+        self.assertEqual(index.similar("толстой", 1), ["1"])
+        self.assertEqual(index.similar("пушкин", 10), [])
+        self.assertEqual(index.similar("че", 10), index.search("че"))
+
+    def test_similar_matches_brute_force(self):
+        entries = [("1", "Война и мир"), ("2", "Мир тесен"), ("3", "Мирная жизнь"), ("4", "Войны миров")]
+        index = TrigramIndex(entries)
+        for query in ("война и мир", "мирная жызнь", "вайна", "ир"):
+            self.assertEqual(index.similar(query, 3), rank_fuzzy(query, entries, 3))
+
+    def test_search_rejects_scattered_trigrams(self):
+        self.assertEqual(self.index.search("мир и"), [])
+
+    def test_remove(self):
+        self.index.remove("1")
+        self.assertEqual(self.index.search("мир"), ["2", "3"])
+        self.assertEqual(self.index.search("война"), [])
+        self.index.remove("missing")
+        self.assertEqual(len(self.index), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+from unittest.mock import MagicMock
+from models.models import Book
+from database.json_database import JsonDatabase
+from core.instrumentation import Histogram, InstrumentedDatabase, Metrics
+from service.library_service import LibraryService
+
+
+class TestHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = Histogram()
+        for _ in range(99):
+            histogram.record(0.000010)
+        histogram.record(0.5)
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.percentile(0.5), 16 / 1_000_000)
+        self.assertEqual(histogram.percentile(1.0), 0.5)
+        self.assertEqual(Histogram().percentile(0.5), 0.0)
+
+
+class TestInstrumentedDatabase(unittest.TestCase):
+    def setUp(self):
+        self.file_path = "test_library_stats.json"
+        self.metrics = Metrics()
+        self.database = InstrumentedDatabase(JsonDatabase(self.file_path, cache=True), self.metrics)
+
+    def tearDown(self):
+        for path in (self.file_path, self.file_path + ".lock", "test_stats_dump.json"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_calls_and_counters_are_recorded(self):
+        self.database.add_book(Book(id="1", title="Book 1", author="Author 1", year=2000))
+        self.database.find_book("1")
+        self.database.find_book("2")
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["operations"]["database.find_book"]["calls"], 2)
+        self.assertEqual(snapshot["operations"]["database.add_book"]["calls"], 1)
+        counters = snapshot["counters"]["database"]
+        self.assertEqual(counters["writes"], 1)
+        self.assertGreater(counters["bytes_written"], 0)
+        self.assertEqual(counters["cache_hits"], 2)
+        self.assertEqual(counters["cache_hit_rate_pct"], 67)
+
+    def test_errors_are_counted(self):
+        self.database.add_book(Book(id="1", title="Book 1", author="Author 1", year=2000))
+        with self.assertRaises(AttributeError):
+            self.database.find_books("x", "missing")
+        self.assertEqual(self.metrics.snapshot()["errors"], {"database.find_books": 1})
+
+    def test_exit_is_not_a_failure(self):
+        def leave():
+            raise SystemExit()
+
+        with self.assertRaises(SystemExit):
+            self.metrics.timed("command.exit", leave)
+        self.assertEqual(self.metrics.snapshot()["errors"], {})
+        self.assertNotIn("command.exit", self.metrics.snapshot()["operations"])
+
+    def test_dump(self):
+        self.database.load_books()
+        self.metrics.dump("test_stats_dump.json")
+        self.assertTrue(os.path.exists("test_stats_dump.json"))
+
+    def test_service_commands_are_timed(self):
+        service = LibraryService(self.database, MagicMock(), self.metrics)
+        service.get_class_method("stats")
+        self.assertEqual(self.metrics.snapshot()["operations"]["command.stats"]["calls"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
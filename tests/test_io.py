@@ -1,7 +1,8 @@
 import unittest
 from unittest.mock import patch
 from input_output.io_class import ConsoleIO
-from core.config import commands
+from models.models import Book
+from core.config import commands, per_page
 
 
 class TestConsoleIO(unittest.TestCase):
@@ -52,6 +53,14 @@ class TestConsoleIO(unittest.TestCase):
         query = console_io.input_query()
         self.assertEqual(query, "test query")
 
+    @patch("builtins.input", side_effect=["status", "Year", ""])
+    def test_input_order(self, mock_input):
+        console_io = ConsoleIO()
+        with patch("builtins.print") as mock_print:
+            self.assertEqual(console_io.input_order(), "year")
+            self.assertEqual(console_io.input_order(), "")
+        mock_print.assert_called_once()
+
     @patch("builtins.input", return_value="title")
     def test_input_field(self, mock_input):
         console_io = ConsoleIO()
@@ -65,6 +74,25 @@ class TestConsoleIO(unittest.TestCase):
         book_info = console_io.input_book()
         self.assertEqual(book_info, ("Test Title", "Test Author", "2000"))
 
+    @patch("builtins.input", return_value="")
+    @patch("builtins.print")
+    def test_output_books_pulls_pages_lazily(self, mock_print, mock_input):
+        console_io = ConsoleIO()
+        pulled = []
+
+        def books():
+            for number in range(per_page * 2 + 1):
+                pulled.append(number)
+                yield Book("Title %s" % number, "Author", 2000)
+
+        with patch("input_output.io_class.ConsoleIO.clear"), \
+                patch("input_output.io_class.os.get_terminal_size") as mock_size:
+            mock_size.return_value.columns = 80
+            pulled_at_prompt = []
+            mock_input.side_effect = lambda *args: pulled_at_prompt.append(len(pulled)) or ""
+            console_io.output_books(books())
+        self.assertEqual(pulled_at_prompt, [per_page + 1, per_page * 2 + 1, per_page * 2 + 1])
+
     @patch("builtins.print")
     def test_output_message(self, mock_print):
         console_io = ConsoleIO()
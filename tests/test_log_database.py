@@ -0,0 +1,205 @@
+import unittest
+import json
+import os
+import threading
+from unittest.mock import patch
+from models.models import Book
+from database import log_database
+from database.log_database import LogDatabase
+
+
+class TestLogDatabase(unittest.TestCase):
+    def setUp(self):
+        self.file_path = "test_library_log.json"
+        self.database = LogDatabase(self.file_path, fsync=False)
+        self.book1 = Book(
+            id="1", title="Book 1", author="Author 1", year=2000, status="В наличии",
+        )
+        self.book2 = Book(
+            id="2", title="Book 2", author="Author 2", year=2010, status="Выдана",
+        )
+
+    def tearDown(self):
+        self.database.close()
+        for path in (self.file_path, self.database.log_path, self.database.segment_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def reopen(self) -> LogDatabase:
+        self.database.close()
+        self.database = LogDatabase(self.file_path, fsync=False)
+        return self.database
+
+    def test_load_books_empty(self):
+        self.assertEqual(self.database.load_books(), [])
+
+    def test_mutations_are_replayed(self):
+        self.database.add_book(self.book1)
+        self.database.add_book(self.book2)
+        self.database.change_book_status("1", "Выдана")
+        self.database.delete_book("2")
+        database = self.reopen()
+        books = database.load_books()
+        self.assertEqual([book.id for book in books], ["1"])
+        self.assertEqual(books[0].status, "Выдана")
+
+    def test_save_books_writes_snapshot(self):
+        self.database.add_book(self.book1)
+        self.database.save_books([self.book2])
+        self.assertEqual(os.path.getsize(self.database.log_path), 0)
+        self.assertEqual([book.id for book in self.reopen().load_books()], ["2"])
+
+    def test_log_of_replaced_snapshot_is_not_replayed(self):
+        self.database.add_book(self.book1)
+        self.database.add_book(self.book2)
+        with open(self.database.log_path, "r", encoding="utf-8") as file:
+            old_log = file.read()
+        self.database.save_books([self.book1])
+        self.database.close()
+        with open(self.database.log_path, "w", encoding="utf-8") as file:
+            file.write(old_log + json.dumps({"op": "delete", "id": "1"}) + "\n")
+        self.assertEqual([book.id for book in self.reopen().load_books()], ["1"])
+        self.assertEqual(os.path.getsize(self.database.log_path), 0)
+        self.database.change_book_status("1", "Выдана")
+        books = self.reopen().load_books()
+        self.assertEqual([(book.id, book.status) for book in books], [("1", "Выдана")])
+
+    def test_corrupt_snapshot_is_empty(self):
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            file.write('[{"title": ')
+        self.assertEqual(self.reopen().load_books(), [])
+
+    def test_torn_tail_is_discarded(self):
+        self.database.add_book(self.book1)
+        self.database.close()
+        with open(self.database.log_path, "a", encoding="utf-8") as file:
+            file.write('{"op": "add", "bo')
+        database = self.reopen()
+        database.add_book(self.book2)
+        self.assertEqual([book.id for book in self.reopen().load_books()], ["1", "2"])
+
+    def test_delete_and_status_of_missing_book(self):
+        self.assertFalse(self.database.delete_book("1"))
+        self.assertFalse(self.database.change_book_status("1", "Выдана"))
+
+    def test_iter_books_survives_mutations(self):
+        self.database.add_books([self.book1, self.book2])
+        books = self.database.iter_books()
+        self.assertEqual(next(books).id, "1")
+        for number in (3, 4):
+            self.database.add_book(Book(id=str(number), title="Book", author="Author", year=2020))
+        self.database.delete_book("2")
+        self.assertEqual([book.id for book in books], ["3", "4"])
+
+    def test_legacy_duplicate_ids(self):
+        self.database.close()
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            json.dump([{**self.book1.to_dict(), "title": "Book %d" % number} for number in range(3)], file)
+        ids = [book.id for book in self.reopen().load_books()]
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual(sorted(book.id for book in log_database.read_snapshot(self.file_path)), sorted(ids))
+        self.assertTrue(self.database.change_book_status(ids[1], "Выдана"))
+        self.assertTrue(self.database.delete_book(ids[2]))
+        expected = [(ids[0], "В наличии"), (ids[1], "Выдана")]
+        self.assertEqual([(book.id, book.status) for book in self.reopen().load_books()], expected)
+        self.database.compact(wait=True)
+        self.assertEqual([(book.id, book.status) for book in log_database.read_snapshot(self.file_path)], expected)
+        self.assertEqual([(book.id, book.status) for book in self.reopen().load_books()], expected)
+
+    def test_failed_batch_adds_nothing(self):
+        def books():
+            yield self.book1
+            raise ValueError("bad row")
+
+        with self.assertRaises(ValueError):
+            self.database.add_books(books())
+        self.assertEqual(self.database.load_books(), [])
+        self.assertEqual(self.reopen().load_books(), [])
+        self.assertEqual(self.database.add_books([self.book1, self.book2]), 2)
+        self.assertEqual(self.reopen().load_books(), [self.book1, self.book2])
+
+    def test_find_books(self):
+        self.database.add_book(self.book1)
+        self.database.add_book(self.book2)
+        self.assertEqual(self.database.find_books("book 1", "title"), [self.book1])
+        self.assertEqual(self.database.find_book("2"), self.book2)
+        self.assertIsNone(self.database.find_book("3"))
+
+
+class TestLogCompaction(TestLogDatabase):
+    def setUp(self):
+        super().setUp()
+        self.database = LogDatabase(self.file_path, fsync=False, compact_records=3)
+
+    def reopen(self) -> LogDatabase:
+        self.database.close()
+        self.database = LogDatabase(self.file_path, fsync=False, compact_records=3)
+        return self.database
+
+    def test_log_is_folded_into_snapshot(self):
+        for number in range(4):
+            self.database.add_book(Book(id=str(number), title="Book", author="Author", year=2000))
+        self.database.change_book_status("0", "Выдана")
+        self.database.close()
+        self.assertEqual(self.database.counters()["compactions"], 1)
+        self.assertFalse(os.path.exists(self.database.segment_path))
+        self.assertEqual(len(log_database.read_snapshot(self.file_path)), 3)
+        books = self.reopen().load_books()
+        self.assertEqual([book.id for book in books], ["0", "1", "2", "3"])
+        self.assertEqual(books[0].status, "Выдана")
+
+    def test_interrupted_compaction_is_replayed_once(self):
+        records = [
+            {"op": "add", "book": self.book1.to_dict()},
+            {"op": "status", "id": "1", "status": "Выдана"},
+            {"op": "add", "book": self.book2.to_dict()},
+        ]
+        with open(self.database.segment_path, "w", encoding="utf-8") as file:
+            file.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        log_database.fold_segment(self.file_path, self.database.segment_path, fsync=False)
+        with open(self.database.segment_path, "w", encoding="utf-8") as file:
+            file.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        books = self.reopen().load_books()
+        self.database.close()
+        self.assertEqual([(book.id, book.status) for book in books], [("1", "Выдана"), ("2", "Выдана")])
+        self.assertFalse(os.path.exists(self.database.segment_path))
+
+    def test_commands_do_not_wait_for_compaction(self):
+        started, release = threading.Event(), threading.Event()
+        fold_segment = log_database.fold_segment
+
+        def slow_fold(*args):
+            started.set()
+            release.wait(5)
+            return fold_segment(*args)
+
+        with patch("database.log_database.fold_segment", slow_fold):
+            for number in range(3):
+                self.database.add_book(Book(id=str(number), title="Book", author="Author", year=2000))
+            self.assertTrue(started.wait(5))
+            self.database.add_book(Book(id="9", title="Book", author="Author", year=2000))
+            self.assertTrue(self.database.change_book_status("0", "Выдана"))
+            release.set()
+            self.database.close()
+        books = self.reopen().load_books()
+        self.assertEqual([book.id for book in books], ["0", "1", "2", "9"])
+        self.assertEqual(books[0].status, "Выдана")
+
+    def test_dead_records_trigger_compaction(self):
+        database = LogDatabase(self.file_path + "2", fsync=False, compact_dead_ratio=0.5, compact_min_records=4)
+        try:
+            database.add_book(self.book1)
+            database.change_book_status("1", "Выдана")
+            database.change_book_status("1", "В наличии")
+            self.assertEqual(database.counters()["compactions"], 0)
+            database.change_book_status("1", "Выдана")
+            database.close()
+            self.assertEqual(database.counters()["compactions"], 1)
+        finally:
+            for path in (database.file_path, database.log_path, database.segment_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from models.models import Book
+from database.catalogue import Catalogue
+
+
+class TestBook(unittest.TestCase):
+    def test_author_and_status_are_interned(self):
+        first = Book("Война и мир", "".join(["Лев ", "Толстой"]), 1869, status="".join(["Выда", "на"]))
+        second = Book("Анна Каренина", "".join(["Лев ", "Толс", "той"]), 1877, status="".join(["Вы", "дана"]))
+        self.assertIs(first.author, second.author)
+        self.assertIs(first.status, second.status)
+
+    def test_year_is_stored_as_int(self):
+        self.assertEqual(Book("Война и мир", "Лев Толстой", "1869").year, 1869)
+
+    def test_invalid_year(self):
+        with self.assertRaisesRegex(ValueError, "Book 7 has an invalid year: 'н/д'"):
+            Book.from_dict({"title": "Книга", "author": "Автор", "year": "н/д", "id": "7", "status": "В наличии"})
+        with self.assertRaises(ValueError):
+            Book("Книга", "Автор", None)
+
+    def test_dict_round_trip(self):
+        book = Book("Война и мир", "Лев Толстой", 1869, "1", "Выдана")
+        self.assertEqual(book.to_dict(), {
+            "title": "Война и мир", "author": "Лев Толстой", "year": 1869, "id": "1", "status": "Выдана",
+        })
+        self.assertEqual(Book.from_dict(book.to_dict()), book)
+
+    def test_from_dict_defaults(self):
+        book = Book.from_dict({"title": "Война и мир", "author": "Лев Толстой", "year": 1869})
+        self.assertEqual(book.status, "В наличии")
+        self.assertTrue(book.id)
+
+    def test_from_dict_rejects_unknown_keys(self):
+        data = Book("Война и мир", "Лев Толстой", 1869, "1").to_dict()
+        with self.assertRaises(TypeError):
+            Book.from_dict({**data, "isbn": "978-5"})
+        del data["status"]
+        with self.assertRaises(TypeError):
+            Book.from_dict({**data, "isbn": "978-5"})
+
+    def test_changed_status_is_interned(self):
+        catalogue = Catalogue([Book("Война и мир", "Лев Толстой", 1869, "1")])
+        catalogue.add(Book("Детство", "Лев Толстой", 1852, "2"))
+        catalogue.set_status("1", "".join(["Выда", "на"]))
+        catalogue.set_status("2", "".join(["Вы", "дана"]))
+        self.assertIs(catalogue.get("1").status, catalogue.get("2").status)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import os
+from models.models import Book
+from database.catalogue import Catalogue
+from database.json_database import JsonDatabase
+from database.log_database import LogDatabase
+from database.sharded_database import ShardedDatabase, layout_path, shard_paths
+from database.sqlite_database import SqliteDatabase
+from database.query import Condition, parse_conditions, CONTAINS, EQUALS, BETWEEN
+from benchmarks.data import generate_books
+
+QUERIES = (
+    "author~толстой",
+    "author~лев; year=1850..1880",
+    "year=..1870; status=в наличии",
+    "title~мир; status=выдана",
+    "year=1877",
+    "year=1900..",
+    "id=2",
+    "id=2; status=в наличии",
+    "author=лев толстой",
+    "title~а",
+)
+
+
+def make_books() -> list[Book]:
+    return [
+        Book(id="1", title="Война и мир", author="Лев Толстой", year=1869),
+        Book(id="2", title="Анна Каренина", author="Лев Толстой", year=1877, status="Выдана"),
+        Book(id="3", title="Мир как воля", author="Артур Шопенгауэр", year=1819, status="Выдана"),
+        Book(id="4", title="Чайка", author="Антон Чехов", year=1896),
+        Book(id="5", title="Мастер и Маргарита", author="Михаил Булгаков", year=1967),
+        Book(id="6", title="Детство", author="Лев Толстой", year=1852, status="Выдана"),
+    ]
+
+
+def scan(books: list[Book], conditions: list[Condition]) -> list[str]:
+    return sorted(book.id for book in books if all(condition.matches(book) for condition in conditions))
+
+
+class TestParseConditions(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_conditions("Author~Толстой; year=1860..1870;status=В наличии"), [
+            Condition("author", CONTAINS, "толстой"),
+            Condition("year", BETWEEN, (1860, 1870)),
+            Condition("status", EQUALS, "в наличии"),
+        ])
+        self.assertEqual(parse_conditions("year=..1870"), [Condition("year", BETWEEN, (None, 1870))])
+        self.assertEqual(parse_conditions("year=1869"), [Condition("year", EQUALS, 1869)])
+        self.assertEqual(parse_conditions("title~a=b"), [Condition("title", CONTAINS, "a=b")])
+
+    def test_parse_errors(self):
+        for text in ("", ";", "author", "publisher~x", "year=abc", "year=1..x", "~x"):
+            with self.assertRaises(ValueError, msg=text):
+                parse_conditions(text)
+
+    def test_between_only_for_year(self):
+        with self.assertRaises(ValueError):
+            Condition("title", BETWEEN, ("a", "b"))
+
+
+class TestCatalogueQuery(unittest.TestCase):
+    def setUp(self):
+        self.books = make_books()
+        self.catalogue = Catalogue(self.books)
+
+    def test_results_match_scan(self):
+        for text in QUERIES:
+            conditions = parse_conditions(text)
+            found = self.catalogue.query(conditions)
+            self.assertEqual(sorted(book.id for book in found), scan(self.books, conditions), text)
+
+    def test_plan_starts_from_most_selective_index(self):
+        plan = self.catalogue.plan(parse_conditions("status=в наличии; author~толстой; id=4"))
+        self.assertEqual([(condition.field, estimate) for condition, estimate in plan], [
+            ("id", 1), ("status", 3), ("author", 3),
+        ])
+        plan = self.catalogue.plan(parse_conditions("author~лев; year=1960..1970"))
+        self.assertEqual(plan[0], (Condition("year", BETWEEN, (1960, 1970)), 1))
+
+    def test_value_indexes_follow_mutations(self):
+        conditions = parse_conditions("year=1850..1900; status=выдана")
+        self.assertEqual(sorted(book.id for book in self.catalogue.query(conditions)), ["2", "6"])
+        self.catalogue.set_status("2", "В наличии")
+        self.catalogue.remove("6")
+        self.catalogue.add(Book(id="7", title="Воскресение", author="Лев Толстой", year=1899, status="Выдана"))
+        self.assertEqual([book.id for book in self.catalogue.query(conditions)], ["7"])
+
+    def test_generated_catalogue(self):
+        books = list(generate_books(2000))
+        catalogue = Catalogue(books)
+        for text in ("year=1950..1960; status=выдана", "author~ов; year=2001", "title~ми; year=..1900"):
+            conditions = parse_conditions(text)
+            self.assertEqual(sorted(book.id for book in catalogue.query(conditions)), scan(books, conditions), text)
+
+
+class TestBackendQuery(unittest.TestCase):
+    def setUp(self):
+        self.paths = [
+            "test_library_query.json", "test_library_query.json.lock", "test_library_query.sqlite3",
+            "test_library_query.log", "test_library_query.log.log", layout_path("test_library_query_shards.json"),
+        ] + [path + suffix for path in shard_paths("test_library_query_shards.json", 2) for suffix in ("", ".lock")]
+
+    def tearDown(self):
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_backends_agree(self):
+        databases = [
+            JsonDatabase("test_library_query.json", cache=True, fsync=False),
+            JsonDatabase("test_library_query.json", cache=False, fsync=False),
+            SqliteDatabase("test_library_query.sqlite3"),
+            LogDatabase("test_library_query.log", fsync=False),
+            ShardedDatabase("test_library_query_shards.json", shards=2, fsync=False, workers=1),
+        ]
+        try:
+            for database in databases:
+                database.save_books(make_books())
+            for text in QUERIES:
+                conditions = parse_conditions(text)
+                expected = scan(make_books(), conditions)
+                for database in databases:
+                    found = sorted(book.id for book in database.query(conditions))
+                    self.assertEqual(found, expected, "%s: %s" % (type(database).__name__, text))
+        finally:
+            for database in databases:
+                database.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+from unittest.mock import patch
+from models.models import Book
+from database.json_database import JsonDatabase
+from database.query_cache import QueryCache
+
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        self.file_path = "test_library_query_cache.json"
+        self.storage = JsonDatabase(self.file_path, cache=True, fsync=False)
+        self.database = QueryCache(self.storage, max_entries=2)
+        self.book1 = Book(
+            id="1", title="Book 1", author="Author 1", year=2000, status="В наличии",
+        )
+        self.book2 = Book(
+            id="2", title="Book 2", author="Author 2", year=2010, status="Выдана",
+        )
+        self.database.save_books([self.book1, self.book2])
+
+    def tearDown(self):
+        for path in (self.file_path, self.file_path + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_repeated_search_is_served_from_cache(self):
+        with patch.object(self.storage, "find_books", wraps=self.storage.find_books) as find_books:
+            self.assertEqual(self.database.find_books("Author", "author"), [self.book1, self.book2])
+            self.assertEqual(self.database.find_books("AUTHOR", "author"), [self.book1, self.book2])
+            self.assertEqual(find_books.call_count, 1)
+        self.assertEqual(self.database.cache_counters()["cache_hits"], 1)
+        self.assertEqual(self.database.cache_counters()["cache_misses"], 1)
+
+    def test_mutation_invalidates_results(self):
+        self.assertEqual(self.database.find_books("1", "title"), [self.book1])
+        generation = self.database.generation
+        self.database.delete_book("1")
+        self.assertEqual(self.database.generation, generation + 1)
+        self.assertEqual(self.database.find_books("1", "title"), [])
+        self.database.add_book(Book(id="3", title="Book 13", author="Author 3", year=2020))
+        self.assertEqual([book.id for book in self.database.find_books("1", "title")], ["3"])
+
+    def test_least_recently_used_is_evicted(self):
+        with patch.object(self.storage, "find_books", wraps=self.storage.find_books) as find_books:
+            self.database.find_books("1", "title")
+            self.database.find_books("2", "title")
+            self.database.find_books("1", "title")
+            self.database.find_books("2000", "year")
+            self.database.find_books("1", "title")
+            self.database.find_books("2", "title")
+            self.assertEqual(find_books.call_count, 4)
+        self.assertEqual(self.database.cache_counters()["evictions"], 2)
+        self.assertEqual(self.database.cache_counters()["entries"], 2)
+
+    def test_entries_expire(self):
+        database = QueryCache(self.storage, ttl=10)
+        with patch("database.query_cache.time.monotonic", side_effect=[0.0, 5.0, 20.0]):
+            database.find_books("1", "title")
+            database.find_books("1", "title")
+            database.find_books("1", "title")
+        self.assertEqual(database.cache_counters()["cache_hits"], 1)
+        self.assertEqual(database.cache_counters()["expirations"], 1)
+
+    def test_write_by_another_process_outdates_results(self):
+        self.assertEqual(self.database.find_books("1", "title"), [self.book1])
+        other = JsonDatabase(self.file_path, fsync=False)
+        other.add_book(Book(id="3", title="Book 13", author="Author 3", year=2020))
+        self.assertEqual([book.id for book in self.database.find_books("1", "title")], ["1", "3"])
+        self.assertEqual(self.database.cache_counters()["cache_hits"], 0)
+
+    def test_cached_list_is_not_shared(self):
+        self.database.find_books("1", "title").clear()
+        self.assertEqual(self.database.find_books("1", "title"), [self.book1])
+
+
+if __name__ == "__main__":
+    unittest.main()
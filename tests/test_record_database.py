@@ -0,0 +1,130 @@
+import unittest
+import os
+from unittest.mock import patch
+from models.models import Book
+from database.json_database import JsonDatabase
+from database.record_database import RecordDatabase, RECORD, convert_json_library
+from benchmarks.data import generate_books
+
+
+class TestRecordDatabase(unittest.TestCase):
+    def setUp(self):
+        self.file_path = "test_library.records"
+        self.database = RecordDatabase(self.file_path, fsync=False)
+        self.book1 = Book(
+            id="1", title="Book 1", author="Author 1", year=2000, status="В наличии",
+        )
+        self.book2 = Book(
+            id="2", title="Война и мир", author="Лев Толстой", year=1869, status="Выдана",
+        )
+
+    def tearDown(self):
+        self.database.close()
+        for path in (self.file_path, "test_library_records.json", "test_library_records.json.lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def reopen(self) -> RecordDatabase:
+        self.database.close()
+        self.database = RecordDatabase(self.file_path, fsync=False)
+        return self.database
+
+    def test_load_books_empty(self):
+        self.assertEqual(self.database.load_books(), [])
+
+    def test_books_survive_reopen(self):
+        self.database.add_book(self.book1)
+        self.database.add_book(self.book2)
+        self.assertEqual(self.reopen().load_books(), [self.book1, self.book2])
+        self.assertEqual(self.database.find_book("2"), self.book2)
+
+    def test_status_change_writes_one_byte(self):
+        self.database.save_books([self.book1, self.book2])
+        written = self.database.counters()["bytes_written"]
+        self.assertTrue(self.database.change_book_status("1", "Выдана"))
+        self.assertFalse(self.database.change_book_status("3", "Выдана"))
+        self.assertEqual(self.database.counters()["bytes_written"], written)
+        self.assertEqual(self.reopen().find_book("1").status, "Выдана")
+        with self.assertRaises(ValueError):
+            self.database.change_book_status("1", "Потеряна")
+
+    def test_deleted_slot_is_reused(self):
+        self.database.save_books([self.book1, self.book2])
+        self.assertTrue(self.database.delete_book("1"))
+        self.assertFalse(self.database.delete_book("1"))
+        self.database.add_book(Book(id="3", title="Book 3", author="Author 3", year=2020))
+        self.assertEqual([book.id for book in self.reopen().load_books()], ["3", "2"])
+        self.assertFalse(self.database.has_book("1"))
+
+    def test_aggregates_follow_mutations(self):
+        self.database.save_books([self.book1, self.book2])
+        self.assertEqual(self.database.aggregates().count("status", "В наличии"), 1)
+        with patch.object(self.database, "_iter_records", side_effect=AssertionError("full scan")):
+            self.database.change_book_status("1", "Выдана")
+            self.database.add_book(Book(id="3", title="Анна Каренина", author="Лев Толстой", year=1877))
+            self.database.delete_book("2")
+            aggregates = self.database.aggregates()
+        self.assertEqual(aggregates.total, 2)
+        self.assertEqual(aggregates.count("status", "Выдана"), 1)
+        self.assertEqual(aggregates.count("status", "В наличии"), 1)
+        self.assertEqual(aggregates.top("author", 5), [("Author 1", 1), ("Лев Толстой", 1)])
+        self.assertEqual(aggregates.count("year", 1869), 0)
+        self.reopen()
+        self.assertEqual(self.database.aggregates().top("year", 5), [(2000, 1), (1877, 1)])
+
+    def test_file_grows(self):
+        books = [Book(title="Book %d" % number, author="Author", year=2000) for number in range(200)]
+        self.assertEqual(self.database.add_books(iter(books)), 200)
+        self.assertGreaterEqual(os.path.getsize(self.file_path), 200 * RECORD.size)
+        self.assertEqual(len(self.reopen().load_books()), 200)
+        self.assertEqual([book.id for book in self.database.iter_books(198)], [book.id for book in books[198:]])
+
+    def test_find_books(self):
+        self.database.save_books([self.book1, self.book2])
+        self.assertEqual(self.database.find_books("толст", "author"), [self.book2])
+        self.assertEqual(self.database.find_books("book", "title"), [self.book1])
+        self.assertEqual(self.database.find_books("186", "year"), [self.book2])
+
+    def test_parallel_find_matches_serial(self):
+        books = list(generate_books(500))
+        self.database.add_books(books)
+        for book in books[::7]:
+            self.database.delete_book(book.id)
+        self.database.change_book_status(books[1].id, "Выдана")
+        parallel = RecordDatabase(self.file_path, fsync=False, workers=2, parallel_min=1)
+        try:
+            for query, field in (("ов", "author"), ("19", "year"), ("выдана", "status"), ("zzz", "title")):
+                self.assertEqual(parallel.find_books(query, field), self.database.find_books(query, field))
+        finally:
+            parallel.close()
+
+    def test_duplicate_ids_are_kept(self):
+        self.database.add_book(self.book1)
+        self.database.add_book(Book(id="1", title="Book 3", author="Author 3", year=2020))
+        books = self.database.load_books()
+        self.assertEqual(len({book.id for book in books}), 2)
+
+    def test_oversized_values_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.database.add_book(Book(title="Б" * 200, author="Author", year=2000))
+        with self.assertRaises(ValueError):
+            self.database.add_book(Book(title="Book", author="Author", year=2000, status="Потеряна"))
+        with self.assertRaises(ValueError):
+            self.database.add_books([self.book1, Book(title="Book", author="Author", year=2 ** 31)])
+        self.assertEqual(self.database.load_books(), [])
+
+    def test_foreign_file_is_rejected(self):
+        with open("test_library_records.json", "w", encoding="utf-8") as file:
+            file.write("[]" * 20)
+        with self.assertRaises(ValueError):
+            RecordDatabase("test_library_records.json")
+
+    def test_convert_json_library(self):
+        JsonDatabase("test_library_records.json").save_books([self.book1, self.book2])
+        self.database.close()
+        self.assertEqual(convert_json_library("test_library_records.json", self.file_path, batch=1), 2)
+        self.assertEqual(self.reopen().load_books(), [self.book1, self.book2])
+
+
+if __name__ == "__main__":
+    unittest.main()
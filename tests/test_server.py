@@ -0,0 +1,130 @@
+import unittest
+import asyncio
+import json
+import os
+from unittest.mock import patch
+from database.json_database import JsonDatabase
+from service.server import LibraryServer
+
+
+class TestLibraryServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.file_path = "test_library_server.json"
+        self.database = JsonDatabase(self.file_path, cache=True, commit_interval=60)
+        self.server = LibraryServer(self.database)
+        self.listener = await self.server.start("127.0.0.1", 0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.listener.close()
+        await self.listener.wait_closed()
+        await self.server.stop()
+        self.database.close()
+        for path in (self.file_path, self.file_path + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def connect(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+
+        async def request(raw: bytes = b"", **payload) -> dict:
+            writer.write((raw or json.dumps(payload).encode("utf-8")) + b"\n")
+            await writer.drain()
+            return json.loads(await reader.readline())
+
+        return request, writer
+
+    async def test_clients_share_one_library(self):
+        first, first_writer = await self.connect()
+        second, second_writer = await self.connect()
+        added = await first(command="add", title="Война и мир", author="Лев Толстой", year=1869)
+        self.assertTrue(added["ok"])
+        found = await second(command="find", query="толстой", field="author")
+        self.assertEqual([book["id"] for book in found["result"]], [added["result"]])
+        fuzzy = await second(command="fuzzy", query="талстой", field="author", limit=1)
+        self.assertEqual([book["id"] for book in fuzzy["result"]], [added["result"]])
+        queried = await second(command="query", conditions="author~толстой; year=1860..1870")
+        self.assertEqual([book["id"] for book in queried["result"]], [added["result"]])
+        changed = await second(command="status", id=added["result"], status="выдана")
+        self.assertEqual(changed, {"ok": True, "result": True})
+        report = await first(command="report", limit=1)
+        self.assertEqual(report["result"], {
+            "total": 1, "status": {"В наличии": 0, "Выдана": 1}, "authors": [["Лев Толстой", 1]], "years": [[1869, 1]],
+        })
+        self.assertEqual(JsonDatabase(self.file_path).load_books()[0].status, "Выдана")
+        listed = await first(command="list")
+        self.assertEqual(len(listed["result"]), 1)
+        ordered = await first(command="list", order="title")
+        self.assertEqual(ordered["result"], listed["result"])
+        self.assertFalse((await first(command="list", order="status"))["ok"])
+        first_writer.close()
+        second_writer.close()
+
+    async def test_concurrent_mutations_are_batched(self):
+        clients = [await self.connect() for _ in range(10)]
+        with patch.object(self.database, "flush", wraps=self.database.flush) as mock_flush:
+            responses = await asyncio.gather(*(
+                request(command="add", title="Book %s" % number, author="Author", year=2000)
+                for number, (request, _) in enumerate(clients)
+            ))
+        self.assertTrue(all(response["ok"] for response in responses))
+        self.assertLess(mock_flush.call_count, 10)
+        self.assertEqual(len(JsonDatabase(self.file_path).load_books()), 10)
+        for _, writer in clients:
+            writer.close()
+
+    async def test_sorted_pages_reuse_one_sort(self):
+        request, writer = await self.connect()
+        for title in ("В", "Б", "Г", "А"):
+            await request(command="add", title=title, author="Author", year=2000)
+        with patch.object(self.database, "iter_sorted", wraps=self.database.iter_sorted) as mock_sorted:
+            first = await request(command="list", order="title", offset=0, limit=2)
+            second = await request(command="list", order="title", offset=2, limit=2)
+            self.assertEqual(mock_sorted.call_count, 1)
+            await request(command="add", title="Аа", author="Author", year=2000)
+            third = await request(command="list", order="title", offset=0, limit=2)
+            self.assertEqual(mock_sorted.call_count, 2)
+        self.assertEqual([book["title"] for book in first["result"] + second["result"]], ["А", "Б", "В", "Г"])
+        self.assertEqual([book["title"] for book in third["result"]], ["А", "Аа"])
+        writer.close()
+
+    async def test_invalid_requests(self):
+        request, writer = await self.connect()
+        self.assertFalse((await request(command="add", title="Book", author="Author", year=3000))["ok"])
+        self.assertFalse((await request(command="find", query="x", field="id"))["ok"])
+        self.assertFalse((await request(command="drop"))["ok"])
+        self.assertEqual((await request(command="delete", id="missing"))["result"], False)
+        self.assertFalse((await request(b"not json"))["ok"])
+        self.assertFalse((await request(command="list", offset=[1]))["ok"])
+        self.assertFalse((await request(command="list", limit="many"))["ok"])
+        self.assertFalse((await request(command="fuzzy", query="x", field="title", limit={}))["ok"])
+        self.assertFalse((await request(command="report", limit=-1))["ok"])
+        self.assertTrue((await request(command="list", offset="0"))["ok"])
+        writer.close()
+
+    async def test_failed_mutation_does_not_stop_the_writer(self):
+        request, writer = await self.connect()
+        with patch.object(self.database, "add_book", side_effect=OSError("disk full")):
+            failed = await asyncio.wait_for(request(command="add", title="Book", author="Author", year=2000), 5)
+        self.assertEqual(failed, {"ok": False, "error": "disk full"})
+        with patch.object(self.database, "flush", side_effect=OSError("disk full")):
+            pending = await asyncio.wait_for(request(command="add", title="Book", author="Author", year=2000), 5)
+        self.assertEqual(pending, {"ok": True, "result": pending["result"], "durable": False, "warning": "disk full"})
+        self.assertEqual(JsonDatabase(self.file_path).load_books(), [])
+        added = await asyncio.wait_for(request(command="add", title="Book", author="Author", year=2000), 5)
+        self.assertEqual(added, {"ok": True, "result": added["result"]})
+        saved = [book.id for book in JsonDatabase(self.file_path).load_books()]
+        self.assertEqual(saved, [pending["result"], added["result"]])
+        writer.close()
+
+    async def test_failed_read_is_answered(self):
+        request, writer = await self.connect()
+        with patch.object(self.database, "find_books", side_effect=OSError("disk error")):
+            failed = await request(command="find", query="x", field="title")
+        self.assertEqual(failed, {"ok": False, "error": "disk error"})
+        self.assertTrue((await request(command="find", query="x", field="title"))["ok"])
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
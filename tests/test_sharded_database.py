@@ -0,0 +1,118 @@
+import unittest
+import os
+from unittest.mock import patch
+from models.models import Book
+from database.json_database import JsonDatabase
+from database.sharded_database import ShardedDatabase, layout_path, shard_paths
+
+
+class TestShardedDatabase(unittest.TestCase):
+    cache = False
+
+    def setUp(self):
+        self.file_path = "test_library_sharded.json"
+        self.database = ShardedDatabase(self.file_path, shards=4, cache=self.cache, fsync=False, workers=2)
+        self.books = [
+            Book(id=str(number), title="Book %d" % number, author="Author %d" % number, year=2000 + number)
+            for number in range(20)
+        ]
+
+    def tearDown(self):
+        self.database.close()
+        paths = [self.file_path, self.file_path + ".lock", self.file_path + ".migrated", layout_path(self.file_path)]
+        for path in paths + [path + suffix for path in self.database.paths for suffix in ("", ".lock")]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def shard_sizes(self) -> list[int]:
+        return [len(JsonDatabase(path).load_books()) for path in self.database.paths]
+
+    def test_shard_paths(self):
+        self.assertEqual(shard_paths("dir/books.json", 2), ["dir/books.00.json", "dir/books.01.json"])
+
+    def test_load_books_empty(self):
+        self.assertEqual(self.database.load_books(), [])
+
+    def test_books_are_spread_over_shards(self):
+        self.database.save_books(self.books)
+        sizes = self.shard_sizes()
+        self.assertEqual(sum(sizes), 20)
+        self.assertTrue(all(sizes))
+        self.assertEqual({book.id for book in self.database.load_books()}, {book.id for book in self.books})
+
+    def test_mutation_rewrites_one_shard(self):
+        self.database.save_books(self.books)
+        writes = self.database.counters()["writes"]
+        self.assertTrue(self.database.change_book_status("3", "Выдана"))
+        self.assertEqual(self.database.counters()["writes"], writes + 1)
+        self.assertEqual(self.database.find_book("3").status, "Выдана")
+        self.assertTrue(self.database.delete_book("3"))
+        self.assertFalse(self.database.delete_book("3"))
+        self.assertFalse(self.database.has_book("3"))
+
+    def test_add_books(self):
+        self.database.add_book(self.books[0])
+        self.assertEqual(self.database.add_books(iter(self.books[1:])), 19)
+        self.assertEqual(len(self.database.load_books()), 20)
+        self.assertEqual([book.id for book in self.database.iter_books(5, 3)], [
+            book.id for book in self.database.load_books()[5:8]
+        ])
+
+    def test_book_renumbered_by_its_shard_is_rerouted(self):
+        other = ShardedDatabase(self.file_path, shards=4, fsync=False)
+        other.add_books(Book(id=book.id, title="Other", author="Other", year=2000) for book in self.books)
+        other.close()
+        with patch.object(JsonDatabase, "has_book", return_value=False), \
+                patch.object(JsonDatabase, "iter_books", return_value=iter([])):
+            self.database.add_book(self.books[0])
+            self.database.add_books(self.books[1:])
+        self.assertEqual(len(self.database.load_books()), 40)
+        for book in self.books:
+            self.assertEqual(self.database.find_book(book.id), book)
+
+    def test_duplicate_ids_are_kept(self):
+        self.database.add_book(Book(id="1", title="Book", author="Author", year=2000))
+        self.database.add_books([Book(id="1", title="Book", author="Author", year=2000)])
+        self.database.add_book(Book(id="1", title="Book", author="Author", year=2000))
+        books = self.database.load_books()
+        self.assertEqual(len({book.id for book in books}), 3)
+        self.assertTrue(all(self.database.has_book(book.id) for book in books))
+
+    def test_shard_count_is_recorded(self):
+        self.database.save_books(self.books)
+        self.database.close()
+        with self.assertRaises(ValueError):
+            ShardedDatabase(self.file_path, shards=2, fsync=False)
+        os.remove(layout_path(self.file_path))
+        with self.assertRaises(ValueError):
+            ShardedDatabase(self.file_path, shards=2, fsync=False)
+        self.database = ShardedDatabase(self.file_path, shards=4, cache=self.cache, fsync=False, workers=2)
+        self.assertTrue(os.path.exists(layout_path(self.file_path)))
+        self.assertEqual(self.database.find_book("3").title, "Book 3")
+
+    def test_single_file_library_is_migrated(self):
+        self.database.close()
+        os.remove(layout_path(self.file_path))
+        JsonDatabase(self.file_path, fsync=False).save_books(self.books)
+        self.database = ShardedDatabase(self.file_path, shards=4, cache=self.cache, fsync=False, workers=2)
+        self.assertFalse(os.path.exists(self.file_path))
+        self.assertTrue(os.path.exists(self.file_path + ".migrated"))
+        self.assertTrue(all(self.shard_sizes()))
+        self.assertEqual(sorted(book.id for book in self.database.load_books()), sorted(book.id for book in self.books))
+        self.assertEqual(self.database.find_book("7").title, "Book 7")
+
+    def test_find_books(self):
+        self.database.save_books(self.books)
+        self.assertEqual(
+            sorted(book.id for book in self.database.find_books("author 1", "author")),
+            ["1", "10", "11", "12", "13", "14", "15", "16", "17", "18", "19"],
+        )
+        self.assertEqual([book.id for book in self.database.find_books("2005", "year")], ["5"])
+
+
+class TestCachedShardedDatabase(TestShardedDatabase):
+    cache = True
+
+
+if __name__ == "__main__":
+    unittest.main()
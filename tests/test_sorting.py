@@ -0,0 +1,83 @@
+import unittest
+import os
+from unittest.mock import patch
+from models.models import Book
+from database.json_database import JsonDatabase
+from database.log_database import LogDatabase
+from database.sharded_database import ShardedDatabase, layout_path, shard_paths
+from database.sqlite_database import SqliteDatabase
+from database.sorting import external_sort, sort_key
+from benchmarks.data import generate_books
+
+
+class TestExternalSort(unittest.TestCase):
+    def setUp(self):
+        self.books = list(generate_books(500))
+
+    def expected(self, field: str) -> list[str]:
+        return [book.id for book in sorted(self.books, key=sort_key(field))]
+
+    def test_sort_in_memory(self):
+        with patch("database.sorting.tempfile.TemporaryFile") as temporary_file:
+            found = [book.id for book in external_sort(iter(self.books), "title", 1000)]
+        temporary_file.assert_not_called()
+        self.assertEqual(found, self.expected("title"))
+
+    def test_sort_with_spilled_runs(self):
+        for field in ("title", "author", "year"):
+            found = list(external_sort(iter(self.books), field, 64))
+            self.assertEqual([book.id for book in found], self.expected(field), field)
+        self.assertEqual(found[0], min(self.books, key=sort_key("year")))
+
+    def test_runs_are_merged_in_passes(self):
+        with patch("database.sorting.MAX_FAN_IN", 3):
+            found = [book.id for book in external_sort(iter(self.books), "author", 20)]
+        self.assertEqual(found, self.expected("author"))
+
+    def test_sort_is_stable_and_ignores_case(self):
+        books = [Book("b", "A", 2000, "1"), Book("a", "b", 2000, "2"), Book("B", "a", 1999, "3")]
+        self.assertEqual([book.id for book in external_sort(books, "title", 1)], ["2", "1", "3"])
+        self.assertEqual([book.id for book in external_sort(books, "author", 2)], ["1", "3", "2"])
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            external_sort(self.books, "status", 10)
+
+
+class TestBackendSort(unittest.TestCase):
+    def setUp(self):
+        self.paths = [
+            "test_library_sorting.json", "test_library_sorting.json.lock", "test_library_sorting.sqlite3",
+            "test_library_sorting.log", "test_library_sorting.log.log", layout_path("test_library_sorting_shards.json"),
+        ] + [path + suffix for path in shard_paths("test_library_sorting_shards.json", 2) for suffix in ("", ".lock")]
+
+    def tearDown(self):
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_backends_agree(self):
+        books = list(generate_books(300))
+        databases = [
+            JsonDatabase("test_library_sorting.json", cache=True, fsync=False),
+            JsonDatabase("test_library_sorting.json", fsync=False),
+            SqliteDatabase("test_library_sorting.sqlite3"),
+            LogDatabase("test_library_sorting.log", fsync=False),
+            ShardedDatabase("test_library_sorting_shards.json", shards=2, fsync=False, workers=1),
+        ]
+        try:
+            for database in databases:
+                database.save_books([Book(book.title, book.author, book.year, book.id) for book in books])
+            for field in ("title", "author", "year"):
+                key = sort_key(field)
+                expected = [key(book) for book in sorted(books, key=key)]
+                for database in databases:
+                    found = [key(book) for book in database.iter_sorted(field, 50)]
+                    self.assertEqual(found, expected, "%s: %s" % (type(database).__name__, field))
+        finally:
+            for database in databases:
+                database.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import os
+import sqlite3
+from models.models import Book
+from database.sqlite_database import SqliteDatabase
+
+
+class TestSqliteDatabase(unittest.TestCase):
+    def setUp(self):
+        self.file_path = "test_library.sqlite3"
+        self.database = SqliteDatabase(self.file_path)
+        self.book1 = Book(
+            id="1", title="Война и мир", author="Лев Толстой", year=1869, status="В наличии",
+        )
+        self.book2 = Book(
+            id="2", title="Book 2", author="Author 2", year=2010, status="Выдана",
+        )
+
+    def tearDown(self):
+        self.database.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.file_path + suffix):
+                os.remove(self.file_path + suffix)
+
+    def test_load_books_empty(self):
+        self.assertEqual(self.database.load_books(), [])
+
+    def test_save_and_load_books(self):
+        self.database.save_books([self.book1, self.book2])
+        self.assertEqual(self.database.load_books(), [self.book1, self.book2])
+        self.database.save_books([self.book2])
+        self.assertEqual(self.database.load_books(), [self.book2])
+
+    def test_add_book(self):
+        self.database.add_book(self.book1)
+        self.database.add_book(self.book2)
+        self.assertEqual([book.id for book in self.database.load_books()], ["1", "2"])
+
+    def test_add_book_with_taken_id(self):
+        self.database.add_book(self.book1)
+        self.database.add_book(Book(id="1", title="Book 3", author="Author 3", year=2020))
+        self.assertEqual(len({book.id for book in self.database.load_books()}), 2)
+
+    def test_other_constraint_errors_are_raised(self):
+        self.database.add_book(self.book1)
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.database.add_book(Book(id="2", title=None, author="Author 3", year=2020))
+        self.assertEqual(self.database.load_books(), [self.book1])
+
+    def test_delete_book(self):
+        self.database.add_book(self.book1)
+        self.assertTrue(self.database.delete_book("1"))
+        self.assertFalse(self.database.delete_book("1"))
+        self.assertEqual(self.database.find_books("война", "title"), [])
+
+    def test_find_books(self):
+        self.database.save_books([self.book1, self.book2])
+        self.assertEqual(self.database.find_books("ВОЙНА И", "title"), [self.book1])
+        self.assertEqual(self.database.find_books("толст", "author"), [self.book1])
+        self.assertEqual(self.database.find_books("и", "title"), [self.book1])
+        self.assertEqual(self.database.find_books("201", "year"), [self.book2])
+
+    def test_iter_books(self):
+        self.database.save_books([self.book1, self.book2])
+        self.assertEqual(list(self.database.iter_books()), [self.book1, self.book2])
+        self.assertEqual(list(self.database.iter_books(1)), [self.book2])
+        self.assertEqual(list(self.database.iter_books(0, 1)), [self.book1])
+
+    def test_change_book_status(self):
+        self.database.save_books([self.book1])
+        self.assertTrue(self.database.change_book_status("1", "Выдана"))
+        self.assertEqual(self.database.find_book("1").status, "Выдана")
+        self.assertFalse(self.database.change_book_status("2", "В наличии"))
+
+    def test_find_book(self):
+        self.database.save_books([self.book1])
+        self.assertEqual(self.database.find_book("1"), self.book1)
+        self.assertIsNone(self.database.find_book("2"))
+        self.assertTrue(self.database.has_book("1"))
+        self.assertFalse(self.database.has_book("2"))
+
+    def test_data_version_changes_with_any_commit(self):
+        version = self.database.data_version()
+        self.database.add_book(self.book1)
+        self.assertNotEqual(self.database.data_version(), version)
+        version = self.database.data_version()
+        other = SqliteDatabase(self.file_path)
+        other.add_book(self.book2)
+        other.close()
+        self.assertNotEqual(self.database.data_version(), version)
+
+
+if __name__ == "__main__":
+    unittest.main()